@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+from typing import Iterator, List, Tuple
+
+# Peak memories below this size, in bytes, are too noisy to be compared.
+MIN_MEMORY = 1 << 20
+
+# Parts of the names of benchmarks whose peak memory is compared however
+# small it is, since keeping it small is the point of their algorithms.
+MEMORY_TRACKED: Tuple[str, ...] = ("/hirschberg/",)
+
+_METRICS: Tuple[str, ...] = ("seconds", "peak_memory")
+
+
+@dataclass
+class Comparison:
+    """Class representing a measurement of two benchmark runs.
+
+    Attributes:
+        name (str): name of the benchmark, followed by the name of the phase
+            for the measurements of a phase.
+        metric (str): measured value, seconds or peak_memory.
+        baseline (float): value of the first run.
+        current (float): value of the second run.
+        regression (bool): whether the value increased above the threshold.
+    """
+
+    name: str
+    metric: str
+    baseline: float
+    current: float
+    regression: bool = False
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1 if self.baseline else 0.0
+
+
+def _measurements(results: dict) -> Iterator[Tuple[str, dict]]:
+    for name, measurement in results["results"].items():
+        yield name, measurement
+        for phase_name, phase_measurement in measurement["phases"].items():
+            yield f"{name}:{phase_name}", phase_measurement
+
+
+def compare_results(
+    baseline: dict,
+    current: dict,
+    threshold: float = 0.1,
+    min_seconds: float = 0.01,
+    min_memory: int = MIN_MEMORY,
+) -> List[Comparison]:
+    """Compares the measurements of two benchmark runs.
+
+    Only benchmarks and phases measured in both runs are compared, and only
+    when the baseline value is large enough not to be dominated by noise,
+    but for the peak memories of the MEMORY_TRACKED benchmarks.
+
+    Arguments:
+        baseline (dict): results of the first run, see run_benchmarks.
+        current (dict): results of the second run.
+        threshold (float): relative increase of a value reported as a
+            regression, e.g. 0.1 for 10%.
+        min_seconds (float): shortest baseline time compared.
+        min_memory (int): smallest baseline peak memory compared, in bytes.
+
+    Returns:
+        List[Comparison] -- compared measurements, in the order of the
+            current run.
+    """
+    baseline_measurements = dict(_measurements(baseline))
+    minimums = {"seconds": min_seconds, "peak_memory": min_memory}
+    comparisons: List[Comparison] = []
+    for name, measurement in _measurements(current):
+        if name not in baseline_measurements:
+            continue
+        memory_tracked: bool = any(part in name for part in MEMORY_TRACKED)
+        for metric in _METRICS:
+            baseline_value: float = baseline_measurements[name][metric]
+            if metric == "peak_memory" and memory_tracked:
+                if not baseline_value:
+                    continue
+            elif baseline_value < minimums[metric]:
+                continue
+            comparison = Comparison(name, metric, baseline_value, measurement[metric])
+            comparison.regression = comparison.change > threshold
+            comparisons.append(comparison)
+    return comparisons
+
+
+def format_comparisons(comparisons: List[Comparison]) -> str:
+    """Formats compared measurements as a table, flagging regressions."""
+    lines: List[str] = [
+        f"{'benchmark':<56}{'metric':<13}{'baseline':>12}{'current':>12}{'change':>9}"
+    ]
+    for comparison in comparisons:
+        lines.append(
+            f"{comparison.name:<56}{comparison.metric:<13}"
+            f"{comparison.baseline:>12.4g}{comparison.current:>12.4g}"
+            f"{comparison.change:>+9.1%}"
+            + ("  REGRESSION" if comparison.regression else "")
+        )
+    return "\n".join(lines)
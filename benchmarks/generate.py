@@ -0,0 +1,86 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+ALPHABETS: Dict[str, str] = {"dna": "ACGT", "protein": "ACDEFGHIKLMNPQRSTVWY"}
+
+# Share of the changed positions of a mutated sequence being insertions or
+# deletions, the others being substitutions.
+INDEL_FRACTION = 0.2
+
+
+def _random_state(*seeds: int) -> np.random.RandomState:
+    return np.random.RandomState(np.array(seeds, dtype=np.uint32))
+
+
+def random_sequence(random: np.random.RandomState, alphabet: str, length: int) -> str:
+    """Draws a sequence of independent, uniformly distributed symbols.
+
+    Arguments:
+        random (np.random.RandomState): source of randomness.
+        alphabet (str): symbols of the sequence.
+        length (int): length of the sequence.
+
+    Returns:
+        str -- random sequence.
+    """
+    symbols = np.frombuffer(alphabet.encode("ascii"), dtype=np.uint8)
+    return symbols[random.randint(0, len(alphabet), length)].tobytes().decode("ascii")
+
+
+def mutate(
+    random: np.random.RandomState, sequence: str, alphabet: str, similarity: float
+) -> str:
+    """Changes a sequence at random positions.
+
+    Every position is changed with probability 1 - similarity, by a
+    substitution, or with probability INDEL_FRACTION by an insertion or a
+    deletion.
+
+    Arguments:
+        random (np.random.RandomState): source of randomness.
+        sequence (str): sequence to mutate.
+        alphabet (str): symbols of the sequence.
+        similarity (float): probability of keeping a position unchanged.
+
+    Returns:
+        str -- mutated sequence.
+    """
+    changed = random.random_sample(len(sequence)) >= similarity
+    kinds = random.random_sample(len(sequence))
+    replacements = random_sequence(random, alphabet, len(sequence))
+    symbols: List[str] = []
+    for position, symbol in enumerate(sequence):
+        if not changed[position]:
+            symbols.append(symbol)
+        elif kinds[position] < INDEL_FRACTION / 2:
+            symbols.extend((symbol, replacements[position]))
+        elif kinds[position] >= INDEL_FRACTION:
+            symbols.append(replacements[position])
+    return "".join(symbols)
+
+
+def sequence_pair(
+    seed: int, alphabet_name: str, length: int, similarity: float
+) -> Tuple[str, str]:
+    """Generates a reproducible pair of related sequences.
+
+    The pair only depends on the arguments, so every benchmark run aligns
+    the same sequences.
+
+    Arguments:
+        seed (int): seed of the benchmark run.
+        alphabet_name (str): name of the alphabet, see ALPHABETS.
+        length (int): length of the first sequence.
+        similarity (float): share of the positions of the first sequence
+            kept in the second one, see mutate.
+
+    Returns:
+        Tuple[str, str] -- pair of sequences.
+    """
+    alphabet: str = ALPHABETS[alphabet_name]
+    random = _random_state(
+        seed, list(ALPHABETS).index(alphabet_name), length, round(similarity * 1000)
+    )
+    sequence: str = random_sequence(random, alphabet, length)
+    return sequence, mutate(random, sequence, alphabet, similarity)
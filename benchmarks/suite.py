@@ -0,0 +1,362 @@
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import click
+import numpy as np
+
+from bioinf import cli
+from bioinf.sequence import Sequence
+from bioinf.sequence_alignment import (
+    SequenceAlignmentAlgorithmConfig,
+    create_algorithm,
+)
+from bioinf.stats import Stats, collect_stats, phase
+from bioinf.utils import read_sequences
+
+from .compare import compare_results, format_comparisons
+from .generate import ALPHABETS, sequence_pair
+
+SIZES: Tuple[int, ...] = (10, 100, 1000, 5000, 20000)
+SIMILARITIES: Tuple[float, ...] = (0.5, 0.9)
+ALGORITHMS: Tuple[str, ...] = (
+    "needleman-wunsch",
+    "hirschberg",
+    "banded",
+    "smith-waterman",
+    "gotoh",
+)
+
+# Sequences longer than this are only scored by default, since aligning
+# them keeps whole score and traceback matrices in memory.
+MAX_ALIGN_SIZE = 5000
+
+# Algorithms aligning in memory linear in the sequence lengths, which also
+# align the sequences longer than MAX_ALIGN_SIZE.
+LINEAR_MEMORY_ALGORITHMS: Tuple[str, ...] = ("hirschberg",)
+
+# Numbers of threads filling the tiles of the matrix of the threads
+# benchmarks, compared with the single thread align benchmark of the same
+# sequences.
+THREAD_COUNTS: Tuple[int, ...] = (2, 4)
+
+# Records of the FASTA file read by the read benchmarks.
+FASTA_RECORD_COUNT = 100
+
+CONFIG = SequenceAlignmentAlgorithmConfig(
+    same=5, diff=-5, gap_penalty=-2, max_seq_length=10 ** 9, max_number_paths=1
+)
+AFFINE_CONFIG = replace(CONFIG, gap_open=-5, gap_extend=-1)
+
+
+@dataclass
+class Case:
+    """Class representing a single benchmark.
+
+    Attributes:
+        name (str): unique name of the benchmark, used to compare runs.
+        run (Callable[[], object]): measured function, run several times,
+            whose result is dropped.
+        cells (int): number of cells computed by a run, 0 when it computes
+            no matrix.
+    """
+
+    name: str
+    run: Callable[[], object]
+    cells: int = 0
+
+
+def _align_case(
+    algorithm_name: str,
+    alphabet_name: str,
+    size: int,
+    similarity: float,
+    seed: int,
+    threads: int = 1,
+) -> Case:
+    left, right = sequence_pair(seed, alphabet_name, size, similarity)
+    config = AFFINE_CONFIG if algorithm_name == "gotoh" else CONFIG
+    algorithm = create_algorithm(replace(config, threads=threads), algorithm_name)
+    left_sequence, right_sequence = Sequence(left), Sequence(right)
+    name: str = f"align/{algorithm_name}/{alphabet_name}/{size}/{similarity}"
+    return Case(
+        name if threads == 1 else f"{name}/threads-{threads}",
+        lambda: algorithm.align(left_sequence, right_sequence),
+        (len(left) + 1) * (len(right) + 1),
+    )
+
+
+def _score_case(alphabet_name: str, size: int, similarity: float, seed: int) -> Case:
+    left, right = sequence_pair(seed, alphabet_name, size, similarity)
+    algorithm = create_algorithm(CONFIG)
+    left_sequence, right_sequence = Sequence(left), Sequence(right)
+
+    def run() -> int:
+        return algorithm.score(left_sequence, right_sequence)
+
+    return Case(
+        f"score/{alphabet_name}/{size}/{similarity}",
+        run,
+        (len(left) + 1) * (len(right) + 1),
+    )
+
+
+def _write_fasta(filepath: str, records: List[str]):
+    with open(filepath, "w") as f:
+        for index, record in enumerate(records):
+            f.write(f">record{index}\n")
+            for start in range(0, len(record), 60):
+                stop: int = start + 60
+                f.write(record[start:stop] + "\n")
+
+
+def _read_case(directory: str, size: int, seed: int) -> Case:
+    filepath: str = os.path.join(directory, f"read-{size}.fa")
+    _write_fasta(
+        filepath,
+        [
+            sequence_pair(seed + index, "dna", size, 1.0)[0]
+            for index in range(FASTA_RECORD_COUNT)
+        ],
+    )
+    return Case(f"read/dna/{size}", lambda: list(read_sequences(filepath)))
+
+
+def _cli_case(directory: str, size: int, seed: int) -> Case:
+    left, right = sequence_pair(seed, "dna", size, 0.9)
+    filepaths: Dict[str, str] = {
+        name: os.path.join(directory, f"cli-{size}-{name}")
+        for name in ("a.fa", "b.fa", "config.ini", "output.txt")
+    }
+    _write_fasta(filepaths["a.fa"], [left])
+    _write_fasta(filepaths["b.fa"], [right])
+    with open(filepaths["config.ini"], "w") as f:
+        f.write(
+            f"[DEFAULT]\nsame = {CONFIG.same}\ndiff = {CONFIG.diff}\n"
+            f"gap_penalty = {CONFIG.gap_penalty}\n"
+            f"max_seq_length = {CONFIG.max_seq_length}\n"
+            f"max_number_paths = {CONFIG.max_number_paths}\n"
+        )
+    args: List[str] = ["align", "-a", filepaths["a.fa"], "-b", filepaths["b.fa"]]
+    args += ["-c", filepaths["config.ini"], "-o", filepaths["output.txt"]]
+    return Case(
+        f"cli/dna/{size}",
+        lambda: cli.main.main(args, standalone_mode=False),
+        (len(left) + 1) * (len(right) + 1),
+    )
+
+
+def create_cases(
+    directory: str,
+    seed: int = 0,
+    sizes: Tuple[int, ...] = SIZES,
+    max_align_size: int = MAX_ALIGN_SIZE,
+) -> Iterator[Case]:
+    """Creates the benchmarks, generating their sequences and files.
+
+    The needleman-wunsch alignment of the similar DNA sequences of every
+    aligned length is also run with each of THREAD_COUNTS threads, to
+    measure the speedup of the tiled fill on the machine running them.
+
+    Arguments:
+        directory (str): directory of the generated FASTA and config files.
+        seed (int): seed of the generated sequences.
+        sizes (Tuple[int, ...]): lengths of the generated sequences.
+        max_align_size (int): longest sequences aligned, the longer ones are
+            only scored and aligned by LINEAR_MEMORY_ALGORITHMS.
+
+    Returns:
+        Iterator[Case] -- benchmarks, created lazily so that only the
+            sequences of one are held at a time.
+    """
+    for size in sizes:
+        for alphabet_name in ALPHABETS:
+            for similarity in SIMILARITIES:
+                yield _score_case(alphabet_name, size, similarity, seed)
+                for algorithm_name in ALGORITHMS:
+                    if (
+                        size > max_align_size
+                        and algorithm_name not in LINEAR_MEMORY_ALGORITHMS
+                    ):
+                        continue
+                    yield _align_case(
+                        algorithm_name, alphabet_name, size, similarity, seed
+                    )
+        if size <= max_align_size:
+            for threads in THREAD_COUNTS:
+                yield _align_case("needleman-wunsch", "dna", size, 0.9, seed, threads)
+        yield _read_case(directory, size, seed)
+        if size <= max_align_size:
+            yield _cli_case(directory, size, seed)
+
+
+def _run_case(case: Case, trace_memory: bool) -> Stats:
+    with collect_stats(trace_memory) as stats:
+        with phase("total", cells=case.cells):
+            case.run()
+    return stats
+
+
+def measure(case: Case, repeats: int = 3) -> dict:
+    """Measures a benchmark.
+
+    The time of every phase is the one of the fastest of the repeated runs,
+    which are not slowed down by tracing memory. The peak memory is then
+    measured by one more run traced with tracemalloc.
+
+    Arguments:
+        case (Case): benchmark to measure.
+        repeats (int): number of timed runs.
+
+    Returns:
+        dict -- seconds, cells, cells_per_second and peak_memory of the
+            whole benchmark, and the same values for each of its phases.
+    """
+    fastest: Stats = min(
+        (_run_case(case, False) for _ in range(repeats)),
+        key=lambda stats: stats.phases["total"].seconds,
+    )
+    memory_phases = _run_case(case, True).phases
+    phases: Dict[str, dict] = {
+        name: {
+            "seconds": phase_stats.seconds,
+            "cells": phase_stats.cells,
+            "cells_per_second": phase_stats.cells_per_second,
+            "peak_memory": memory_phases[name].peak_memory,
+        }
+        for name, phase_stats in fastest.phases.items()
+    }
+    return {**phases.pop("total"), "phases": phases}
+
+
+def run_benchmarks(
+    seed: int = 0,
+    repeats: int = 3,
+    sizes: Tuple[int, ...] = SIZES,
+    max_align_size: int = MAX_ALIGN_SIZE,
+    name_filter: Optional[str] = None,
+    progress: Optional[Callable[[str, dict], None]] = None,
+) -> dict:
+    """Runs the benchmarks, see create_cases and measure.
+
+    Arguments:
+        seed (int): seed of the generated sequences.
+        repeats (int): number of timed runs of every benchmark.
+        sizes (Tuple[int, ...]): lengths of the generated sequences.
+        max_align_size (int): longest sequences aligned.
+        name_filter (str): substring of the names of the benchmarks to run,
+            all are run when missing.
+        progress (Callable[[str, dict], None]): called with the name and the
+            measurements of every finished benchmark.
+
+    Returns:
+        dict -- metadata of the run and measurements of every benchmark by
+            name, as saved in the results file.
+    """
+    results: Dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for case in create_cases(directory, seed, sizes, max_align_size):
+            if name_filter is not None and name_filter not in case.name:
+                continue
+            results[case.name] = measure(case, repeats)
+            if progress is not None:
+                progress(case.name, results[case.name])
+
+    return {
+        "metadata": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "seed": seed,
+            "repeats": repeats,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def _format_measurement(name: str, measurement: dict) -> str:
+    cells_per_second: str = (
+        f"{measurement['cells_per_second']:.4g}" if measurement["cells"] else "-"
+    )
+    return (
+        f"{name:<48}{measurement['seconds']:>12.4f}{cells_per_second:>14}"
+        f"{measurement['peak_memory'] / 2 ** 20:>12.1f} MiB"
+    )
+
+
+@click.group()
+def main():
+    """Benchmarks of bioinf."""
+
+
+@main.command()
+@click.option("-o", type=click.Path(), required=True, help="Output JSON file.")
+@click.option("--seed", type=int, default=0, show_default=True)
+@click.option("--repeats", type=click.IntRange(min=1), default=3, show_default=True)
+@click.option(
+    "--sizes",
+    default=",".join(map(str, SIZES)),
+    show_default=True,
+    help="Comma separated lengths of the generated sequences.",
+)
+@click.option(
+    "--max-align-size",
+    type=click.IntRange(min=0),
+    default=MAX_ALIGN_SIZE,
+    show_default=True,
+    help="Longest sequences aligned, the longer ones are only scored.",
+)
+@click.option("-k", "name_filter", help="Only run benchmarks containing this text.")
+def run(
+    o: str, seed: int, repeats: int, sizes: str, max_align_size: int, name_filter: str
+):
+    """Runs the benchmarks and saves the measurements."""
+    results: dict = run_benchmarks(
+        seed,
+        repeats,
+        tuple(int(size) for size in sizes.split(",")),
+        max_align_size,
+        name_filter,
+        lambda name, measurement: click.echo(_format_measurement(name, measurement)),
+    )
+    with open(o, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+@main.command()
+@click.argument("baseline", type=click.Path(exists=True))
+@click.argument("current", type=click.Path(exists=True))
+@click.option(
+    "--threshold",
+    type=click.FloatRange(min=0),
+    default=0.1,
+    show_default=True,
+    help="Relative increase of time or memory reported as a regression.",
+)
+@click.option(
+    "--min-seconds",
+    type=click.FloatRange(min=0),
+    default=0.01,
+    show_default=True,
+    help="Shorter times are too noisy to be compared.",
+)
+def compare(baseline: str, current: str, threshold: float, min_seconds: float):
+    """Compares two results files, failing on regressions."""
+    with open(baseline) as f:
+        baseline_results: dict = json.load(f)
+    with open(current) as f:
+        current_results: dict = json.load(f)
+    comparisons = compare_results(
+        baseline_results, current_results, threshold, min_seconds
+    )
+    click.echo(format_comparisons(comparisons))
+    regression_count: int = sum(comparison.regression for comparison in comparisons)
+    click.echo(f"{regression_count} regressions", err=True)
+    sys.exit(1 if regression_count else 0)
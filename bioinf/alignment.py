@@ -1,11 +1,358 @@
+import re
+from bisect import bisect_right
 from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Protocol, Tuple
+
+import numpy as np
+
+from .path import Direction, Path
 from .sequence import Sequence
 
+_GAP = ord("-")
+
+# CIGAR operations of the directions of a path, indexed by direction value.
+# The left sequence is the reference, so a gap in it is an insertion.
+_OPERATIONS: np.ndarray = np.zeros(len(Direction), dtype=np.uint8)
+_OPERATIONS[Direction.DIAG.value] = ord("M")
+_OPERATIONS[Direction.LEFT.value] = ord("I")
+_OPERATIONS[Direction.UP.value] = ord("D")
+
+_CIGAR_PATTERN = re.compile(r"(\d+)([MID])")
+
+
+def _symbols(sequence: Sequence) -> np.ndarray:
+    return np.frombuffer(str(sequence).encode("latin-1"), dtype=np.uint8)
+
+
+def _run_length_encode(operations: np.ndarray) -> str:
+    if not len(operations):
+        return ""
+    starts: np.ndarray = np.flatnonzero(
+        np.concatenate(([True], operations[1:] != operations[:-1]))
+    )
+    lengths: np.ndarray = np.diff(np.append(starts, len(operations)))
+    return "".join(
+        f"{length}{chr(operation)}"
+        for length, operation in zip(lengths.tolist(), operations[starts].tolist())
+    )
+
+
+def _parse_cigar(cigar: str) -> Tuple[np.ndarray, np.ndarray]:
+    runs = _CIGAR_PATTERN.findall(cigar)
+    if "".join(f"{length}{operation}" for length, operation in runs) != cigar:
+        raise ValueError(f"Invalid CIGAR string {cigar}")
+    lengths = np.array([int(length) for length, _ in runs], dtype=np.int64)
+    operations = np.frombuffer(
+        "".join(operation for _, operation in runs).encode("ascii"), dtype=np.uint8
+    )
+    return operations, lengths
+
+
+class BaseAlignment(Protocol):
+    """Interface of the alignments of two sequences.
+
+    Both Alignment, holding the gapped strings, and CigarAlignment, holding
+    only the operations, provide it, so that writers and results can take
+    either of them.
+    """
+
+    @property
+    def left_sequence_alignment(self) -> Sequence:
+        """Left sequence with gaps."""
+        ...
+
+    @property
+    def right_sequence_alignment(self) -> Sequence:
+        """Right sequence with gaps."""
+        ...
+
+    @property
+    def left_start(self) -> int:
+        """Position of the first aligned symbol of the left sequence."""
+        ...
+
+    @property
+    def right_start(self) -> int:
+        """Position of the first aligned symbol of the right sequence."""
+        ...
+
+    @property
+    def cigar(self) -> str:
+        ...
+
+    @property
+    def left_end(self) -> int:
+        ...
+
+    @property
+    def right_end(self) -> int:
+        ...
+
 
 @dataclass
 class Alignment:
+    """Class representing an alignment of two sequences as gapped strings.
+
+    Attributes:
+        left_sequence_alignment (Sequence): left sequence with gaps.
+        right_sequence_alignment (Sequence): right sequence with gaps.
+        left_start (int): position of the first aligned symbol of the left
+            sequence, 0 unless the alignment is local.
+        right_start (int): the same for the right sequence.
+    """
+
     left_sequence_alignment: Sequence
     right_sequence_alignment: Sequence
+    left_start: int = 0
+    right_start: int = 0
+
+    @property
+    def cigar(self) -> str:
+        """Run-length encoded operations turning the left sequence into the
+        right one: M for aligned symbols, I and D for gaps in the left and
+        right sequences.
+        """
+        left_gaps: np.ndarray = _symbols(self.left_sequence_alignment) == _GAP
+        right_gaps: np.ndarray = _symbols(self.right_sequence_alignment) == _GAP
+        operations: np.ndarray = np.where(
+            left_gaps, ord("I"), np.where(right_gaps, ord("D"), ord("M"))
+        )
+        return _run_length_encode(operations.astype(np.uint8))
+
+    @property
+    def left_end(self) -> int:
+        """Position after the last aligned symbol of the left sequence."""
+        row: str = str(self.left_sequence_alignment)
+        return self.left_start + len(row) - row.count("-")
+
+    @property
+    def right_end(self) -> int:
+        """Position after the last aligned symbol of the right sequence."""
+        row: str = str(self.right_sequence_alignment)
+        return self.right_start + len(row) - row.count("-")
 
     def __str__(self):
         return f"{self.left_sequence_alignment}\n{self.right_sequence_alignment}"
+
+
+class CigarAlignment:
+    """Class representing an alignment by a CIGAR string and its sequences.
+
+    Only the run-length encoded operations and the positions of the aligned
+    parts are stored, next to references to the whole sequences, so that
+    keeping many long alignments takes little memory. The gapped strings
+    are expanded from them every time they are read.
+
+    Attributes:
+        left_sequence (Sequence): whole left (reference) sequence.
+        right_sequence (Sequence): whole right (query) sequence.
+        left_start (int): position of the first aligned left symbol.
+        right_start (int): position of the first aligned right symbol.
+    """
+
+    def __init__(
+        self,
+        cigar: str,
+        left_sequence: Sequence,
+        right_sequence: Sequence,
+        left_start: int = 0,
+        right_start: int = 0,
+    ):
+        self._operations, self._lengths = _parse_cigar(cigar)
+        self._cigar: str = cigar
+        self.left_sequence: Sequence = left_sequence
+        self.right_sequence: Sequence = right_sequence
+        self.left_start: int = left_start
+        self.right_start: int = right_start
+
+    @classmethod
+    def from_path(
+        cls,
+        path: Iterable[Direction],
+        left_sequence: Sequence,
+        right_sequence: Sequence,
+        last_cell: Tuple[int, int],
+    ) -> "CigarAlignment":
+        """Creates the alignment of a path found by a PathFinder.
+
+        Arguments:
+            path (Path): directions from the last cell, in traceback order.
+            left_sequence (Sequence): whole left sequence (matrix rows).
+            right_sequence (Sequence): whole right sequence (matrix columns).
+            last_cell (Tuple[int, int]): cell in which the path starts.
+
+        Returns:
+            CigarAlignment -- alignment of the path.
+        """
+        return AlignmentBuilder(left_sequence, right_sequence, last_cell).build(path)
+
+    @classmethod
+    def from_paths(
+        cls,
+        paths: Iterable[Iterable[Direction]],
+        left_sequence: Sequence,
+        right_sequence: Sequence,
+        last_cell: Tuple[int, int],
+    ) -> Iterator["CigarAlignment"]:
+        """Creates the alignments of many paths starting in the same cell.
+
+        The operations shared with the previous path are reused, so
+        converting the paths in the order given by PathFinder is much
+        cheaper than converting each of them separately.
+
+        Arguments:
+            paths (Iterable[Path]): directions from the last cell, in
+                traceback order.
+            left_sequence (Sequence): whole left sequence (matrix rows).
+            right_sequence (Sequence): whole right sequence (matrix columns).
+            last_cell (Tuple[int, int]): cell in which the paths start.
+
+        Returns:
+            Iterator[CigarAlignment] -- alignments in the order of the paths.
+        """
+        builder = AlignmentBuilder(left_sequence, right_sequence, last_cell)
+        return (builder.build(path) for path in paths)
+
+    @property
+    def cigar(self) -> str:
+        """Run-length encoded operations, see Alignment.cigar."""
+        return self._cigar
+
+    def _consumed(self, skipped: str) -> int:
+        return int(self._lengths[self._operations != ord(skipped)].sum())
+
+    def _expand(self, sequence: Sequence, start: int, skipped: str) -> Sequence:
+        steps: np.ndarray = np.repeat(self._operations, self._lengths)
+        consumes: np.ndarray = steps != ord(skipped)
+        # A gap is appended so that the symbols are never empty, the clipped
+        # positions of gap columns being replaced anyway.
+        symbols: np.ndarray = np.append(_symbols(sequence), np.uint8(_GAP))
+        positions: np.ndarray = start + np.cumsum(consumes) - 1
+        columns: np.ndarray = np.where(
+            consumes, symbols.take(positions, mode="clip"), np.uint8(_GAP)
+        )
+        return Sequence(columns.astype(np.uint8).tobytes().decode("latin-1"))
+
+    @property
+    def left_sequence_alignment(self) -> Sequence:
+        return self._expand(self.left_sequence, self.left_start, "I")
+
+    @property
+    def right_sequence_alignment(self) -> Sequence:
+        return self._expand(self.right_sequence, self.right_start, "D")
+
+    @property
+    def left_end(self) -> int:
+        return self.left_start + self._consumed("I")
+
+    @property
+    def right_end(self) -> int:
+        return self.right_start + self._consumed("D")
+
+    def __str__(self):
+        return f"{self.left_sequence_alignment}\n{self.right_sequence_alignment}"
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}({self._cigar!r}, left_start={self.left_start}, "
+            f"right_start={self.right_start})"
+        )
+
+
+class AlignmentBuilder:
+    """Class building the alignments of paths starting in the same cell.
+
+    The runs of operations of a path are gathered in traceback order (that
+    is, reversed). Consecutive paths from a PathFinder share long prefixes
+    of steps, so the runs built for the previous path are kept up to the
+    first differing step and only the rest is encoded. Paths can thus be
+    converted one at a time as they are found.
+
+    Attributes:
+        left_sequence (Sequence): whole left sequence (matrix rows).
+        right_sequence (Sequence): whole right sequence (matrix columns).
+        last_cell (Tuple[int, int]): cell in which the paths start.
+    """
+
+    def __init__(
+        self,
+        left_sequence: Sequence,
+        right_sequence: Sequence,
+        last_cell: Tuple[int, int],
+    ):
+        self.left_sequence: Sequence = left_sequence
+        self.right_sequence: Sequence = right_sequence
+        self.last_cell: Tuple[int, int] = last_cell
+        self._steps: bytes = b""
+        # Operation, length and number of steps up to the end of every run.
+        self._run_operations: List[int] = []
+        self._run_lengths: List[int] = []
+        self._run_ends: List[int] = []
+
+    def _common_prefix_length(self, steps: bytes) -> int:
+        length: int = min(len(steps), len(self._steps))
+        mismatches: np.ndarray = np.flatnonzero(
+            np.frombuffer(steps, dtype=np.uint8, count=length)
+            != np.frombuffer(self._steps, dtype=np.uint8, count=length)
+        )
+        return int(mismatches[0]) if len(mismatches) else length
+
+    def _truncate_runs(self, shared: int):
+        kept: int = bisect_right(self._run_ends, shared)
+        if kept < len(self._run_ends):
+            run_start: int = self._run_ends[kept] - self._run_lengths[kept]
+            if run_start < shared:
+                self._run_lengths[kept] = shared - run_start
+                self._run_ends[kept] = shared
+                kept += 1
+        del self._run_operations[kept:]
+        del self._run_lengths[kept:]
+        del self._run_ends[kept:]
+
+    def _append_runs(self, steps: bytes, shared: int):
+        operations: np.ndarray = _OPERATIONS[np.frombuffer(steps, np.uint8)[shared:]]
+        if not len(operations):
+            return
+        starts: np.ndarray = np.flatnonzero(
+            np.concatenate(([True], operations[1:] != operations[:-1]))
+        )
+        ends: List[int] = (np.append(starts[1:], len(operations)) + shared).tolist()
+        previous_end: int = shared
+        for operation, end in zip(operations[starts].tolist(), ends):
+            if self._run_operations and self._run_operations[-1] == operation:
+                self._run_lengths[-1] += end - previous_end
+                self._run_ends[-1] = end
+            else:
+                self._run_operations.append(operation)
+                self._run_lengths.append(end - previous_end)
+                self._run_ends.append(end)
+            previous_end = end
+
+    def build(self, path: Iterable[Direction]) -> CigarAlignment:
+        steps: bytes = (
+            bytes(path)
+            if isinstance(path, Path)
+            else bytes(direction.value for direction in path)
+        )
+        shared: int = self._common_prefix_length(steps)
+        self._truncate_runs(shared)
+        self._append_runs(steps, shared)
+        self._steps = steps
+
+        # The path leads back to the first aligned cell, at which the
+        # aligned parts of the sequences start.
+        left_start: int = (
+            self.last_cell[0] - len(steps) + steps.count(Direction.LEFT.value)
+        )
+        right_start: int = (
+            self.last_cell[1] - len(steps) + steps.count(Direction.UP.value)
+        )
+        cigar: str = "".join(
+            f"{length}{chr(operation)}"
+            for length, operation in zip(
+                reversed(self._run_lengths), reversed(self._run_operations)
+            )
+        )
+        return CigarAlignment(
+            cigar, self.left_sequence, self.right_sequence, left_start, right_start
+        )
@@ -0,0 +1,333 @@
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice, zip_longest
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Deque, Iterable, Iterator, List, TextIO, Tuple
+
+import numpy as np
+
+from .cache import create_cached_algorithm
+from .sequence import Sequence
+from .sequence_alignment import (
+    SequenceAlignmentAlgorithmConfig,
+    SequenceAlignmentResult,
+    create_algorithm,
+)
+from .utils import read_sequence, read_sequences
+
+# Number of chunks of pairs waiting in the pool per worker process, so that
+# the input is read only as fast as it is aligned.
+PENDING_CHUNKS_PER_WORKER = 4
+
+
+@dataclass
+class AlignmentTask:
+    """Class representing a single pair of sequences to align.
+
+    Attributes:
+        left_description (str): description of the first sequence.
+        right_description (str): description of the second sequence.
+        left_sequence (Sequence): first sequence, read from the file named by
+            left_description when missing.
+        right_sequence (Sequence): second sequence, read from the file named
+            by right_description when missing.
+        error (str): reason why the pair cannot be aligned, if any.
+    """
+
+    left_description: str
+    right_description: str
+    left_sequence: Sequence = None
+    right_sequence: Sequence = None
+    error: str = None
+
+
+@dataclass
+class BatchAlignmentResult:
+    """Class representing the outcome of aligning one pair of a batch.
+
+    Attributes:
+        left_description (str): description of the first sequence.
+        right_description (str): description of the second sequence.
+        result (SequenceAlignmentResult): alignment result, if it succeeded.
+        error (str): error message, if the alignment failed.
+    """
+
+    left_description: str
+    right_description: str
+    result: SequenceAlignmentResult = None
+    error: str = None
+
+    def __str__(self):
+        header: str = f"# {self.left_description} vs {self.right_description}"
+        if self.error is not None:
+            return f"{header}\nError: {self.error}"
+        return f"{header}\n{self.result}"
+
+
+def read_fasta_pairs(
+    left_filepath: str, right_filepath: str
+) -> Iterator[AlignmentTask]:
+    """Pairs up the records of two multi-FASTA files by their position.
+
+    Arguments:
+        left_filepath (str): file holding the first sequences of the pairs.
+        right_filepath (str): file holding the second sequences of the pairs.
+
+    Returns:
+        Iterator[AlignmentTask] -- pairs to align.
+    """
+    for left_record, right_record in zip_longest(
+        read_sequences(left_filepath), read_sequences(right_filepath)
+    ):
+        if left_record is None or right_record is None:
+            description, _ = left_record or right_record
+            yield AlignmentTask(
+                description, description, error="The record has no pair"
+            )
+        else:
+            yield AlignmentTask(
+                left_record[0], right_record[0], left_record[1], right_record[1]
+            )
+
+
+def read_manifest_pairs(filepath: str) -> Iterator[AlignmentTask]:
+    """Reads pairs of FASTA files listed in a manifest.
+
+    Every non-empty line of the manifest holds two tab separated paths. The
+    sequences themselves are read by the workers.
+
+    Arguments:
+        filepath (str): manifest file.
+
+    Returns:
+        Iterator[AlignmentTask] -- pairs to align.
+    """
+    with open(filepath, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) != 2:
+                yield AlignmentTask(
+                    line.strip(), "", error="A manifest line should hold two paths"
+                )
+            else:
+                yield AlignmentTask(fields[0], fields[1])
+
+
+def align_task(
+    task: AlignmentTask,
+    config: SequenceAlignmentAlgorithmConfig,
+    algorithm: str = None,
+    score_only: bool = False,
+) -> BatchAlignmentResult:
+    """Aligns a single pair, turning any failure into an error result.
+
+    Arguments:
+        task (AlignmentTask): pair to align.
+        config (SequenceAlignmentAlgorithmConfig): algorithm configuration.
+        algorithm (str): name of the algorithm overriding the config one.
+        score_only (bool): whether to skip retrieving the alignments.
+
+    Returns:
+        BatchAlignmentResult -- outcome of the alignment.
+    """
+    if task.error is not None:
+        return BatchAlignmentResult(
+            task.left_description, task.right_description, error=task.error
+        )
+
+    try:
+        left_sequence: Sequence = task.left_sequence
+        if left_sequence is None:
+            left_sequence = read_sequence(task.left_description)
+        right_sequence: Sequence = task.right_sequence
+        if right_sequence is None:
+            right_sequence = read_sequence(task.right_description)
+        alignment_algorithm = create_cached_algorithm(config, algorithm)
+        if score_only:
+            result = SequenceAlignmentResult(
+                alignment_algorithm.score(left_sequence, right_sequence), []
+            )
+        else:
+            result = alignment_algorithm.align(left_sequence, right_sequence)
+    except Exception as e:
+        return BatchAlignmentResult(
+            task.left_description, task.right_description, error=str(e)
+        )
+
+    return BatchAlignmentResult(
+        task.left_description, task.right_description, result=result
+    )
+
+
+def _align_task_star(arguments: Tuple) -> BatchAlignmentResult:
+    return align_task(*arguments)
+
+
+def _align_chunk(chunk: List[Tuple]) -> List[BatchAlignmentResult]:
+    return [align_task(*arguments) for arguments in chunk]
+
+
+def align_batch(
+    tasks: Iterable[AlignmentTask],
+    config: SequenceAlignmentAlgorithmConfig,
+    algorithm: str = None,
+    score_only: bool = False,
+    workers: int = None,
+    chunksize: int = 1,
+) -> Iterator[BatchAlignmentResult]:
+    """Aligns many pairs of sequences using a pool of processes.
+
+    Arguments:
+        tasks (Iterable[AlignmentTask]): pairs to align.
+        config (SequenceAlignmentAlgorithmConfig): algorithm configuration.
+        algorithm (str): name of the algorithm overriding the config one.
+        score_only (bool): whether to skip retrieving the alignments.
+        workers (int): number of worker processes, all CPUs when missing.
+            With a single worker the pairs are aligned in this process.
+        chunksize (int): number of pairs sent to a worker at once.
+
+    At most PENDING_CHUNKS_PER_WORKER chunks per worker are submitted ahead
+    of the oldest unfinished one, so that the tasks are read and sent to the
+    pool as the results are consumed instead of all at once.
+
+    Returns:
+        Iterator[BatchAlignmentResult] -- outcomes in the order of the tasks.
+    """
+    arguments = ((task, config, algorithm, score_only) for task in tasks)
+    if workers == 1:
+        yield from map(_align_task_star, arguments)
+        return
+
+    max_pending: int = (workers or os.cpu_count() or 1) * PENDING_CHUNKS_PER_WORKER
+    pending: Deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks = iter(lambda: list(islice(arguments, chunksize)), [])
+        for chunk in chunks:
+            pending.append(executor.submit(_align_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+# Per worker process state of the all-vs-all scoring, set by the initializer so
+# that the sequences are sent to every worker only once.
+_all_vs_all_state: dict = {}
+
+
+def _attach_shared_memory(name: str) -> SharedMemory:
+    # The creating process owns the segment, so workers must not track it.
+    # The resource tracker is shared with the creating process, so a segment
+    # unregistered by a worker is no longer tracked for its creator either:
+    # instead, the registration done by SharedMemory before Python 3.13, and
+    # skipped since then with the track argument, is left out.
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _init_all_vs_all_worker(
+    shared_memory_name: str,
+    sequences: List[Sequence],
+    config: SequenceAlignmentAlgorithmConfig,
+    algorithm: str,
+) -> None:
+    shared_memory: SharedMemory = _attach_shared_memory(shared_memory_name)
+    _all_vs_all_state["shared_memory"] = shared_memory
+    _all_vs_all_state["scores"] = np.ndarray(
+        (len(sequences), len(sequences)), dtype=np.int64, buffer=shared_memory.buf
+    )
+    _all_vs_all_state["sequences"] = sequences
+    _all_vs_all_state["algorithm"] = create_algorithm(config, algorithm)
+
+
+def _score_rows(rows: List[int]) -> int:
+    scores: np.ndarray = _all_vs_all_state["scores"]
+    sequences: List[Sequence] = _all_vs_all_state["sequences"]
+    alignment_algorithm = _all_vs_all_state["algorithm"]
+    for row in rows:
+        scores[row, row:] = alignment_algorithm.score_batch(
+            sequences[row], sequences[row:]
+        )
+    return len(rows)
+
+
+def score_all_vs_all(
+    sequences: List[Sequence],
+    config: SequenceAlignmentAlgorithmConfig,
+    algorithm: str = None,
+    workers: int = None,
+) -> np.ndarray:
+    """Computes the alignment scores of every pair of the given sequences.
+
+    Only the upper triangle (including the diagonal) is scored, using the
+    batched score-only mode of the algorithm with each sequence as the query
+    of its row, and mirrored afterwards. The rows are split across worker
+    processes which write the scores straight into a shared memory buffer,
+    so no results are pickled back.
+
+    Arguments:
+        sequences (List[Sequence]): sequences to compare.
+        config (SequenceAlignmentAlgorithmConfig): algorithm configuration.
+        algorithm (str): name of the algorithm overriding the config one.
+        workers (int): number of worker processes, all CPUs when missing.
+
+    Returns:
+        np.ndarray -- symmetric int64 matrix of alignment scores.
+    """
+    sequence_count: int = len(sequences)
+    workers = workers or os.cpu_count() or 1
+    # Interleaving the rows balances the chunks, as the first rows hold the
+    # most pairs.
+    chunk_count: int = max(1, min(sequence_count, 4 * workers))
+    chunks = [
+        list(range(index, sequence_count, chunk_count)) for index in range(chunk_count)
+    ]
+
+    shared_memory = SharedMemory(
+        create=True, size=max(1, sequence_count * sequence_count * 8)
+    )
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_all_vs_all_worker,
+            initargs=(shared_memory.name, sequences, config, algorithm),
+        ) as executor:
+            for _ in executor.map(_score_rows, chunks):
+                pass
+
+        scores: np.ndarray = np.ndarray(
+            (sequence_count, sequence_count), dtype=np.int64, buffer=shared_memory.buf
+        ).copy()
+    finally:
+        shared_memory.close()
+        shared_memory.unlink()
+
+    return np.triu(scores) + np.triu(scores, 1).T
+
+
+def write_score_matrix(
+    scores: np.ndarray, descriptions: List[str], stream: TextIO
+) -> None:
+    """Writes a score matrix as a TSV table.
+
+    Arguments:
+        scores (np.ndarray): matrix to write.
+        descriptions (List[str]): descriptions of the sequences, used as the
+            row and column labels.
+        stream (TextIO): stream the table is written to.
+    """
+    stream.write("\t" + "\t".join(descriptions) + "\n")
+    for description, row in zip(descriptions, scores):
+        stream.write(description + "\t" + "\t".join(map(str, row)) + "\n")
@@ -0,0 +1,337 @@
+import hashlib
+import os
+import struct
+import tempfile
+import time
+import zlib
+from dataclasses import fields
+from typing import Iterator, List, Tuple
+
+from .alignment import BaseAlignment, CigarAlignment
+from .sequence import Sequence
+from .sequence_alignment import (
+    ISequenceAlignmentAlgorithm,
+    SequenceAlignmentAlgorithmConfig,
+    SequenceAlignmentResult,
+    create_algorithm,
+)
+
+# Default bound of the total size of the cached results, in bytes.
+DEFAULT_CACHE_SIZE = 1 << 30
+
+# Fraction of the bound the total size is reduced to by an eviction, so
+# that the directory is not scanned again by the next stores.
+_EVICTION_TARGET = 0.9
+
+# Age in seconds after which a temporary file is left by an interrupted store
+# rather than being written by another process.
+_STALE_TEMPORARY_AGE = 3600
+
+# Config fields changing how a result is computed, but not the result.
+_EXECUTION_FIELDS = ("threads", "scratch_dir", "cache_dir")
+
+_MAGIC = b"BRC3"
+_HEADER = struct.Struct("<4sdI")
+_SUFFIX = ".bin"
+
+
+class CorruptedCacheEntryError(Exception):
+    """Class representing a cache file not holding an alignment result.
+    """
+
+
+def serialize_result(result: SequenceAlignmentResult) -> bytes:
+    """Encodes an alignment result in a compact binary form.
+
+    The header holds the score and the number of alignments, followed by
+    the start positions and the CIGAR strings of all the alignments
+    compressed together, since co-optimal alignments share most of their
+    operations. The sequences themselves are not stored, they are given
+    back to deserialize_result.
+
+    Arguments:
+        result (SequenceAlignmentResult): result to encode.
+
+    Returns:
+        bytes -- encoded result.
+    """
+    rows: List[str] = [
+        f"{alignment.left_start} {alignment.right_start} {alignment.cigar}"
+        for alignment in result.alignments
+    ]
+    header: bytes = _HEADER.pack(_MAGIC, float(result.score), len(result.alignments))
+    return header + zlib.compress("\n".join(rows).encode("ascii"))
+
+
+def deserialize_result(
+    data: bytes, left_sequence: Sequence, right_sequence: Sequence
+) -> SequenceAlignmentResult:
+    """Decodes an alignment result encoded with serialize_result.
+
+    Arguments:
+        data (bytes): encoded result.
+        left_sequence (Sequence): first aligned sequence.
+        right_sequence (Sequence): second aligned sequence.
+
+    Raises:
+        CorruptedCacheEntryError: When the data is not an encoded result of
+            the sequences.
+
+    Returns:
+        SequenceAlignmentResult -- decoded result.
+    """
+    header_size: int = _HEADER.size
+    try:
+        magic, score, alignment_count = _HEADER.unpack_from(data)
+        text: str = zlib.decompress(data[header_size:]).decode("ascii")
+    except (struct.error, zlib.error, UnicodeDecodeError) as e:
+        raise CorruptedCacheEntryError(str(e))
+    rows: List[str] = text.split("\n") if alignment_count else []
+    if magic != _MAGIC or len(rows) != alignment_count:
+        raise CorruptedCacheEntryError("Not an alignment result")
+
+    alignments: List[BaseAlignment] = []
+    for row in rows:
+        try:
+            left_start, right_start, cigar = row.split(" ")
+            alignment = CigarAlignment(
+                cigar, left_sequence, right_sequence, int(left_start), int(right_start)
+            )
+        except ValueError as e:
+            raise CorruptedCacheEntryError(str(e))
+        if alignment.left_end > len(left_sequence) or alignment.right_end > len(
+            right_sequence
+        ):
+            raise CorruptedCacheEntryError("The alignment exceeds the sequences")
+        alignments.append(alignment)
+    return SequenceAlignmentResult(
+        int(score) if score.is_integer() else score, alignments
+    )
+
+
+class ResultCache:
+    """Class storing alignment results in files of a directory.
+
+    Every result is stored in its own file named by its key, so that
+    processes sharing the directory need no locking: files are written to a
+    temporary file and renamed, so they are never seen partially written,
+    and a file removed by another process is just a miss. The modification
+    time of a file is updated on every hit. The total size of the files is
+    only read from the directory by the first store, and then estimated by
+    adding the sizes of the stored results. Once the estimate exceeds the
+    bound, the directory is scanned again and the least recently used files
+    are removed, down to a fraction of the bound, along with the temporary
+    files left by interrupted stores.
+
+    Attributes:
+        cache_dir (str): directory of the cached results.
+        max_size (int): bound of the total size of the files, in bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int = DEFAULT_CACHE_SIZE):
+        self.cache_dir: str = cache_dir
+        self.max_size: int = max_size
+        # Estimated total size of the files, None until the first store.
+        self._size: int = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(
+        left_sequence: Sequence,
+        right_sequence: Sequence,
+        config: SequenceAlignmentAlgorithmConfig,
+        algorithm_name: str,
+    ) -> str:
+        """Computes the key of the result of aligning two sequences.
+
+        Arguments:
+            left_sequence (Sequence): first aligned sequence.
+            right_sequence (Sequence): second aligned sequence.
+            config (SequenceAlignmentAlgorithmConfig): algorithm configuration,
+                all fields but the ones not changing the result are used.
+            algorithm_name (str): name of the algorithm computing the result.
+
+        Returns:
+            str -- hexadecimal digest.
+        """
+        digest = hashlib.sha256(_MAGIC)
+        for value in (algorithm_name, str(left_sequence), str(right_sequence)):
+            digest.update(value.encode("latin-1") + b"\0")
+        for config_field in fields(config):
+            if config_field.name in _EXECUTION_FIELDS:
+                continue
+            value = getattr(config, config_field.name)
+            if config_field.name == "substitution_matrix" and value is not None:
+                value = (str(value.alphabet), value.scores.tolist())
+            digest.update(f"{config_field.name}={value!r}\0".encode())
+        return digest.hexdigest()
+
+    def _filepath(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + _SUFFIX)
+
+    def get(
+        self, key: str, left_sequence: Sequence, right_sequence: Sequence
+    ) -> SequenceAlignmentResult:
+        """Reads a cached result.
+
+        Arguments:
+            key (str): key of the result, see ResultCache.key.
+            left_sequence (Sequence): first aligned sequence.
+            right_sequence (Sequence): second aligned sequence.
+
+        Returns:
+            SequenceAlignmentResult -- cached result, None when missing or
+                unreadable.
+        """
+        filepath: str = self._filepath(key)
+        try:
+            with open(filepath, "rb") as f:
+                result = deserialize_result(f.read(), left_sequence, right_sequence)
+            os.utime(filepath)
+        except (OSError, CorruptedCacheEntryError):
+            return None
+        return result
+
+    def put(self, key: str, result: SequenceAlignmentResult):
+        """Stores a result, evicting the least recently used ones if needed.
+
+        Arguments:
+            key (str): key of the result, see ResultCache.key.
+            result (SequenceAlignmentResult): result to store.
+        """
+        data: bytes = serialize_result(result)
+        file_descriptor, temporary_filepath = tempfile.mkstemp(
+            dir=self.cache_dir, suffix=".tmp"
+        )
+        try:
+            with os.fdopen(file_descriptor, "wb") as f:
+                f.write(data)
+            os.replace(temporary_filepath, self._filepath(key))
+        except OSError:
+            if os.path.exists(temporary_filepath):
+                os.remove(temporary_filepath)
+            raise
+        if self._size is not None:
+            self._size += len(data)
+        if self._size is None or self._size > self.max_size:
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        stale_time: float = time.time() - _STALE_TEMPORARY_AGE
+        for entry in os.scandir(self.cache_dir):
+            try:
+                stat = entry.stat()
+                if entry.name.endswith(".tmp") and stat.st_mtime < stale_time:
+                    os.remove(entry.path)
+            except OSError:
+                continue
+            if entry.name.endswith(_SUFFIX):
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+        total_size: int = sum(size for _, size, _ in entries)
+        if total_size > self.max_size:
+            target_size: float = self.max_size * _EVICTION_TARGET
+            for _, size, filepath in sorted(entries):
+                if total_size <= target_size:
+                    break
+                try:
+                    os.remove(filepath)
+                except OSError:
+                    pass
+                total_size -= size
+        self._size = total_size
+
+
+class CachedSequenceAlignmentAlgorithm(ISequenceAlignmentAlgorithm):
+    """Class caching the alignment results of another algorithm.
+
+    Arguments:
+        _algorithm (ISequenceAlignmentAlgorithm): algorithm computing the
+            results missing from the cache.
+        _config (SequenceAlignmentAlgorithmConfig): configuration of the
+            algorithm, part of the keys of the results.
+        _cache (ResultCache): cache of the results.
+    """
+
+    def __init__(
+        self,
+        algorithm: ISequenceAlignmentAlgorithm,
+        config: SequenceAlignmentAlgorithmConfig,
+        cache: ResultCache,
+    ):
+        self._algorithm = algorithm
+        self._config = config
+        self._cache = cache
+
+    def _key(self, left_sequence: Sequence, right_sequence: Sequence) -> str:
+        return self._cache.key(
+            left_sequence, right_sequence, self._config, type(self._algorithm).__name__
+        )
+
+    def align(
+        self, left_sequence: Sequence, right_sequence: Sequence
+    ) -> SequenceAlignmentResult:
+        key: str = self._key(left_sequence, right_sequence)
+        result: SequenceAlignmentResult = self._cache.get(
+            key, left_sequence, right_sequence
+        )
+        if result is None:
+            result = self._algorithm.align(left_sequence, right_sequence)
+            self._cache.put(key, result)
+        return result
+
+    def _store_alignments(
+        self, key: str, score: int, alignments: Iterator[BaseAlignment]
+    ) -> Iterator[BaseAlignment]:
+        # Only the CIGAR strings of the alignments are kept until they are
+        # stored, which is skipped when they are not all consumed.
+        found: List[BaseAlignment] = []
+        for alignment in alignments:
+            found.append(alignment)
+            yield alignment
+        self._cache.put(key, SequenceAlignmentResult(score, found))
+
+    def iter_align(
+        self, left_sequence: Sequence, right_sequence: Sequence
+    ) -> Tuple[int, Iterator[BaseAlignment]]:
+        key: str = self._key(left_sequence, right_sequence)
+        result: SequenceAlignmentResult = self._cache.get(
+            key, left_sequence, right_sequence
+        )
+        if result is not None:
+            return result.score, iter(result.alignments)
+        score, alignments = self._algorithm.iter_align(left_sequence, right_sequence)
+        return score, self._store_alignments(key, score, alignments)
+
+    def score(self, left_sequence: Sequence, right_sequence: Sequence) -> int:
+        # Scores are not stored on their own, but the cached alignments of
+        # the pair hold it.
+        result = self._cache.get(
+            self._key(left_sequence, right_sequence), left_sequence, right_sequence
+        )
+        if result is not None:
+            return result.score
+        return self._algorithm.score(left_sequence, right_sequence)
+
+
+def create_cached_algorithm(
+    config: SequenceAlignmentAlgorithmConfig, name: str = None, mode: str = None
+) -> ISequenceAlignmentAlgorithm:
+    """Creates an algorithm, caching its results when the config sets a cache.
+
+    Arguments:
+        config (SequenceAlignmentAlgorithmConfig): algorithm configuration.
+        name (str): name of the algorithm, see create_algorithm.
+        mode (str): alignment mode, see create_algorithm.
+
+    Returns:
+        ISequenceAlignmentAlgorithm -- algorithm, wrapped in a
+            CachedSequenceAlignmentAlgorithm when config.cache_dir is set.
+    """
+    algorithm: ISequenceAlignmentAlgorithm = create_algorithm(config, name, mode)
+    if config.cache_dir is None:
+        return algorithm
+    return CachedSequenceAlignmentAlgorithm(
+        algorithm, config, ResultCache(config.cache_dir)
+    )
@@ -2,10 +2,37 @@
 
 """Console script for bioinf."""
 import sys
+import time
+from contextlib import nullcontext
+
 import click
+import numpy as np
+from . import batch
+from .batch import read_fasta_pairs, read_manifest_pairs
+from .cache import create_cached_algorithm
+from .output import FORMATS, create_writer
+from .search import search as search_database
 from .sequence import Sequence
-from .sequence_alignment import NeedlemanWunschSequenceAlignmentAlgorithm
-from .utils import read_config, read_sequence
+from .sequence_alignment import ALGORITHMS, MODES
+from .stats import collect_stats
+from .utils import (
+    build_fasta_index,
+    read_config,
+    read_sequence,
+    read_sequences,
+    selected_filepath,
+    write_fasta_index,
+)
+
+# Minimal time between two progress lines of align-batch, in seconds.
+PROGRESS_INTERVAL = 1.0
+
+
+def _check_sequence_file(ctx: click.Context, param: click.Parameter, value: str):
+    """Checks that the file of a path or record selector exists."""
+    if value is not None:
+        click.Path(exists=True).convert(selected_filepath(value), param, ctx)
+    return value
 
 
 @click.group()
@@ -14,22 +41,250 @@ def main(args=None):
 
 
 @main.command()
-@click.option("-a", type=click.Path(exists=True), required=True)
-@click.option("-b", type=click.Path(exists=True), required=True)
+@click.option(
+    "-a",
+    required=True,
+    callback=_check_sequence_file,
+    help="FASTA file, optionally followed by :record[:start-end].",
+)
+@click.option(
+    "-b",
+    required=True,
+    callback=_check_sequence_file,
+    help="FASTA file, optionally followed by :record[:start-end].",
+)
 @click.option("-c", type=click.Path(exists=True), required=True)
 @click.option("-o", type=click.Path())
-def align(a: str, b: str, c: str, o: str):
+@click.option(
+    "--score-only", is_flag=True, help="Compute the score without any alignments."
+)
+@click.option(
+    "--algorithm",
+    type=click.Choice(list(ALGORITHMS)),
+    help="Alignment algorithm, overrides the one set in the config file.",
+)
+@click.option(
+    "--mode",
+    type=click.Choice(list(MODES)),
+    help="Global alignment of whole sequences or local alignment of subsequences.",
+)
+@click.option(
+    "--threads",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Threads filling the score matrix.",
+)
+@click.option(
+    "--scratch-dir",
+    type=click.Path(file_okay=False),
+    help="Directory of disk-backed matrices, resumed after an interruption.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    help="Directory of cached alignment results.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(FORMATS),
+    default="pretty",
+    show_default=True,
+    help="Gapped sequences, CIGAR strings or SAM records.",
+)
+@click.option(
+    "--width",
+    type=click.IntRange(min=1),
+    help="Wrap the pretty alignments in blocks of this many columns.",
+)
+@click.option(
+    "--stats", is_flag=True, help="Report the time and memory used by every phase."
+)
+def align(
+    a: str,
+    b: str,
+    c: str,
+    o: str,
+    score_only: bool,
+    algorithm: str,
+    mode: str,
+    threads: int,
+    scratch_dir: str,
+    cache_dir: str,
+    output_format: str,
+    width: int,
+    stats: bool,
+):
+    try:
+        with collect_stats() if stats else nullcontext() as run_stats:
+            left_sequence: Sequence = read_sequence(a)
+            right_sequence: Sequence = read_sequence(b)
+            config = read_config(c)
+            config.threads = threads
+            config.scratch_dir = scratch_dir
+            config.cache_dir = cache_dir
+            alignment_algorithm = create_cached_algorithm(config, algorithm, mode)
+            if score_only:
+                score = alignment_algorithm.score(left_sequence, right_sequence)
+                alignments = iter(())
+            else:
+                score, alignments = alignment_algorithm.iter_align(
+                    left_sequence, right_sequence
+                )
+            # The alignments are only found while being written, one at a time.
+            with click.open_file(o or "-", "w") as f:
+                writer = create_writer(
+                    output_format, f, left_sequence, right_sequence, width
+                )
+                writer.write_result(score, alignments)
+        if stats:
+            click.echo(run_stats, err=True)
+    except Exception as e:
+        click.echo(str(e))
+
+
+@main.command("align-batch")
+@click.option("-a", type=click.Path(exists=True), help="Multi-FASTA file.")
+@click.option("-b", type=click.Path(exists=True), help="Multi-FASTA file.")
+@click.option(
+    "-m",
+    type=click.Path(exists=True),
+    help="Manifest with a tab separated pair of FASTA files per line.",
+)
+@click.option("-c", type=click.Path(exists=True), required=True)
+@click.option("-o", type=click.Path())
+@click.option("-j", "--workers", type=click.IntRange(min=1), help="Worker processes.")
+@click.option(
+    "--score-only", is_flag=True, help="Compute the score without any alignments."
+)
+@click.option(
+    "--algorithm",
+    type=click.Choice(list(ALGORITHMS)),
+    help="Alignment algorithm, overrides the one set in the config file.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    help="Directory of cached alignment results, shared by the workers.",
+)
+def align_batch(
+    a: str,
+    b: str,
+    m: str,
+    c: str,
+    o: str,
+    workers: int,
+    score_only: bool,
+    algorithm: str,
+    cache_dir: str,
+):
+    """Aligns pairs of sequences from two multi-FASTA files or a manifest."""
+    if m is None and (a is None or b is None):
+        raise click.UsageError("Either both -a and -b or -m have to be given.")
+
+    try:
+        config = read_config(c)
+        config.cache_dir = cache_dir
+        tasks = read_manifest_pairs(m) if m else read_fasta_pairs(a, b)
+        results = batch.align_batch(tasks, config, algorithm, score_only, workers)
+        pair_count: int = 0
+        failures: int = 0
+        last_report: float = time.monotonic()
+        with click.open_file(o or "-", "w") as f:
+            for pair_count, result in enumerate(results, start=1):
+                f.write(f"{result}\n\n")
+                if result.error is not None:
+                    failures += 1
+                    click.echo(
+                        f"Pair {pair_count} ({result.left_description} vs "
+                        f"{result.right_description}) failed: {result.error}",
+                        err=True,
+                    )
+                if time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                    last_report = time.monotonic()
+                    click.echo(f"Progress: {pair_count} pairs done", err=True)
+        click.echo(f"Aligned {pair_count} pairs, {failures} failed", err=True)
+    except Exception as e:
+        click.echo(str(e))
+
+
+@main.command("align-all")
+@click.option(
+    "-i", type=click.Path(exists=True), required=True, help="Multi-FASTA file."
+)
+@click.option("-c", type=click.Path(exists=True), required=True)
+@click.option("-o", type=click.Path(), help="Output .npy file or TSV table.")
+@click.option("-j", "--workers", type=click.IntRange(min=1), help="Worker processes.")
+@click.option(
+    "--algorithm",
+    type=click.Choice(list(ALGORITHMS)),
+    help="Alignment algorithm, overrides the one set in the config file.",
+)
+def align_all(i: str, c: str, o: str, workers: int, algorithm: str):
+    """Computes the alignment scores of all pairs of sequences of a file."""
     try:
-        left_sequence: Sequence = read_sequence(a)
-        right_sequence: Sequence = read_sequence(b)
         config = read_config(c)
-        algorithm = NeedlemanWunschSequenceAlignmentAlgorithm(config)
-        result = algorithm.align(left_sequence, right_sequence)
-        if o:
-            with open(o, "w") as f:
-                f.write(str(result))
+        descriptions, sequences = zip(*read_sequences(i))
+        scores = batch.score_all_vs_all(list(sequences), config, algorithm, workers)
+        if o is not None and o.endswith(".npy"):
+            np.save(o, scores)
         else:
-            click.echo(result)
+            with click.open_file(o or "-", "w") as f:
+                batch.write_score_matrix(scores, list(descriptions), f)
+    except Exception as e:
+        click.echo(str(e))
+
+
+@main.command()
+@click.option(
+    "-q",
+    required=True,
+    callback=_check_sequence_file,
+    help="FASTA file, optionally followed by :record[:start-end].",
+)
+@click.option(
+    "-d", type=click.Path(exists=True), required=True, help="Multi-FASTA database."
+)
+@click.option("-c", type=click.Path(exists=True), required=True)
+@click.option("-o", type=click.Path())
+@click.option(
+    "-k", type=click.IntRange(min=1), default=10, show_default=True, help="Hits."
+)
+@click.option(
+    "--algorithm",
+    type=click.Choice(list(ALGORITHMS)),
+    help="Alignment algorithm, overrides the one set in the config file.",
+)
+@click.option(
+    "--mode",
+    type=click.Choice(list(MODES)),
+    help="Global alignment of whole sequences or local alignment of subsequences.",
+)
+def search(q: str, d: str, c: str, o: str, k: int, algorithm: str, mode: str):
+    """Finds the sequences of a database aligning best with a query."""
+    try:
+        query: Sequence = read_sequence(q)
+        config = read_config(c)
+        result = search_database(query, read_sequences(d), config, k, algorithm, mode)
+        with click.open_file(o or "-", "w") as f:
+            f.write(f"{result}\n")
+        for description in result.skipped:
+            click.echo(f"Skipped {description}: longer than max_seq_length", err=True)
+        click.echo(
+            f"Scored {result.scored_count} of {result.target_count} sequences",
+            err=True,
+        )
+    except Exception as e:
+        click.echo(str(e))
+
+
+@main.command()
+@click.argument("fasta", type=click.Path(exists=True))
+def index(fasta: str):
+    """Builds the .fai index of a FASTA file."""
+    try:
+        click.echo(write_fasta_index(fasta, build_fasta_index(fasta)))
     except Exception as e:
         click.echo(str(e))
 
@@ -1,41 +1,47 @@
-from .alignment import Alignment
-from .path import Direction, Path
+from typing import Iterable, List
+
+from .alignment import AlignmentBuilder, CigarAlignment
+from .path import Direction
 from .sequence import Sequence
 
 
 class PathToAlignmentConverter:
+    """Class converting paths ending in the last cell of a matrix into
+    alignments, see AlignmentBuilder.
+    """
+
     @staticmethod
     def convert(
-        path: Path, left_sequence: Sequence, right_sequence: Sequence
-    ) -> Alignment:
-        left_sequence_alignment = ""
-        right_sequence_alignment = ""
-        left_index = len(left_sequence)
-        right_index = len(right_sequence)
-
-        for direction in path:
-            if direction == Direction.DIAG:
-                left_index = left_index - 1
-                right_index = right_index - 1
-                left_sequence_alignment = (
-                    left_sequence[left_index] + left_sequence_alignment
-                )
-                right_sequence_alignment = (
-                    right_sequence[right_index] + right_sequence_alignment
-                )
-            elif direction == Direction.UP:
-                left_index = left_index - 1
-                left_sequence_alignment = (
-                    left_sequence[left_index] + left_sequence_alignment
-                )
-                right_sequence_alignment = "-" + right_sequence_alignment
-            elif direction == Direction.LEFT:
-                right_index = right_index - 1
-                left_sequence_alignment = "-" + left_sequence_alignment
-                right_sequence_alignment = (
-                    right_sequence[right_index] + right_sequence_alignment
-                )
-
-        return Alignment(
-            Sequence(left_sequence_alignment), Sequence(right_sequence_alignment)
+        path: Iterable[Direction], left_sequence: Sequence, right_sequence: Sequence
+    ) -> CigarAlignment:
+        return CigarAlignment.from_path(
+            path,
+            left_sequence,
+            right_sequence,
+            (len(left_sequence), len(right_sequence)),
+        )
+
+    @staticmethod
+    def convert_all(
+        paths: Iterable[Iterable[Direction]],
+        left_sequence: Sequence,
+        right_sequence: Sequence,
+    ) -> List[CigarAlignment]:
+        """Converts many paths ending in the same cell into alignments.
+
+        The operations shared with the previous path are reused, so
+        converting the paths in the order given by PathFinder is much cheaper
+        than converting each of them separately.
+
+        Arguments:
+            paths (Iterable[Path]): paths to convert.
+            left_sequence (Sequence): first aligned sequence.
+            right_sequence (Sequence): second aligned sequence.
+
+        Returns:
+            List[CigarAlignment] -- alignments in the order of the paths.
+        """
+        builder = AlignmentBuilder(
+            left_sequence, right_sequence, (len(left_sequence), len(right_sequence))
         )
+        return [builder.build(path) for path in paths]
@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .kernels import fill_tile
+from .path import Direction
+
+# Number of cells of a block of rows, filled and checkpointed at once.
+BLOCK_CELL_COUNT = 1 << 24
+
+_SCORE_FILENAME = "score.dat"
+_TRACEBACK_FILENAME = "traceback.dat"
+_CHECKPOINT_FILENAME = "checkpoint.json"
+
+
+class BlockedMatrix:
+    """Class reading a matrix stored on disk one block of rows at a time.
+
+    The last read blocks are kept in memory, so a traceback walking through
+    neighbouring cells, or going back a few rows to follow another path,
+    reads most blocks once. The matrix is never read as a whole: the
+    PathFinder counts the paths over it block by block (see read_block).
+
+    Attributes:
+        matrix (np.ndarray): matrix to read, usually a np.memmap.
+        block_rows (int): number of rows of a block.
+        cached_blocks (int): number of blocks kept in memory.
+        shape (Tuple[int, int]): shape of the matrix.
+    """
+
+    def __init__(self, matrix: np.ndarray, block_rows: int, cached_blocks: int = 4):
+        self.matrix: np.ndarray = matrix
+        self.block_rows: int = block_rows
+        self.cached_blocks: int = cached_blocks
+        self.shape: Tuple[int, int] = matrix.shape
+        self._blocks: "OrderedDict[int, np.ndarray]" = OrderedDict()
+
+    def read_block(self, block_start: int) -> np.ndarray:
+        """Reads the rows of the block starting at a row.
+
+        Arguments:
+            block_start (int): first row of the block, a multiple of
+                block_rows.
+
+        Returns:
+            np.ndarray -- rows of the block, in memory.
+        """
+        block: Optional[np.ndarray] = self._blocks.get(block_start)
+        if block is None:
+            block_stop: int = block_start + self.block_rows
+            block = np.array(self.matrix[block_start:block_stop])
+            self._blocks[block_start] = block
+            if len(self._blocks) > self.cached_blocks:
+                self._blocks.popitem(last=False)
+        else:
+            self._blocks.move_to_end(block_start)
+        return block
+
+    def __getitem__(self, cell: Tuple[int, int]):
+        row, col = cell
+        block_start: int = row - row % self.block_rows
+        return self.read_block(block_start)[row - block_start, col]
+
+
+def _fingerprint(
+    left_codes: np.ndarray, profile: np.ndarray, gap_penalty: int, local: bool
+) -> str:
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(left_codes).tobytes())
+    digest.update(np.ascontiguousarray(profile, dtype=np.int64).tobytes())
+    digest.update(repr((profile.shape, gap_penalty, local)).encode())
+    return digest.hexdigest()
+
+
+def _read_checkpoint(scratch_dir: str, fingerprint: str) -> Optional[dict]:
+    for filename in (_SCORE_FILENAME, _TRACEBACK_FILENAME):
+        if not os.path.exists(os.path.join(scratch_dir, filename)):
+            return None
+    try:
+        with open(os.path.join(scratch_dir, _CHECKPOINT_FILENAME)) as f:
+            checkpoint: dict = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return checkpoint if checkpoint.get("fingerprint") == fingerprint else None
+
+
+def _write_checkpoint(scratch_dir: str, checkpoint: dict):
+    # The checkpoint replaces the previous one at once, so an interrupted
+    # write never leaves a truncated file behind.
+    filepath: str = os.path.join(scratch_dir, _CHECKPOINT_FILENAME)
+    with open(filepath + ".tmp", "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(filepath + ".tmp", filepath)
+
+
+def _is_better_cell(
+    score: float, cell: Tuple[int, int], best_score: float, best_cell: Tuple[int, int]
+) -> bool:
+    # Cells are compared as in fill_local_anti_diagonals, ties going to the
+    # first cell by anti-diagonal, then row.
+    return (-score, cell[0] + cell[1], cell[0]) < (
+        -best_score,
+        best_cell[0] + best_cell[1],
+        best_cell[0],
+    )
+
+
+def fill_on_disk(
+    scratch_dir: str,
+    left_codes: np.ndarray,
+    profile: np.ndarray,
+    gap_penalty: int,
+    local: bool = False,
+    block_rows: int = None,
+) -> Tuple[np.memmap, BlockedMatrix, Tuple[int, int]]:
+    """Fills score and traceback matrices stored in files of a directory.
+
+    The matrices are np.memmap files, filled in blocks of rows in order (see
+    fill_tile). After each block the files are flushed and a checkpoint is
+    written, so that a fill interrupted for any reason resumes from the
+    last finished block when called again with the same arguments. Files
+    left by a fill of other sequences or scores are overwritten.
+
+    Arguments:
+        scratch_dir (str): directory of the matrix files, created if missing.
+        left_codes (np.ndarray): left sequence (matrix rows) encoded as rows
+            of the profile.
+        profile (np.ndarray): query profile of the right sequence (matrix
+            columns), see query_profile.
+        gap_penalty (int): score value for adding a gap.
+        local (bool): whether a Smith-Waterman matrix is filled instead of a
+            Needleman-Wunsch one.
+        block_rows (int): number of rows of a block, so that a block holds
+            about BLOCK_CELL_COUNT cells when missing.
+
+    Returns:
+        Tuple[np.memmap, BlockedMatrix, Tuple[int, int]] -- score matrix,
+            traceback matrix read a block at a time, and the last cell of
+            the paths: the bottom right cell, or the best cell of a local
+            alignment as in fill_local_anti_diagonals.
+    """
+    row_count, col_count = len(left_codes) + 1, profile.shape[1] + 1
+    block_rows = block_rows or max(1, BLOCK_CELL_COUNT // col_count)
+    fingerprint: str = _fingerprint(left_codes, profile, gap_penalty, local)
+    os.makedirs(scratch_dir, exist_ok=True)
+    checkpoint: Optional[dict] = _read_checkpoint(scratch_dir, fingerprint)
+    file_mode: str = "w+" if checkpoint is None else "r+"
+    score_matrix = np.memmap(
+        os.path.join(scratch_dir, _SCORE_FILENAME),
+        dtype=np.float64,
+        mode=file_mode,
+        shape=(row_count, col_count),
+    )
+    traceback = np.memmap(
+        os.path.join(scratch_dir, _TRACEBACK_FILENAME),
+        dtype=np.uint8,
+        mode=file_mode,
+        shape=(row_count, col_count),
+    )
+
+    if checkpoint is None:
+        if not local:
+            score_matrix[0, :] = gap_penalty * np.arange(col_count)
+            score_matrix[:, 0] = gap_penalty * np.arange(row_count)
+            traceback[0, 1:] = Direction.LEFT.bit
+            traceback[1:, 0] = Direction.UP.bit
+        score_matrix.flush()
+        traceback.flush()
+        checkpoint = {
+            "fingerprint": fingerprint,
+            "filled_rows": 1,
+            "best_score": 0,
+            "best_cell": [0, 0],
+        }
+        _write_checkpoint(scratch_dir, checkpoint)
+
+    for block_start in range(checkpoint["filled_rows"], row_count, block_rows):
+        block_stop: int = min(block_start + block_rows, row_count)
+        fill_tile(
+            score_matrix,
+            traceback,
+            left_codes,
+            profile,
+            gap_penalty,
+            local,
+            range(block_start, block_stop),
+            range(1, col_count),
+        )
+        if local:
+            block_scores: np.ndarray = score_matrix[block_start:block_stop]
+            block_best: float = float(block_scores.max())
+            if block_best > 0:
+                rows, cols = np.nonzero(block_scores == block_best)
+                best = np.lexsort((rows, rows + cols))[0]
+                cell = (block_start + int(rows[best]), int(cols[best]))
+                if _is_better_cell(
+                    block_best,
+                    cell,
+                    checkpoint["best_score"],
+                    tuple(checkpoint["best_cell"]),
+                ):
+                    checkpoint["best_score"], checkpoint["best_cell"] = block_best, cell
+        score_matrix.flush()
+        traceback.flush()
+        checkpoint["filled_rows"] = block_stop
+        _write_checkpoint(scratch_dir, checkpoint)
+
+    last_cell = (
+        tuple(checkpoint["best_cell"]) if local else (row_count - 1, col_count - 1)
+    )
+    return score_matrix, BlockedMatrix(traceback, block_rows), last_cell
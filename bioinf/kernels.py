@@ -0,0 +1,675 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Union
+
+import numpy as np
+
+from .path import (
+    LEFT_GAP_EXTEND,
+    LEFT_GAP_OPEN,
+    UP_GAP_EXTEND,
+    UP_GAP_OPEN,
+    Direction,
+)
+
+
+def anti_diagonal_cells(
+    diagonal: int, row_count: int, col_count: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the interior cells lying on the given anti-diagonal.
+
+    Arguments:
+        diagonal (int): index of the anti-diagonal (row + col).
+        row_count (int): number of rows of the matrix.
+        col_count (int): number of columns of the matrix.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray] -- row and column indices of the cells.
+    """
+    rows = np.arange(
+        max(1, diagonal - col_count + 1), min(row_count - 1, diagonal - 1) + 1
+    )
+    return rows, diagonal - rows
+
+
+def _fill_anti_diagonals(
+    score_matrix: np.ndarray,
+    left_codes: np.ndarray,
+    profile: np.ndarray,
+    gap_penalty: int,
+    local: bool,
+    threads: int,
+) -> Tuple[np.ndarray, Tuple[int, int]]:
+    row_count, col_count = score_matrix.shape
+    traceback = np.zeros(score_matrix.shape, dtype=np.uint8)
+    if not local:
+        traceback[0, 1:] = Direction.LEFT.bit
+        traceback[1:, 0] = Direction.UP.bit
+    # Without any interior cell the anti-diagonals are empty.
+    if row_count == 1 or col_count == 1:
+        return traceback, (0, 0)
+
+    if threads > 1:
+        _fill_tiles(
+            score_matrix, traceback, left_codes, profile, gap_penalty, local, threads
+        )
+        if not local or score_matrix.max() <= 0:
+            return traceback, (0, 0)
+        # The first best cell by anti-diagonal, then row, as found below.
+        rows, cols = np.nonzero(score_matrix == score_matrix.max())
+        best = np.lexsort((rows, rows + cols))[0]
+        return traceback, (int(rows[best]), int(cols[best]))
+
+    best_score, best_cell = 0, (0, 0)
+    scores = score_matrix.ravel()
+    directions = traceback.ravel()
+    for diagonal in range(2, row_count + col_count - 1):
+        rows, cols = anti_diagonal_cells(diagonal, row_count, col_count)
+        cells = rows * col_count + cols
+        diag_weight = profile[left_codes[rows - 1], cols - 1]
+
+        from_left = scores[cells - 1] + gap_penalty
+        from_diag = scores[cells - col_count - 1] + diag_weight
+        from_up = scores[cells - col_count] + gap_penalty
+        current_score = np.maximum(np.maximum(from_left, from_diag), from_up)
+        if local:
+            np.maximum(current_score, 0, out=current_score)
+
+        scores[cells] = current_score
+        current_directions = (
+            (from_left == current_score) * np.uint8(Direction.LEFT.bit)
+            | (from_diag == current_score) * np.uint8(Direction.DIAG.bit)
+            | (from_up == current_score) * np.uint8(Direction.UP.bit)
+        )
+        if local:
+            # Local paths start wherever the score drops to zero.
+            current_directions[current_score == 0] = 0
+            best = int(np.argmax(current_score))
+            if current_score[best] > best_score:
+                best_score, best_cell = current_score[best], (rows[best], cols[best])
+        directions[cells] = current_directions
+
+    return traceback, (int(best_cell[0]), int(best_cell[1]))
+
+
+# Smallest edge of a tile of the parallel fill. NumPy only releases the GIL
+# for arrays of a few hundred elements or more.
+MIN_TILE_SIZE = 512
+
+
+def fill_tile(
+    score_matrix: np.ndarray,
+    traceback: np.ndarray,
+    left_codes: np.ndarray,
+    profile: np.ndarray,
+    gap_penalty: int,
+    local: bool,
+    rows: range,
+    cols: range,
+):
+    """Fills a tile of the interior of a score matrix in place.
+
+    The tile is filled one row at a time and only reads the row above it
+    and the column to its left. The dependency of a cell on its left
+    neighbour is resolved for a whole row of the tile at once, as in
+    fill_last_row. The cells get the same scores and traceback bits as
+    with fill_anti_diagonals or fill_local_anti_diagonals.
+
+    Arguments:
+        score_matrix (np.ndarray): matrix with the cells above and to the
+            left of the tile already filled.
+        traceback (np.ndarray): uint8 traceback matrix to fill.
+        left_codes (np.ndarray): left sequence (matrix rows) encoded as rows
+            of the profile.
+        profile (np.ndarray): query profile of the right sequence (matrix
+            columns), see query_profile.
+        gap_penalty (int): score value for adding a gap.
+        local (bool): whether scores are clamped at zero, as in a
+            Smith-Waterman matrix.
+        rows (range): rows of the tile, all greater than zero.
+        cols (range): columns of the tile, all greater than zero.
+    """
+    first_col, end_col = cols.start, cols.stop
+    previous_col = first_col - 1
+    gaps = gap_penalty * np.arange(end_col - previous_col)
+    for row in rows:
+        above = score_matrix[row - 1, previous_col:end_col]
+        diag_weight = profile[left_codes[row - 1], previous_col:][: len(cols)]
+        from_diag = above[:-1] + diag_weight
+        from_up = above[1:] + gap_penalty
+        candidates = np.empty(len(gaps), dtype=score_matrix.dtype)
+        candidates[0] = score_matrix[row, previous_col]
+        np.maximum(from_diag, from_up, out=candidates[1:])
+        if local:
+            np.maximum(candidates[1:], 0, out=candidates[1:])
+        best_scores = np.maximum.accumulate(candidates - gaps) + gaps
+
+        current_score = best_scores[1:]
+        score_matrix[row, first_col:end_col] = current_score
+        current_directions = (
+            (best_scores[:-1] + gap_penalty == current_score)
+            * np.uint8(Direction.LEFT.bit)
+            | (from_diag == current_score) * np.uint8(Direction.DIAG.bit)
+            | (from_up == current_score) * np.uint8(Direction.UP.bit)
+        )
+        if local:
+            current_directions[current_score == 0] = 0
+        traceback[row, first_col:end_col] = current_directions
+
+
+def _fill_tiles(
+    score_matrix: np.ndarray,
+    traceback: np.ndarray,
+    left_codes: np.ndarray,
+    profile: np.ndarray,
+    gap_penalty: int,
+    local: bool,
+    threads: int,
+):
+    """Fills the interior of a score matrix tile by tile in a thread pool.
+
+    The tiles of a tile anti-diagonal only depend on the tiles of the
+    previous ones, so they are filled concurrently.
+    """
+    row_count, col_count = score_matrix.shape
+    tile_size = max(MIN_TILE_SIZE, -(-max(row_count, col_count) // (2 * threads)))
+    tile_rows = [
+        range(start, min(start + tile_size, row_count))
+        for start in range(1, row_count, tile_size)
+    ]
+    tile_cols = [
+        range(start, min(start + tile_size, col_count))
+        for start in range(1, col_count, tile_size)
+    ]
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for diagonal in range(len(tile_rows) + len(tile_cols) - 1):
+            tiles = [
+                executor.submit(
+                    fill_tile,
+                    score_matrix,
+                    traceback,
+                    left_codes,
+                    profile,
+                    gap_penalty,
+                    local,
+                    tile_rows[tile_row],
+                    tile_cols[diagonal - tile_row],
+                )
+                for tile_row in range(
+                    max(0, diagonal - len(tile_cols) + 1),
+                    min(len(tile_rows), diagonal + 1),
+                )
+            ]
+            for tile in tiles:
+                tile.result()
+
+
+def fill_anti_diagonals(
+    score_matrix: np.ndarray,
+    left_codes: np.ndarray,
+    profile: np.ndarray,
+    gap_penalty: int,
+    threads: int = 1,
+) -> np.ndarray:
+    """Fills the interior of a Needleman-Wunsch score matrix in place.
+
+    All cells of an anti-diagonal only depend on the two previous
+    anti-diagonals, so each of them is computed with a handful of
+    vectorized operations instead of one Python iteration per cell.
+
+    With more than one thread the matrix is split into tiles instead, and
+    the tiles of every tile anti-diagonal are filled concurrently, each
+    row of a tile with a few vectorized operations during which NumPy
+    releases the GIL. The result is identical to the serial fill.
+
+    Arguments:
+        score_matrix (np.ndarray): matrix with the first row and column
+            already initialized.
+        left_codes (np.ndarray): left sequence (matrix rows) encoded as rows
+            of the profile.
+        profile (np.ndarray): query profile of the right sequence (matrix
+            columns), see query_profile.
+        gap_penalty (int): score value for adding a gap.
+        threads (int): number of threads filling the matrix.
+
+    Returns:
+        np.ndarray -- uint8 traceback matrix holding for every cell the bits
+            (see Direction.bit) of all moves leading to its optimal score.
+    """
+    traceback, _ = _fill_anti_diagonals(
+        score_matrix, left_codes, profile, gap_penalty, False, threads
+    )
+    return traceback
+
+
+def fill_local_anti_diagonals(
+    score_matrix: np.ndarray,
+    left_codes: np.ndarray,
+    profile: np.ndarray,
+    gap_penalty: int,
+    threads: int = 1,
+) -> Tuple[np.ndarray, Tuple[int, int]]:
+    """Fills the interior of a Smith-Waterman score matrix in place.
+
+    The cells are computed like in fill_anti_diagonals, except that scores
+    are never lower than zero. The best cell is tracked while filling, so
+    the matrix does not have to be scanned again to find it, unless the
+    matrix is filled by tiles.
+
+    Arguments:
+        score_matrix (np.ndarray): matrix with the first row and column
+            set to zero.
+        left_codes (np.ndarray): left sequence (matrix rows) encoded as rows
+            of the profile.
+        profile (np.ndarray): query profile of the right sequence (matrix
+            columns), see query_profile.
+        gap_penalty (int): score value for adding a gap.
+        threads (int): number of threads filling the matrix.
+
+    Returns:
+        Tuple[np.ndarray, Tuple[int, int]] -- uint8 traceback matrix, whose
+            cells with a zero score hold no directions, and the first cell
+            (by anti-diagonal, then row) holding the best score, (0, 0) if
+            no score is positive.
+    """
+    return _fill_anti_diagonals(
+        score_matrix, left_codes, profile, gap_penalty, True, threads
+    )
+
+
+# Number of cells of the rows of a batch of sequences scored at once, small
+# enough for the rows to stay in the cache.
+BATCH_CELL_COUNT = 1 << 18
+
+
+def batch_size(col_count: int) -> int:
+    """Returns how many equal length sequences to score at once.
+
+    Arguments:
+        col_count (int): number of columns of the query profile.
+
+    Returns:
+        int -- number of sequences of a batch.
+    """
+    return max(1, BATCH_CELL_COUNT // (col_count + 1))
+
+
+def _row_score_dtype(left_codes: np.ndarray, profile: np.ndarray, *penalties: int):
+    """Returns the narrowest integer type in which the rows cannot overflow.
+
+    Every score of a cell (i, j) lies within (i + j) times the largest
+    absolute weight, and the scores shifted by the gaps of a row for the
+    running maximum within (i + 2 * j + 1) times it. A quarter of the range
+    of the type is kept, so that unreachable scores fit below the reachable
+    ones. Wider types are only used when the bound does not fit.
+    """
+    weights = [abs(int(penalty)) for penalty in penalties]
+    if profile.size:
+        weights += [abs(int(profile.min())), abs(int(profile.max()))]
+    limit = (left_codes.shape[-1] + 2 * profile.shape[1] + 1) * max(weights)
+    for dtype in (np.int16, np.int32):
+        if limit <= np.iinfo(dtype).max // 4:
+            return dtype
+    return np.int64
+
+
+def fill_last_row(
+    left_codes: np.ndarray,
+    profile: np.ndarray,
+    gap_penalty: int,
+) -> np.ndarray:
+    """Computes the last row of a Needleman-Wunsch score matrix.
+
+    Only the previous row is kept in memory. The dependency of a cell on
+    its left neighbour is resolved for a whole row at once, since with a
+    linear gap penalty H[j] = max over k <= j of (C[k] + (j - k) * gap),
+    where C holds the best scores coming from the previous row.
+
+    A batch of equal length left sequences is scored at once by passing
+    their codes as a 2D array, the rows of all of them being computed in
+    a single array operation. The rows are kept in the narrowest integer
+    type that cannot overflow, see _row_score_dtype.
+
+    Arguments:
+        left_codes (np.ndarray): left sequence (matrix rows) encoded as rows
+            of the profile, or a (batch, length) array of such sequences.
+        profile (np.ndarray): query profile of the right sequence (matrix
+            columns), see query_profile.
+        gap_penalty (int): score value for adding a gap.
+
+    Returns:
+        np.ndarray -- int64 scores of the last row, of length
+            profile.shape[1] + 1, or a (batch, profile.shape[1] + 1) array
+            of the last rows of a batch.
+    """
+    batch_codes = np.atleast_2d(left_codes)
+    dtype = _row_score_dtype(batch_codes, profile, gap_penalty)
+    profile = profile.astype(dtype, copy=False)
+    gap_penalty = dtype(gap_penalty)
+    gaps = gap_penalty * np.arange(profile.shape[1] + 1, dtype=dtype)
+    rows = np.tile(gaps, (batch_codes.shape[0], 1))
+    for row_codes in batch_codes.T:
+        diag_weights = profile[row_codes]
+        candidates = rows + gap_penalty
+        np.maximum(
+            candidates[:, 1:], rows[:, :-1] + diag_weights, out=candidates[:, 1:]
+        )
+        rows = np.maximum.accumulate(candidates - gaps, axis=1) + gaps
+
+    rows = rows.astype(np.int64)
+    return rows if np.ndim(left_codes) > 1 else rows[0]
+
+
+def best_local_score(
+    left_codes: np.ndarray,
+    profile: np.ndarray,
+    gap_penalty: int,
+) -> Union[int, np.ndarray]:
+    """Computes the best score of a Smith-Waterman score matrix.
+
+    The rows are computed as in fill_last_row, clamping the scores at zero,
+    and only the previous row is kept in memory.
+
+    Arguments:
+        left_codes (np.ndarray): left sequence (matrix rows) encoded as rows
+            of the profile, or a (batch, length) array of such sequences.
+        profile (np.ndarray): query profile of the right sequence (matrix
+            columns), see query_profile.
+        gap_penalty (int): score value for adding a gap.
+
+    Returns:
+        int -- highest score of the matrix, zero if no score is positive, or
+            an int64 array of the highest scores of a batch.
+    """
+    batch_codes = np.atleast_2d(left_codes)
+    dtype = _row_score_dtype(batch_codes, profile, gap_penalty)
+    profile = profile.astype(dtype, copy=False)
+    gap_penalty = dtype(gap_penalty)
+    gaps = gap_penalty * np.arange(profile.shape[1] + 1, dtype=dtype)
+    rows = np.zeros((batch_codes.shape[0], profile.shape[1] + 1), dtype=dtype)
+    best_scores = np.zeros(batch_codes.shape[0], dtype=dtype)
+    for row_codes in batch_codes.T:
+        diag_weights = profile[row_codes]
+        candidates = rows + gap_penalty
+        np.maximum(
+            candidates[:, 1:], rows[:, :-1] + diag_weights, out=candidates[:, 1:]
+        )
+        np.maximum(candidates, 0, out=candidates)
+        rows = np.maximum.accumulate(candidates - gaps, axis=1) + gaps
+        np.maximum(best_scores, rows.max(axis=1), out=best_scores)
+
+    best_scores = best_scores.astype(np.int64)
+    return best_scores if np.ndim(left_codes) > 1 else int(best_scores[0])
+
+
+# Score of states that cannot be reached, low enough to never be optimal and
+# to never overflow when penalties are added to it.
+UNREACHABLE_SCORE = np.iinfo(np.int64).min // 4
+
+
+def fill_affine_anti_diagonals(
+    left_codes: np.ndarray,
+    profile: np.ndarray,
+    gap_open: int,
+    gap_extend: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Fills the Gotoh score matrices of two sequences.
+
+    Besides the best score of every cell, the best scores of the cells whose
+    alignments end with a gap in either sequence are kept, and a gap of
+    length L scores gap_open + (L - 1) * gap_extend. As in
+    fill_anti_diagonals, the three matrices are filled one anti-diagonal at
+    a time.
+
+    Arguments:
+        left_codes (np.ndarray): left sequence (matrix rows) encoded as rows
+            of the profile.
+        profile (np.ndarray): query profile of the right sequence (matrix
+            columns), see query_profile.
+        gap_open (int): score value for the first element of a gap.
+        gap_extend (int): score value for every further element of a gap.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray] -- int64 matrix of the best scores and
+            uint8 traceback matrix holding for every cell the Direction bits
+            of its best score and the bits (see LEFT_GAP_OPEN and the like)
+            telling whether the gaps ending in it were opened or extended.
+    """
+    row_count: int = len(left_codes) + 1
+    col_count: int = profile.shape[1] + 1
+    score_matrix = np.full((row_count, col_count), UNREACHABLE_SCORE, dtype=np.int64)
+    left_gap_matrix = score_matrix.copy()
+    up_gap_matrix = score_matrix.copy()
+    traceback = np.zeros((row_count, col_count), dtype=np.uint8)
+
+    score_matrix[0, 0] = 0
+    left_gap_matrix[0, 1:] = gap_open + gap_extend * np.arange(col_count - 1)
+    score_matrix[0, 1:] = left_gap_matrix[0, 1:]
+    traceback[0, 1:] = Direction.LEFT.bit | LEFT_GAP_EXTEND
+    traceback[0, 1:2] = Direction.LEFT.bit | LEFT_GAP_OPEN
+    up_gap_matrix[1:, 0] = gap_open + gap_extend * np.arange(row_count - 1)
+    score_matrix[1:, 0] = up_gap_matrix[1:, 0]
+    traceback[1:, 0] = Direction.UP.bit | UP_GAP_EXTEND
+    traceback[1:2, 0] = Direction.UP.bit | UP_GAP_OPEN
+
+    scores = score_matrix.ravel()
+    left_gaps = left_gap_matrix.ravel()
+    up_gaps = up_gap_matrix.ravel()
+    directions = traceback.ravel()
+    for diagonal in range(2, row_count + col_count - 1):
+        rows, cols = anti_diagonal_cells(diagonal, row_count, col_count)
+        cells = rows * col_count + cols
+        diag_weight = profile[left_codes[rows - 1], cols - 1]
+
+        open_left = scores[cells - 1] + gap_open
+        extend_left = left_gaps[cells - 1] + gap_extend
+        left_gap = np.maximum(open_left, extend_left)
+        open_up = scores[cells - col_count] + gap_open
+        extend_up = up_gaps[cells - col_count] + gap_extend
+        up_gap = np.maximum(open_up, extend_up)
+        from_diag = scores[cells - col_count - 1] + diag_weight
+        current_score = np.maximum(np.maximum(left_gap, from_diag), up_gap)
+
+        scores[cells] = current_score
+        left_gaps[cells] = left_gap
+        up_gaps[cells] = up_gap
+        directions[cells] = (
+            (left_gap == current_score) * np.uint8(Direction.LEFT.bit)
+            | (from_diag == current_score) * np.uint8(Direction.DIAG.bit)
+            | (up_gap == current_score) * np.uint8(Direction.UP.bit)
+            | (open_left == left_gap) * np.uint8(LEFT_GAP_OPEN)
+            | (extend_left == left_gap) * np.uint8(LEFT_GAP_EXTEND)
+            | (open_up == up_gap) * np.uint8(UP_GAP_OPEN)
+            | (extend_up == up_gap) * np.uint8(UP_GAP_EXTEND)
+        )
+
+    return score_matrix, traceback
+
+
+def fill_affine_last_row(
+    left_codes: np.ndarray,
+    profile: np.ndarray,
+    gap_open: int,
+    gap_extend: int,
+) -> np.ndarray:
+    """Computes the last row of the best scores of the Gotoh matrices.
+
+    Only the previous row is kept in memory. As long as opening a gap is not
+    cheaper than extending one (gap_open <= gap_extend), the best gap along
+    a row is opened after a cell not ending with such a gap, so
+    E[j] = max over k < j of (D[k] + gap_open + (j - 1 - k) * gap_extend),
+    where D holds the best scores without a gap along the row, which is
+    resolved for a whole row at once with a running maximum. Batches are
+    scored as in fill_last_row.
+
+    Arguments:
+        left_codes (np.ndarray): left sequence (matrix rows) encoded as rows
+            of the profile, or a (batch, length) array of such sequences.
+        profile (np.ndarray): query profile of the right sequence (matrix
+            columns), see query_profile.
+        gap_open (int): score value for the first element of a gap.
+        gap_extend (int): score value for every further element of a gap.
+
+    Returns:
+        np.ndarray -- int64 best scores of the last row, of length
+            profile.shape[1] + 1, or a (batch, profile.shape[1] + 1) array
+            of the last rows of a batch.
+    """
+    batch_codes = np.atleast_2d(left_codes)
+    dtype = _row_score_dtype(batch_codes, profile, gap_open, gap_extend)
+    profile = profile.astype(dtype, copy=False)
+    gap_open, gap_extend = dtype(gap_open), dtype(gap_extend)
+    shape = (batch_codes.shape[0], profile.shape[1] + 1)
+    gaps = gap_extend * np.arange(profile.shape[1] + 1, dtype=dtype)
+    rows = np.empty(shape, dtype=dtype)
+    rows[:, 0] = 0
+    rows[:, 1:] = gap_open + gaps[:-1]
+    up_gaps = np.full(shape, np.iinfo(dtype).min // 4, dtype=dtype)
+    left_gaps = up_gaps.copy()
+    for row_codes in batch_codes.T:
+        diag_weights = profile[row_codes]
+        up_gaps = np.maximum(rows + gap_open, up_gaps + gap_extend)
+        # In the first column the best score is the gap along the column.
+        without_left_gap = up_gaps.copy()
+        np.maximum(
+            without_left_gap[:, 1:],
+            rows[:, :-1] + diag_weights,
+            out=without_left_gap[:, 1:],
+        )
+        best_before = np.maximum.accumulate(without_left_gap - gaps, axis=1)
+        left_gaps[:, 1:] = best_before[:, :-1] + gaps[:-1] + gap_open
+        rows = np.maximum(without_left_gap, left_gaps)
+
+    rows = rows.astype(np.int64)
+    return rows if np.ndim(left_codes) > 1 else rows[0]
+
+
+# Score of the cells lying outside of a band.
+BAND_EXCLUDED_SCORE = UNREACHABLE_SCORE
+
+
+class BandedMatrix:
+    """Class representing a matrix stored only within a diagonal band.
+
+    The cell (row, col) belongs to the band if its diagonal offset col - row
+    lies in [low, high], and is stored at [row, col - row - low] of a dense
+    array of shape (row_count, high - low + 1).
+
+    Attributes:
+        band (np.ndarray): values of the cells within the band.
+        low (int): lowest diagonal offset of the band.
+        shape (Tuple[int, int]): shape of the full matrix.
+        fill_value: value of the cells lying outside of the band.
+    """
+
+    def __init__(
+        self, band: np.ndarray, low: int, shape: Tuple[int, int], fill_value=0
+    ):
+        self.band: np.ndarray = band
+        self.low: int = low
+        self.shape: Tuple[int, int] = shape
+        self.fill_value = fill_value
+
+    def __getitem__(self, cell: Tuple[int, int]):
+        row, col = cell
+        band_col: int = col - row - self.low
+        if 0 <= band_col < self.band.shape[1]:
+            return self.band[row, band_col]
+        return self.fill_value
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        matrix: np.ndarray = np.full(self.shape, self.fill_value, dtype=self.band.dtype)
+        rows, band_cols = np.indices(self.band.shape)
+        cols = rows + band_cols + self.low
+        inside = (cols >= 0) & (cols < self.shape[1])
+        matrix[rows[inside], cols[inside]] = self.band[inside]
+        return matrix if dtype is None else matrix.astype(dtype)
+
+
+def fill_band(
+    left_codes: np.ndarray,
+    profile: np.ndarray,
+    gap_penalty: int,
+    low: int,
+    high: int,
+) -> Tuple[BandedMatrix, BandedMatrix]:
+    """Fills a Needleman-Wunsch score matrix within a diagonal band.
+
+    Only cells whose diagonal offset col - row lies in [low, high] are
+    computed, row by row, with the left-neighbour dependency resolved by a
+    running maximum as in fill_last_row. Cells outside of the band are
+    treated as unreachable.
+
+    Arguments:
+        left_codes (np.ndarray): left sequence (matrix rows) encoded as rows
+            of the profile.
+        profile (np.ndarray): query profile of the right sequence (matrix
+            columns), see query_profile.
+        gap_penalty (int): score value for adding a gap.
+        low (int): lowest diagonal offset of the band, at most 0.
+        high (int): highest diagonal offset of the band, at least
+            profile.shape[1] - len(left_codes).
+
+    Returns:
+        Tuple[BandedMatrix, BandedMatrix] -- int64 score matrix and uint8
+            traceback matrix (see fill_anti_diagonals) stored within the band.
+    """
+    row_count: int = len(left_codes) + 1
+    col_count: int = profile.shape[1] + 1
+    width: int = high - low + 1
+    # An extra excluded column lets the cells of the band's upper edge read
+    # their (excluded) upper neighbour like any other cell.
+    scores = np.full((row_count, width + 1), BAND_EXCLUDED_SCORE, dtype=np.int64)
+    traceback = np.zeros((row_count, width), dtype=np.uint8)
+
+    first_cols = np.arange(min(col_count - 1, high) + 1)
+    scores[0, first_cols - low] = gap_penalty * first_cols
+    traceback[0, first_cols[1:] - low] = Direction.LEFT.bit
+
+    left_bit = np.uint8(Direction.LEFT.bit)
+    diag_bit = np.uint8(Direction.DIAG.bit)
+    up_bit = np.uint8(Direction.UP.bit)
+    row_gaps = gap_penalty * np.arange(width, dtype=np.int64)
+    for row in range(1, row_count):
+        first_col: int = max(0, row + low)
+        last_col: int = min(col_count - 1, row + high)
+        if first_col > last_col:
+            continue
+
+        band_first_col: int = first_col - row - low
+        if first_col == 0:
+            scores[row, band_first_col] = gap_penalty * row
+            traceback[row, band_first_col] = Direction.UP.bit
+            first_col, band_first_col = 1, band_first_col + 1
+            if first_col > last_col:
+                continue
+
+        band_cols = slice(band_first_col, band_first_col + last_col - first_col + 1)
+        up_cols = slice(band_cols.start + 1, band_cols.stop + 1)
+        previous_col: int = first_col - 1
+        diag_weight = profile[left_codes[row - 1], previous_col:last_col]
+        from_diag = scores[row - 1, band_cols] + diag_weight
+        from_up = scores[row - 1, up_cols] + gap_penalty
+        candidates = np.maximum(from_diag, from_up)
+        # The left neighbour of the first computed cell is the column 0 cell or
+        # lies outside of the band.
+        before = scores[row, band_first_col - 1] if band_first_col > 0 else None
+        if before is not None:
+            candidates[0] = max(candidates[0], before + gap_penalty)
+        gaps = row_gaps[: len(candidates)]
+        current_score = np.maximum.accumulate(candidates - gaps) + gaps
+        scores[row, band_cols] = current_score
+
+        from_left = np.empty_like(current_score)
+        from_left[1:] = current_score[:-1] + gap_penalty
+        from_left[0] = BAND_EXCLUDED_SCORE if before is None else before + gap_penalty
+        traceback[row, band_cols] = (
+            (from_left == current_score) * left_bit
+            | (from_diag == current_score) * diag_bit
+            | (from_up == current_score) * up_bit
+        )
+
+    shape = (row_count, col_count)
+    return (
+        BandedMatrix(scores[:, :width], low, shape, BAND_EXCLUDED_SCORE),
+        BandedMatrix(traceback, low, shape),
+    )
@@ -0,0 +1,287 @@
+from typing import Iterable, List, TextIO, Tuple
+
+import numpy as np
+
+from .alignment import BaseAlignment
+from .sequence import Sequence
+
+# Size of the text gathered before it is written to the stream, in characters.
+WRITE_BUFFER_SIZE = 1 << 16
+
+_GAP = ord("-")
+
+# Width of the label and of the start position at the beginning of the
+# lines of a block.
+_LABEL_WIDTH = 10
+_POSITION_WIDTH = 8
+
+
+def _symbols(row) -> np.ndarray:
+    return np.frombuffer(str(row).encode("latin-1"), dtype=np.uint8)
+
+
+def format_blocks(
+    alignment: BaseAlignment, width: int, labels: Tuple[str, str] = ("a", "b")
+) -> str:
+    """Formats an alignment wrapped in blocks of a fixed number of columns.
+
+    As in the EMBOSS pair format, every block holds the columns of both
+    sequences, each preceded by its label and the position of its first
+    symbol and followed by the position of its last one, with a line
+    between them marking identical symbols with | and mismatches with a dot.
+    Positions are counted from 1 in the whole sequences, so that the blocks
+    of a local alignment start at its first aligned symbols.
+
+    Arguments:
+        alignment (BaseAlignment): alignment to format.
+        width (int): number of columns of a block.
+        labels (Tuple[str, str]): names of the left and right sequences.
+
+    Returns:
+        str -- blocks separated by empty lines.
+    """
+    left_symbols: np.ndarray = _symbols(alignment.left_sequence_alignment)
+    right_symbols: np.ndarray = _symbols(alignment.right_sequence_alignment)
+    markup: np.ndarray = np.where(
+        left_symbols == right_symbols, ord("|"), ord(".")
+    ).astype(np.uint8)
+    markup[(left_symbols == _GAP) | (right_symbols == _GAP)] = ord(" ")
+    # Position of the last symbol of each sequence up to every column.
+    left_ends: np.ndarray = alignment.left_start + np.cumsum(left_symbols != _GAP)
+    right_ends: np.ndarray = alignment.right_start + np.cumsum(right_symbols != _GAP)
+
+    blocks: List[str] = []
+    indent: str = " " * (_LABEL_WIDTH + _POSITION_WIDTH + 1)
+    for start in range(0, len(markup), width):
+        stop: int = min(start + width, len(markup))
+        lines: List[str] = []
+        for label, symbols, ends in (
+            (labels[0], left_symbols, left_ends),
+            (labels[1], right_symbols, right_ends),
+        ):
+            end: int = int(ends[stop - 1])
+            # A block without any symbol of a sequence starts where it ends.
+            first: int = min(int(ends[start]) - (symbols[start] != _GAP) + 1, end)
+            columns: str = symbols[start:stop].tobytes().decode("latin-1")
+            lines.append(
+                f"{label:<{_LABEL_WIDTH}}{first:>{_POSITION_WIDTH}} {columns} {end}"
+            )
+        block_markup: str = markup[start:stop].tobytes().decode("latin-1")
+        lines.insert(1, (indent + block_markup).rstrip())
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
+
+
+class AlignmentWriter:
+    """Class writing an alignment result incrementally to a text stream.
+
+    The score is written first and then every alignment as soon as it is
+    given, so that alignments produced lazily (see iter_align) are never
+    all held in memory. Small writes are gathered in a buffer written once
+    it holds WRITE_BUFFER_SIZE characters. The text is the same as the one
+    of str(SequenceAlignmentResult) followed by a new line, unless a width
+    is given.
+
+    Attributes:
+        stream (TextIO): stream the result is written to.
+        width (int): number of columns of the blocks alignments are wrapped
+            in, see format_blocks, None to write each row on a single line.
+        labels (Tuple[str, str]): names of the sequences of wrapped blocks.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO,
+        width: int = None,
+        labels: Tuple[str, str] = ("a", "b"),
+        buffer_size: int = WRITE_BUFFER_SIZE,
+    ):
+        self.stream: TextIO = stream
+        self.width: int = width
+        self.labels: Tuple[str, str] = labels
+        self.alignment_count: int = 0
+        self._buffer_size: int = buffer_size
+        self._buffer: List[str] = []
+        self._buffered: int = 0
+
+    def _write(self, text: str):
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self._buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered text to the stream."""
+        if self._buffer:
+            self.stream.write("".join(self._buffer))
+            self._buffer.clear()
+            self._buffered = 0
+
+    def write_score(self, score: int):
+        self._write(f"Score = {int(score)}")
+
+    def write_alignment(self, alignment: BaseAlignment):
+        text: str = (
+            str(alignment)
+            if self.width is None
+            else format_blocks(alignment, self.width, self.labels)
+        )
+        self._write("\n\n")
+        self._write(text)
+        self.alignment_count += 1
+
+    def write_end(self):
+        self._write("\n")
+
+    def write_result(self, score: int, alignments: Iterable[BaseAlignment]) -> int:
+        """Writes a whole result, consuming the alignments one at a time.
+
+        Arguments:
+            score (int): alignment score value.
+            alignments (Iterable[BaseAlignment]): alignments to write.
+
+        Returns:
+            int -- number of written alignments.
+        """
+        self.write_score(score)
+        for alignment in alignments:
+            self.write_alignment(alignment)
+        self.write_end()
+        self.flush()
+        return self.alignment_count
+
+
+class CigarWriter(AlignmentWriter):
+    """Class writing alignments as CIGAR strings, see Alignment.cigar.
+
+    The score line is followed by a line per alignment holding the 1-based
+    positions of the first aligned symbols of the left and right sequences
+    and the CIGAR string, separated by tabs.
+    """
+
+    def write_alignment(self, alignment: BaseAlignment):
+        self._write("\n\n" if self.alignment_count == 0 else "\n")
+        self._write(
+            f"{alignment.left_start + 1}\t{alignment.right_start + 1}\t"
+            f"{alignment.cigar}"
+        )
+        self.alignment_count += 1
+
+
+class SamWriter(AlignmentWriter):
+    """Class writing alignments in the SAM format.
+
+    The left sequence is the reference and the right one the query, named
+    by the labels. Every alignment is a record of the whole query, whose
+    unaligned ends are soft clipped, with the score in the AS tag. All but
+    the first of co-optimal alignments are flagged as secondary. An empty
+    alignment, e.g. a local one scoring 0, is written as an unmapped record.
+
+    Attributes:
+        left_sequence (Sequence): reference sequence.
+        right_sequence (Sequence): query sequence.
+    """
+
+    _UNMAPPED = 4
+    _SECONDARY = 256
+
+    def __init__(
+        self,
+        stream: TextIO,
+        left_sequence: Sequence,
+        right_sequence: Sequence,
+        labels: Tuple[str, str] = ("a", "b"),
+        buffer_size: int = WRITE_BUFFER_SIZE,
+    ):
+        super().__init__(stream, labels=labels, buffer_size=buffer_size)
+        self.left_sequence: Sequence = left_sequence
+        self.right_sequence: Sequence = right_sequence
+        self._score: int = None
+
+    def write_score(self, score: int):
+        self._score = int(score)
+        self._write(
+            "@HD\tVN:1.6\tSO:unsorted\n"
+            f"@SQ\tSN:{self.labels[0]}\tLN:{len(self.left_sequence)}\n"
+            "@PG\tID:bioinf\tPN:bioinf\n"
+        )
+
+    def write_alignment(self, alignment: BaseAlignment):
+        if not alignment.cigar:
+            self._write_unmapped()
+            return
+
+        query_length: int = len(self.right_sequence)
+        clipped_end: int = query_length - alignment.right_end
+        cigar: str = (
+            (f"{alignment.right_start}S" if alignment.right_start else "")
+            + alignment.cigar
+            + (f"{clipped_end}S" if clipped_end else "")
+        )
+        fields = (
+            self.labels[1],
+            self._SECONDARY if self.alignment_count else 0,
+            self.labels[0],
+            alignment.left_start + 1,
+            255,
+            cigar,
+            "*",
+            0,
+            0,
+            str(self.right_sequence) or "*",
+            "*",
+            f"AS:i:{self._score}",
+        )
+        self._write("\t".join(map(str, fields)) + "\n")
+        self.alignment_count += 1
+
+    def _write_unmapped(self):
+        fields = (
+            self.labels[1],
+            self._UNMAPPED,
+            "*",
+            0,
+            0,
+            "*",
+            "*",
+            0,
+            0,
+            str(self.right_sequence) or "*",
+            "*",
+            f"AS:i:{self._score}",
+        )
+        self._write("\t".join(map(str, fields)) + "\n")
+        self.alignment_count += 1
+
+    def write_end(self):
+        pass
+
+
+FORMATS: Tuple[str, ...] = ("pretty", "cigar", "sam")
+
+
+def create_writer(
+    output_format: str,
+    stream: TextIO,
+    left_sequence: Sequence,
+    right_sequence: Sequence,
+    width: int = None,
+) -> AlignmentWriter:
+    """Creates the writer of an output format.
+
+    Arguments:
+        output_format (str): name of the format, see FORMATS.
+        stream (TextIO): stream the result is written to.
+        left_sequence (Sequence): first aligned sequence.
+        right_sequence (Sequence): second aligned sequence.
+        width (int): number of columns of wrapped blocks, only used by the
+            pretty format.
+
+    Returns:
+        AlignmentWriter -- writer of the format.
+    """
+    if output_format == "sam":
+        return SamWriter(stream, left_sequence, right_sequence)
+    if output_format == "cigar":
+        return CigarWriter(stream)
+    return AlignmentWriter(stream, width)
@@ -1,6 +1,9 @@
-from copy import deepcopy
 from enum import Enum
-from typing import Dict, List, Tuple
+from itertools import islice
+from random import Random
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
 
 
 class Direction(Enum):
@@ -11,76 +14,419 @@ class Direction(Enum):
     LEFT = 1
     UP = 2
 
+    @property
+    def bit(self) -> int:
+        """Flag representing the direction in a traceback matrix cell."""
+        return 1 << self.value
+
+
+_DIRECTIONS_BY_VALUE: Tuple[Direction, ...] = tuple(
+    sorted(Direction, key=lambda direction: direction.value)
+)
+
 
 class Path:
-    """Class representing a Path -- a list of directions.
+    """Class representing a Path -- an immutable sequence of directions.
 
     Attributes:
-        _directions (List[Direction]): list of direction of which the
+        _directions (bytes): values of the directions of which the
             path is composed.
     """
 
-    def __init__(self, directions: List[Direction] = None):
-        self._directions = [] if directions is None else directions.copy()
+    __slots__ = ("_directions",)
+
+    def __init__(self, directions: Iterable[Direction] = None):
+        self._directions: bytes = (
+            b""
+            if directions is None
+            else bytes(direction.value for direction in directions)
+        )
 
-    def __iter__(self):
-        return iter(self._directions)
+    def __iter__(self) -> Iterator[Direction]:
+        return (_DIRECTIONS_BY_VALUE[value] for value in self._directions)
 
-    def append(self, direction: Direction) -> None:
-        self._directions.append(direction)
+    def __len__(self) -> int:
+        return len(self._directions)
 
-    def copy(self):
-        return deepcopy(self)
+    def __bytes__(self) -> bytes:
+        return self._directions
 
-    def pop(self) -> Direction:
-        return self._directions.pop()
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Path) and self._directions == other._directions
+
+    def __hash__(self) -> int:
+        return hash(self._directions)
+
+    @classmethod
+    def from_bytes(cls, directions: bytes) -> "Path":
+        path = cls()
+        path._directions = bytes(directions)
+        return path
 
     @classmethod
     def empty(cls):
-        return cls([])
+        return cls()
+
+
+TRACEBACK_ORDER: List[Direction] = [Direction.LEFT, Direction.DIAG, Direction.UP]
+
+_DECODED_DIRECTIONS: List[Tuple[Direction, ...]] = [
+    tuple(direction for direction in TRACEBACK_ORDER if directions & direction.bit)
+    for directions in range(1 << len(Direction))
+]
+
+
+def decode_directions(directions: int) -> Tuple[Direction, ...]:
+    """Decodes the bits stored in a traceback matrix cell.
+
+    Arguments:
+        directions (int): bits of the directions available in a cell.
+
+    Returns:
+        Tuple[Direction, ...] -- available directions in traceback order.
+    """
+    return _DECODED_DIRECTIONS[directions]
+
+
+def _count_row_paths(directions: np.ndarray, above: np.ndarray) -> np.ndarray:
+    # Counts the paths from the cells of a row to a first cell, given the
+    # counts of the row above. The diagonal and up moves are added at once,
+    # then the left moves chain the cells of a row: the count of a cell adds
+    # up the diagonal and up counts back to the first cell of its chain.
+    from_diag = np.where(directions[1:] & Direction.DIAG.bit, above[:-1], 0)
+    from_above = np.where(directions & Direction.UP.bit, above, 0)
+    from_above[1:] += from_diag
+    # Cells without any direction are where the paths end.
+    from_above = np.where(directions, from_above, 1)
+    chained = directions & Direction.LEFT.bit != 0
+    chained[0] = False
+    cols = np.arange(len(directions))
+    chain_starts = np.maximum.accumulate(np.where(chained, 0, cols))
+    totals = np.cumsum(from_above)
+    before_starts = np.concatenate(([0], totals[:-1]))[chain_starts]
+    return totals - before_starts
+
+
+_CELL_OFFSETS = {
+    Direction.LEFT: (0, -1),
+    Direction.DIAG: (-1, -1),
+    Direction.UP: (-1, 0),
+}
 
 
 class PathFinder:
+    """Class retrieving paths from a traceback matrix.
+
+    Paths are enumerated depth first with an explicit stack, so their length
+    is not bounded by the recursion limit, and are yielded lazily. A path
+    ends in the first cell holding no directions, which is the (0, 0) cell
+    of a global alignment and any zero score cell of a local one.
+
+    The paths are counted for every cell at once, to draw or retrieve a
+    path by its position without enumerating the previous ones. When the
+    traceback is read a block of rows at a time (see BlockedMatrix), only
+    the counts of the row above each block are kept, and the counts of a
+    block are computed again from them when a path walks through it.
+
+    Attributes:
+        _traceback (np.ndarray): uint8 matrix holding for every cell the bits
+            of the directions leading to its optimal score. Any object
+            indexable by cells and convertible to an array, such as a
+            BandedMatrix, or reading blocks of rows, such as a BlockedMatrix,
+            can be used.
+    """
+
     def __init__(
-        self,
-        adjacency_list: Dict[Tuple[int, int], List[Direction]],
-        last_cell: Tuple[int, int],
-        max_number_path: int,
+        self, traceback: np.ndarray, last_cell: Tuple[int, int], max_number_path: int
     ):
-        self._adjacency_list: Dict[Tuple[int, int], List[Direction]] = adjacency_list
+        self._traceback: np.ndarray = traceback
         self._last_cell: Tuple[int, int] = last_cell
         self._max_number_path: int = max_number_path
-        self._stop_flag = False
+        self._path_counts: np.ndarray = None
+        # Path counts of a traceback read in blocks of rows: the counts of
+        # the row above every block, and of the rows of the last read block.
+        self._blocked: bool = hasattr(traceback, "read_block")
+        self._boundary_counts: Dict[int, np.ndarray] = None
+        self._block_counts: Tuple[int, np.ndarray] = None
+
+    @property
+    def last_cell(self) -> Tuple[int, int]:
+        """Cell in which all the paths start."""
+        return self._last_cell
 
     def _get_next_cell(
         self, current_cell: Tuple[int, int], direction: Direction
     ) -> Tuple[int, int]:
-        mappings = {
-            Direction.LEFT: (current_cell[0], current_cell[1] - 1),
-            Direction.DIAG: (current_cell[0] - 1, current_cell[1] - 1),
-            Direction.UP: (current_cell[0] - 1, current_cell[1]),
-        }
-
-        return mappings[direction]
-
-    def _find_all_paths_helper(self, current_cell: Tuple[int, int]) -> None:
-        if current_cell == (0, 0):
-            self._paths.append(self._current_path.copy())
-            if len(self._paths) >= self._max_number_path:
-                self._stop_flag = True
+        row_offset, col_offset = _CELL_OFFSETS[direction]
+        return current_cell[0] + row_offset, current_cell[1] + col_offset
+
+    # The traceback is walked over nodes, which are cells of the matrix here
+    # and also hold the traceback state in subclasses. Every move leads to the
+    # next node and adds a single direction to the path.
+
+    def _first_node(self) -> Tuple[int, ...]:
+        return self._last_cell
+
+    def _moves(self, node: Tuple[int, ...]) -> List[Tuple[Direction, Tuple[int, ...]]]:
+        return [
+            (direction, self._get_next_cell(node, direction))
+            for direction in decode_directions(self._traceback[node])
+        ]
+
+    def iter_paths(self) -> Iterator[Path]:
+        """Yields all paths leading from the last cell to a first one.
+
+        Returns:
+            Iterator[Path] -- paths in depth first order.
+        """
+        first_moves = self._moves(self._first_node())
+        if not first_moves:
+            yield Path.empty()
             return
 
-        for direction in self._adjacency_list[current_cell]:
-            if self._stop_flag:
-                return
-            next_cell: Tuple[int, int] = self._get_next_cell(current_cell, direction)
-            self._current_path.append(direction)
-            self._find_all_paths_helper(next_cell)
-            self._current_path.pop()
+        current_path: bytearray = bytearray()
+        stack: List[Iterator[Tuple[Direction, Tuple[int, ...]]]] = [iter(first_moves)]
+        while stack:
+            move = next(stack[-1], None)
+            if move is None:
+                stack.pop()
+                if current_path:
+                    current_path.pop()
+                continue
+
+            direction, next_node = move
+            current_path.append(direction.value)
+            next_moves = self._moves(next_node)
+            if not next_moves:
+                yield Path.from_bytes(bytes(current_path))
+                current_path.pop()
+                continue
+
+            stack.append(iter(next_moves))
+
+    def _count_paths_to_first_cell(self) -> np.ndarray:
+        row_count, col_count = self._traceback.shape
+        # The counts are padded with a zero row and column, so that moves
+        # leaving the matrix contribute nothing.
+        path_counts = np.zeros((row_count + 1, col_count + 1), dtype=object)
+        counts = path_counts.ravel()
+        traceback = np.asarray(self._traceback).ravel()
+        stride = col_count + 1
+        for diagonal in range(row_count + col_count - 1):
+            rows = np.arange(
+                max(0, diagonal - col_count + 1), min(row_count - 1, diagonal) + 1
+            )
+            cols = diagonal - rows
+            directions = traceback[rows * col_count + cols]
+            cells = (rows + 1) * stride + cols + 1
+            from_left = np.where(directions & Direction.LEFT.bit, counts[cells - 1], 0)
+            from_diag = np.where(
+                directions & Direction.DIAG.bit, counts[cells - stride - 1], 0
+            )
+            from_up = np.where(directions & Direction.UP.bit, counts[cells - stride], 0)
+            # Cells without any direction are where the paths end.
+            counts[cells] = np.where(directions, from_left + from_diag + from_up, 1)
+        return path_counts[1:, 1:]
+
+    def _get_path_counts(self) -> np.ndarray:
+        if self._path_counts is None:
+            self._path_counts = self._count_paths_to_first_cell()
+        return self._path_counts
+
+    def _count_block_paths(self, block_start: int, above: np.ndarray) -> np.ndarray:
+        # Rows below the last cell are not reached by any path.
+        row_stop: int = self._last_cell[0] + 1 - block_start
+        block: np.ndarray = self._traceback.read_block(block_start)[:row_stop]
+        path_counts = np.empty(block.shape, dtype=object)
+        for row, directions in enumerate(block):
+            above = path_counts[row] = _count_row_paths(directions, above)
+        return path_counts
+
+    def _get_boundary_counts(self) -> Dict[int, np.ndarray]:
+        if self._boundary_counts is None:
+            block_rows: int = self._traceback.block_rows
+            above = np.zeros(self._traceback.shape[1], dtype=object)
+            self._boundary_counts = {}
+            for block_start in range(0, self._last_cell[0] + 1, block_rows):
+                self._boundary_counts[block_start] = above
+                above = self._count_block_paths(block_start, above)[-1]
+        return self._boundary_counts
+
+    def _count_node_paths(self, node: Tuple[int, ...]) -> int:
+        if not self._blocked:
+            return self._get_path_counts()[node]
+        row, col = node
+        block_start: int = row - row % self._traceback.block_rows
+        if self._block_counts is None or self._block_counts[0] != block_start:
+            # Paths only walk up, so every block is counted once per walk.
+            above: np.ndarray = self._get_boundary_counts()[block_start]
+            self._block_counts = (
+                block_start,
+                self._count_block_paths(block_start, above),
+            )
+        return self._block_counts[1][row - block_start, col]
+
+    def count_paths(self) -> int:
+        """Counts all paths leading from the last cell to a first one.
+
+        The counts are computed for every cell in a single pass over the
+        traceback matrix using arbitrary precision integers.
+
+        Returns:
+            int -- number of paths.
+        """
+        return self._count_node_paths(self._first_node())
+
+    def path_at(self, index: int) -> Path:
+        """Retrieves a path by its position in the depth first order.
+
+        Arguments:
+            index (int): position of the path, the same as in iter_paths.
+
+        Raises:
+            IndexError: When the index is not lower than the number of paths.
+
+        Returns:
+            Path -- path at the given position.
+        """
+        current_node: Tuple[int, ...] = self._first_node()
+        if not 0 <= index < self._count_node_paths(current_node):
+            raise IndexError(f"Path index {index} is out of range")
+
+        current_path: bytearray = bytearray()
+        moves = self._moves(current_node)
+        while moves:
+            for direction, next_node in moves:
+                path_count: int = self._count_node_paths(next_node)
+                if index < path_count:
+                    break
+                index -= path_count
+            current_path.append(direction.value)
+            moves = self._moves(next_node)
+
+        return Path.from_bytes(bytes(current_path))
+
+    def sample_path(self, random: Random = None) -> Path:
+        """Draws a path uniformly at random.
+
+        Arguments:
+            random (Random): source of randomness, a new one is used if missing.
+
+        Returns:
+            Path -- randomly chosen path.
+        """
+        random = Random() if random is None else random
+        return self.path_at(random.randrange(self.count_paths()))
+
+    def iter_found_paths(self) -> Iterator[Path]:
+        """Lazily yields the paths returned by find_all_paths."""
+        return islice(self.iter_paths(), max(self._max_number_path, 1))
 
     def find_all_paths(self) -> List[Path]:
-        self._paths: List[Path] = []
-        self._current_path: Path = Path.empty()
-        self._find_all_paths_helper(self._last_cell)
+        return list(self.iter_found_paths())
+
+
+# Bits of an affine traceback matrix cell telling how the best scores of the
+# gap states were reached, next to the Direction bits of the best cell score.
+LEFT_GAP_OPEN = 1 << 3
+LEFT_GAP_EXTEND = 1 << 4
+UP_GAP_OPEN = 1 << 5
+UP_GAP_EXTEND = 1 << 6
+
+_DIRECTION_BITS = Direction.DIAG.bit | Direction.LEFT.bit | Direction.UP.bit
+
+# Traceback states of AffinePathFinder: the best score of a cell, the same
+# when reached by opening a gap (so that it is not continued by a gap in the
+# same direction, which is an extension instead) and the two gap states.
+_BEST, _BEST_NO_LEFT, _BEST_NO_UP, _LEFT_GAP, _UP_GAP = range(5)
+
+
+class AffinePathFinder(PathFinder):
+    """Class retrieving paths from an affine gap traceback matrix.
+
+    Every cell holds the Direction bits of its best score, where LEFT and UP
+    mean that the best score ends with a gap, and the LEFT_GAP_* and
+    UP_GAP_* bits telling whether that gap was opened in the cell or
+    extended from the previous one. The traceback walks over (state, row,
+    col) nodes, so every path is yielded exactly once.
+
+    Attributes:
+        _traceback (np.ndarray): uint8 affine traceback matrix.
+    """
+
+    def _first_node(self) -> Tuple[int, ...]:
+        return (_BEST,) + tuple(self._last_cell)
+
+    def _can_open_gap(self, row: int, col: int, continued: int) -> bool:
+        # A gap may be opened after a best score not ending with a gap in the
+        # same direction, or at the first cell.
+        directions: int = int(self._traceback[row, col]) & _DIRECTION_BITS
+        return directions == 0 or directions & ~continued != 0
+
+    def _gap_moves(
+        self, row: int, col: int, direction: Direction
+    ) -> List[Tuple[Direction, Tuple[int, ...]]]:
+        bits: int = int(self._traceback[row, col])
+        if direction == Direction.LEFT:
+            open_bit, extend_bit = LEFT_GAP_OPEN, LEFT_GAP_EXTEND
+            opened_state, gap_state = _BEST_NO_LEFT, _LEFT_GAP
+        else:
+            open_bit, extend_bit = UP_GAP_OPEN, UP_GAP_EXTEND
+            opened_state, gap_state = _BEST_NO_UP, _UP_GAP
+        next_row, next_col = self._get_next_cell((row, col), direction)
+
+        moves: List[Tuple[Direction, Tuple[int, ...]]] = []
+        if bits & open_bit and self._can_open_gap(next_row, next_col, direction.bit):
+            moves.append((direction, (opened_state, next_row, next_col)))
+        if bits & extend_bit:
+            moves.append((direction, (gap_state, next_row, next_col)))
+        return moves
+
+    def _moves(self, node: Tuple[int, ...]) -> List[Tuple[Direction, Tuple[int, ...]]]:
+        state, row, col = node
+        if state == _LEFT_GAP:
+            return self._gap_moves(row, col, Direction.LEFT)
+        if state == _UP_GAP:
+            return self._gap_moves(row, col, Direction.UP)
+
+        moves: List[Tuple[Direction, Tuple[int, ...]]] = []
+        bits: int = int(self._traceback[row, col])
+        for direction in decode_directions(bits & _DIRECTION_BITS):
+            if direction == Direction.DIAG:
+                moves.append((direction, (_BEST, row - 1, col - 1)))
+            elif (direction == Direction.LEFT and state != _BEST_NO_LEFT) or (
+                direction == Direction.UP and state != _BEST_NO_UP
+            ):
+                moves.extend(self._gap_moves(row, col, direction))
+        return moves
+
+    def _count_paths_to_first_cell(self) -> np.ndarray:
+        row_count, col_count = self._traceback.shape
+        path_counts = np.zeros((5, row_count + 1, col_count + 1), dtype=object)
+        best, best_no_left, best_no_up, left_gap, up_gap = (
+            path_counts[state].ravel() for state in range(5)
+        )
+        traceback = np.asarray(self._traceback).ravel()
+        stride = col_count + 1
+        for diagonal in range(row_count + col_count - 1):
+            rows = np.arange(
+                max(0, diagonal - col_count + 1), min(row_count - 1, diagonal) + 1
+            )
+            cols = diagonal - rows
+            bits = traceback[rows * col_count + cols]
+            cells = (rows + 1) * stride + cols + 1
+            left_gap[cells] = np.where(
+                bits & LEFT_GAP_OPEN, best_no_left[cells - 1], 0
+            ) + np.where(bits & LEFT_GAP_EXTEND, left_gap[cells - 1], 0)
+            up_gap[cells] = np.where(
+                bits & UP_GAP_OPEN, best_no_up[cells - stride], 0
+            ) + np.where(bits & UP_GAP_EXTEND, up_gap[cells - stride], 0)
 
-        return self._paths
+            from_left = np.where(bits & Direction.LEFT.bit, left_gap[cells], 0)
+            from_diag = np.where(bits & Direction.DIAG.bit, best[cells - stride - 1], 0)
+            from_up = np.where(bits & Direction.UP.bit, up_gap[cells], 0)
+            ends = (bits & _DIRECTION_BITS) == 0
+            best[cells] = np.where(ends, 1, from_left + from_diag + from_up)
+            best_no_left[cells] = np.where(ends, 1, from_diag + from_up)
+            best_no_up[cells] = np.where(ends, 1, from_left + from_diag)
+        return path_counts[:, 1:, 1:]
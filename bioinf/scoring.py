@@ -0,0 +1,157 @@
+from typing import Tuple
+
+import numpy as np
+
+from .sequence import Alphabet
+
+
+class SubstitutionMatrix:
+    """Class representing a substitution matrix, such as BLOSUM62 or PAM250.
+
+    The matrix has to be symmetric. Symbols are looked up case-insensitively,
+    lowercase (e.g. soft-masked) symbols scoring the same as uppercase ones.
+
+    Attributes:
+        alphabet (Alphabet): symbols of the rows and columns of the matrix.
+        scores (np.ndarray): int64 matrix of scores of pairs of symbols.
+    """
+
+    def __init__(self, symbols: str, scores: np.ndarray):
+        scores = np.asarray(scores, dtype=np.int64)
+        if scores.shape != (len(symbols), len(symbols)):
+            raise ValueError(
+                f"A substitution matrix of {len(symbols)} symbols should be square"
+            )
+        if not np.array_equal(scores, scores.T):
+            raise ValueError("A substitution matrix should be symmetric")
+        self.alphabet: Alphabet = Alphabet(symbols.upper())
+        self.scores: np.ndarray = scores
+
+    def _encode(self, symbols: np.ndarray) -> np.ndarray:
+        lowercase = (symbols >= ord("a")) & (symbols <= ord("z"))
+        return self.alphabet.encode_bytes(
+            np.where(lowercase, symbols - (ord("a") - ord("A")), symbols)
+        )
+
+    def profile(self, symbols: np.ndarray, query_codes: np.ndarray) -> np.ndarray:
+        """Gathers the scores of the given symbols against a query.
+
+        Arguments:
+            symbols (np.ndarray): byte values of the symbols (profile rows).
+            query_codes (np.ndarray): byte values of the query sequence.
+
+        Raises:
+            UnknownSymbolError: When a symbol is missing from the matrix.
+
+        Returns:
+            np.ndarray -- int64 scores of shape (len(symbols), len(query_codes)).
+        """
+        return self.scores[np.ix_(self._encode(symbols), self._encode(query_codes))]
+
+
+def _symbol_scores(
+    symbols: np.ndarray,
+    right_codes: np.ndarray,
+    same: int,
+    diff: int,
+    substitution_matrix: SubstitutionMatrix,
+) -> np.ndarray:
+    if substitution_matrix is None:
+        scores = np.where(symbols[:, np.newaxis] == right_codes, same, diff)
+    else:
+        scores = substitution_matrix.profile(symbols, right_codes)
+    return scores.astype(np.int64, copy=False).reshape(len(symbols), len(right_codes))
+
+
+def query_profile(
+    left_codes: np.ndarray,
+    right_codes: np.ndarray,
+    same: int,
+    diff: int,
+    substitution_matrix: SubstitutionMatrix = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Precomputes the scores of the symbols of a sequence against a query.
+
+    The profile holds a row of scores against every element of the query
+    (the right sequence) for each distinct symbol of the left sequence, so
+    the scores of whole rows or anti-diagonals of a score matrix are gathered
+    from it at once instead of being looked up cell by cell.
+
+    Arguments:
+        left_codes (np.ndarray): encoded left sequence.
+        right_codes (np.ndarray): encoded right sequence (the query).
+        same (int): score value for a sequence same.
+        diff (int): score value for a sequence diff.
+        substitution_matrix (SubstitutionMatrix): scores of pairs of symbols,
+            used instead of same and diff when given. The codes are then
+            byte values of the symbols.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray] -- left sequence encoded as rows of the
+            profile, and the int64 profile of shape (symbols, len(right_codes)).
+    """
+    symbols, profile_rows = np.unique(left_codes, return_inverse=True)
+    profile = _symbol_scores(symbols, right_codes, same, diff, substitution_matrix)
+    return profile_rows.reshape(-1), profile
+
+
+class QueryProfile:
+    """Class representing the profile of a query aligned to many sequences.
+
+    The profile is built once for the query and only extended with the rows
+    of the symbols not seen in the previous sequences, which are encoded as
+    rows of the profile (see query_profile).
+
+    Attributes:
+        profile (np.ndarray): int64 scores of the symbols seen so far (rows)
+            against every element of the query.
+        _rows (np.ndarray): row of the profile of every byte value, -1 for
+            symbols not seen yet.
+        _best_scores (np.ndarray): highest score of every row.
+    """
+
+    def __init__(
+        self,
+        query_codes: np.ndarray,
+        same: int,
+        diff: int,
+        substitution_matrix: SubstitutionMatrix = None,
+    ):
+        self._query_codes: np.ndarray = query_codes
+        self._same: int = same
+        self._diff: int = diff
+        self._substitution_matrix: SubstitutionMatrix = substitution_matrix
+        self.profile: np.ndarray = np.empty((0, len(query_codes)), dtype=np.int64)
+        self._rows: np.ndarray = np.full(256, -1, dtype=np.intp)
+        self._best_scores: np.ndarray = np.empty(0, dtype=np.int64)
+
+    def encode(self, codes: np.ndarray) -> np.ndarray:
+        """Encodes a sequence as rows of the profile, extending it if needed.
+
+        Arguments:
+            codes (np.ndarray): encoded sequence.
+
+        Returns:
+            np.ndarray -- rows of the profile of the sequence elements.
+        """
+        rows: np.ndarray = self._rows[codes]
+        if np.any(rows < 0):
+            symbols: np.ndarray = np.unique(codes[rows < 0])
+            scores: np.ndarray = _symbol_scores(
+                symbols,
+                self._query_codes,
+                self._same,
+                self._diff,
+                self._substitution_matrix,
+            )
+            self._rows[symbols] = len(self.profile) + np.arange(len(symbols))
+            self.profile = np.concatenate([self.profile, scores])
+            self._best_scores = np.concatenate(
+                [self._best_scores, scores.max(axis=1, initial=np.iinfo(np.int64).min)]
+            )
+            rows = self._rows[codes]
+        return rows
+
+    def best_score(self, rows: np.ndarray) -> int:
+        """Returns the highest score of the given rows of the profile."""
+        return int(self._best_scores[rows].max(initial=np.iinfo(np.int64).min))
@@ -0,0 +1,171 @@
+import heapq
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from .kernels import batch_size
+from .scoring import QueryProfile
+from .sequence import Sequence
+from .sequence_alignment import (
+    SequenceAlignmentAlgorithmConfig,
+    SequenceAlignmentResult,
+    TooLongSequenceError,
+    create_algorithm,
+)
+from .stats import phase
+
+
+@dataclass
+class SearchHit:
+    """Class representing a database sequence found by a search.
+
+    Attributes:
+        index (int): position of the sequence in the database.
+        description (str): description of the sequence.
+        score (int): alignment score of the query and the sequence.
+        result (SequenceAlignmentResult): alignments of the sequence and the
+            query, in the orientation in which the score was computed.
+    """
+
+    index: int
+    description: str
+    score: int
+    result: SequenceAlignmentResult = None
+
+    def __str__(self):
+        return f"# {self.description}\n{self.result}"
+
+
+@dataclass
+class SearchResult:
+    """Class representing the outcome of a search.
+
+    Attributes:
+        hits (List[SearchHit]): best hits, in decreasing score order.
+        target_count (int): number of database sequences.
+        scored_count (int): number of sequences whose score was computed, the
+            others were pruned by their score bound or skipped.
+        skipped (List[str]): descriptions of the sequences longer than the
+            max_seq_length of the config.
+    """
+
+    hits: List[SearchHit]
+    target_count: int = 0
+    scored_count: int = 0
+    skipped: List[str] = field(default_factory=list)
+
+    def __str__(self):
+        return "\n\n".join(str(hit) for hit in self.hits)
+
+
+def search(
+    query: Sequence,
+    targets: Iterable[Tuple[str, Sequence]],
+    config: SequenceAlignmentAlgorithmConfig,
+    hit_count: int,
+    algorithm: str = None,
+    mode: str = None,
+) -> SearchResult:
+    """Finds the database sequences aligning best with a query.
+
+    The query profile is built once and the database is streamed, the scores
+    being computed in linear memory. Sequences are gathered into buckets of
+    equal lengths, every full bucket being scored as a single batch. The
+    best hits are kept in a bounded heap, and a sequence whose length-based
+    score bound cannot beat the worst of them once it is full is not scored
+    at all, its bound being checked again when its bucket is scored. Only
+    the final hits are aligned with a traceback. Hits with equal scores keep
+    the database order.
+
+    Arguments:
+        query (Sequence): sequence to search for.
+        targets (Iterable[Tuple[str, Sequence]]): descriptions and sequences
+            of the database.
+        config (SequenceAlignmentAlgorithmConfig): algorithm configuration.
+        hit_count (int): number of best hits to find.
+        algorithm (str): name of the algorithm overriding the config one.
+        mode (str): alignment mode, global or local.
+
+    Raises:
+        TooLongSequenceError: When the query exceeds the max_seq_length.
+
+    Returns:
+        SearchResult -- best hits and search statistics.
+    """
+    if len(query) > config.max_seq_length:
+        raise TooLongSequenceError(f"Query is longer than {config.max_seq_length}")
+
+    alignment_algorithm = create_algorithm(config, algorithm, mode)
+    query_profile = QueryProfile(
+        query.byte_values, config.same, config.diff, config.substitution_matrix
+    )
+    result = SearchResult([])
+    if hit_count < 1:
+        return result
+
+    # Min-heap of (score, -index, description, sequence), the worst hit on top.
+    heap: List[Tuple[int, int, str, Sequence]] = []
+
+    def can_be_hit(index: int, rows: np.ndarray) -> bool:
+        if len(heap) < hit_count:
+            return True
+        bound = alignment_algorithm.score_upper_bound(
+            len(rows), len(query), query_profile.best_score(rows)
+        )
+        return (bound, -index) > heap[0][:2]
+
+    def score_bucket(bucket: List[Tuple[int, str, Sequence, np.ndarray]]):
+        # The heap may have filled up since the sequences were gathered.
+        bucket = [entry for entry in bucket if can_be_hit(entry[0], entry[3])]
+        if not bucket:
+            return
+        left_codes: np.ndarray = np.stack([rows for _, _, _, rows in bucket])
+        with phase("score", cells=left_codes.size * (len(query) + 1)):
+            scores: np.ndarray = alignment_algorithm.score_profile_batch(
+                left_codes, query_profile.profile
+            )
+        result.scored_count += len(bucket)
+        for score, (index, description, target, _) in zip(scores.tolist(), bucket):
+            if len(heap) < hit_count:
+                heapq.heappush(heap, (score, -index, description, target))
+            elif (score, -index) > heap[0][:2]:
+                heapq.heapreplace(heap, (score, -index, description, target))
+
+    size: int = batch_size(len(query))
+    buckets: Dict[int, List[Tuple[int, str, Sequence, np.ndarray]]] = {}
+    for index, (description, target) in enumerate(targets):
+        result.target_count += 1
+        if len(target) > config.max_seq_length:
+            result.skipped.append(description)
+            continue
+
+        rows = query_profile.encode(target.byte_values)
+        if len(heap) < hit_count:
+            # The first hits are scored right away, so that the bounds of the
+            # following sequences can be compared with them.
+            score_bucket([(index, description, target, rows)])
+            continue
+        if not can_be_hit(index, rows):
+            continue
+
+        bucket = buckets.setdefault(len(target), [])
+        bucket.append((index, description, target, rows))
+        if len(bucket) == size:
+            score_bucket(buckets.pop(len(target)))
+
+    for length in sorted(buckets):
+        score_bucket(buckets[length])
+
+    # Targets are scored as the left sequence of the matrix, the profile being
+    # the one of the query, so that the hits are aligned the same way.
+    for score, negated_index, description, target in sorted(heap, reverse=True):
+        result.hits.append(
+            SearchHit(
+                -negated_index,
+                description,
+                score,
+                alignment_algorithm.align(target, query),
+            )
+        )
+    return result
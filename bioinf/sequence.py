@@ -1,18 +1,150 @@
+from typing import Union
+
+import numpy as np
+
+
+class UnknownSymbolError(Exception):
+    """Class representing an error of a symbol missing from an alphabet.
+    """
+
+
+class Alphabet:
+    """Class representing an alphabet -- an ordered set of sequence symbols.
+
+    Every symbol is encoded as its position in the alphabet.
+
+    Attributes:
+        _symbols (str): symbols of the alphabet.
+        _lookup (np.ndarray): table mapping a byte value to its code.
+    """
+
+    __slots__ = ("_symbols", "_symbol_bytes", "_lookup")
+
+    _UNKNOWN = 255
+
+    def __init__(self, symbols: str):
+        if len(symbols) >= self._UNKNOWN or len(set(symbols)) != len(symbols):
+            raise ValueError("An alphabet should hold less than 255 unique symbols")
+        self._symbols: str = symbols
+        self._symbol_bytes: np.ndarray = _to_bytes(symbols)
+        self._lookup: np.ndarray = np.full(256, self._UNKNOWN, dtype=np.uint8)
+        self._lookup[self._symbol_bytes] = np.arange(len(symbols), dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def __str__(self):
+        return self._symbols
+
+    def encode(self, raw_sequence: str) -> np.ndarray:
+        return self.encode_bytes(_to_bytes(raw_sequence))
+
+    def encode_bytes(self, symbols: np.ndarray) -> np.ndarray:
+        """Encodes symbols given as an array of byte values."""
+        codes: np.ndarray = self._lookup[symbols]
+        if np.any(codes == self._UNKNOWN):
+            unknown_symbols: bytes = symbols[codes == self._UNKNOWN].tobytes()
+            unknown = sorted(set(unknown_symbols.decode("latin-1")))
+            raise UnknownSymbolError(
+                f"Symbols {''.join(unknown)} are missing from alphabet {self}"
+            )
+        return codes
+
+    def decode(self, codes: np.ndarray) -> str:
+        return self.decode_bytes(codes).tobytes().decode("latin-1")
+
+    def decode_bytes(self, codes: np.ndarray) -> np.ndarray:
+        """Returns the byte values of the symbols of the given codes."""
+        return self._symbol_bytes[codes]
+
+
+def _to_bytes(raw_sequence: str) -> np.ndarray:
+    try:
+        symbols: bytes = raw_sequence.encode("latin-1")
+    except UnicodeEncodeError:
+        unknown = sorted(set(symbol for symbol in raw_sequence if ord(symbol) > 255))
+        raise UnknownSymbolError(
+            f"Symbols {''.join(unknown)} are not single byte (latin-1) symbols"
+        )
+    return np.frombuffer(symbols, dtype=np.uint8)
+
+
 class Sequence:
     """Class representing a protein sequence.
 
+    Besides the string representation a sequence has an encoded form -- a
+    read-only uint8 array of codes, built on first use. Without an alphabet
+    the codes are the byte values of the symbols. Slicing a sequence returns
+    a sequence viewing the codes of the original one, without copying.
+
     Attributes:
-        _raw_sequence (str): Raw string representation of the protein sequence.
+        _raw_sequence (str): Raw string representation of the protein sequence,
+            built from the codes on first use for sliced sequences.
+        _codes (np.ndarray): Encoded sequence.
+        _alphabet (Alphabet): Alphabet used to encode the sequence, if any.
     """
 
-    def __init__(self, raw_sequence: str):
+    __slots__ = ("_raw_sequence", "_codes", "_alphabet")
+
+    def __init__(self, raw_sequence: str, alphabet: Alphabet = None):
         self._raw_sequence: str = raw_sequence
+        self._codes: np.ndarray = None
+        self._alphabet: Alphabet = alphabet
+
+    @classmethod
+    def from_codes(cls, codes: np.ndarray, alphabet: Alphabet = None) -> "Sequence":
+        """Creates a sequence viewing the given codes.
+
+        Arguments:
+            codes (np.ndarray): uint8 array of codes.
+            alphabet (Alphabet): alphabet of the codes, byte values if missing.
+
+        Returns:
+            Sequence -- sequence sharing its memory with the codes.
+        """
+        sequence = cls(None, alphabet)
+        sequence._codes = codes.view()
+        sequence._codes.flags.writeable = False
+        return sequence
+
+    @property
+    def alphabet(self) -> Alphabet:
+        return self._alphabet
+
+    @property
+    def codes(self) -> np.ndarray:
+        if self._codes is None:
+            if self._alphabet is None:
+                self._codes = _to_bytes(self._raw_sequence)
+            else:
+                self._codes = self._alphabet.encode(self._raw_sequence)
+            self._codes.flags.writeable = False
+        return self._codes
+
+    @property
+    def byte_values(self) -> np.ndarray:
+        """Byte values of the symbols, the same as the codes without an
+        alphabet. Sequences are compared in this encoding, shared by all of
+        them whatever their alphabets.
+        """
+        if self._alphabet is None:
+            return self.codes
+        return self._alphabet.decode_bytes(self.codes)
 
-    def __getitem__(self, index: int):
-        return self._raw_sequence[index]
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return Sequence.from_codes(self.codes[index], self._alphabet)
+        return str(self)[index]
 
     def __len__(self) -> int:
+        if self._raw_sequence is None:
+            return len(self._codes)
         return len(self._raw_sequence)
 
     def __str__(self):
+        if self._raw_sequence is None:
+            if self._alphabet is None:
+                self._raw_sequence = self._codes.tobytes().decode("latin-1")
+            else:
+                self._raw_sequence = self._alphabet.decode(self._codes)
         return self._raw_sequence
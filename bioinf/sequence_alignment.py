@@ -1,32 +1,69 @@
-from abc import ABC, abstractclassmethod
+from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Tuple, Type
 
 import numpy as np
 
-from .alignment import Alignment
-from .converters import PathToAlignmentConverter
-from .path import Direction, Path, PathFinder
+# Alignment is re-exported for the users of the results.
+from .alignment import (  # noqa: F401
+    Alignment,
+    AlignmentBuilder,
+    BaseAlignment,
+    CigarAlignment,
+)
+from .disk import fill_on_disk
+from .kernels import (
+    BandedMatrix,
+    batch_size,
+    best_local_score,
+    fill_affine_anti_diagonals,
+    fill_affine_last_row,
+    fill_anti_diagonals,
+    fill_band,
+    fill_last_row,
+    fill_local_anti_diagonals,
+)
+from .path import AffinePathFinder, Direction, Path, PathFinder
+from .scoring import QueryProfile, SubstitutionMatrix, query_profile
 from .sequence import Sequence
+from .stats import phase
 
 
 class TooLongSequenceError(Exception):
     pass
 
 
+class UnsupportedModeError(Exception):
+    """Class representing an algorithm used in an unsupported alignment mode.
+    """
+
+
+class UnsupportedGapPenaltyError(Exception):
+    """Class representing an algorithm used with unsupported gap penalties.
+    """
+
+
+class UnsupportedOptionError(Exception):
+    """Class representing an algorithm used with an execution option it
+    does not support.
+    """
+
+
 @dataclass
 class SequenceAlignmentResult:
     """Class representing a sequence alignment result.
     Attributes:
         score (int): Alignment score value.
-        alignments (List[Alignment]): list of possible sequence alignments.
+        alignments (List[BaseAlignment]): list of possible sequence alignments.
     """
 
     score: int
-    alignments: List[Alignment]
+    alignments: List[BaseAlignment]
 
     def __str__(self):
         score_string: str = f"Score = {int(self.score)}"
+        if not self.alignments:
+            return score_string
         alignments_string = [str(alignment) for alignment in self.alignments]
         return score_string + "\n\n" + "\n\n".join(alignments_string)
 
@@ -41,6 +78,19 @@ class SequenceAlignmentAlgorithmConfig:
             - gap_penalty (int) - score value for adding a gap_penalty
             - max_seq_length (int) - maximum length of a sequence
             - max_number_paths (int) - maximum number of paths to retrieve
+          and optionally:
+            - algorithm (str) - name of the alignment algorithm to use
+            - band_width (int) - initial band width of the banded algorithm
+            - gap_open (int) - score value for opening a gap, affine gap
+              penalties are used instead of gap_penalty when it is set
+            - gap_extend (int) - score value for extending a gap
+            - substitution_matrix (SubstitutionMatrix) - scores of pairs of
+              symbols, used instead of same and diff when it is set
+            - threads (int) - number of threads filling a score matrix
+            - scratch_dir (str) - directory of disk-backed score and
+              traceback matrices, kept in memory when it is not set
+            - cache_dir (str) - directory of cached alignment results, see
+              create_cached_algorithm
     """
 
     same: int
@@ -48,13 +98,21 @@ class SequenceAlignmentAlgorithmConfig:
     gap_penalty: int
     max_seq_length: int
     max_number_paths: int
+    algorithm: str = "needleman-wunsch"
+    band_width: int = 16
+    gap_open: int = None
+    gap_extend: int = None
+    substitution_matrix: SubstitutionMatrix = None
+    threads: int = 1
+    scratch_dir: str = None
+    cache_dir: str = None
 
 
 class ISequenceAlignmentAlgorithm(ABC):
     """Interface representing an alignment algorithm
     """
 
-    @abstractclassmethod
+    @abstractmethod
     def align(
         self, left_sequence: Sequence, right_sequence: Sequence
     ) -> SequenceAlignmentResult:
@@ -69,6 +127,39 @@ class ISequenceAlignmentAlgorithm(ABC):
                                       score and possible alignments.
         """
 
+    @abstractmethod
+    def score(self, left_sequence: Sequence, right_sequence: Sequence) -> int:
+        """Computes the score of the best alignment of two sequences.
+
+        Arguments:
+            left_sequence (Sequence) - first sequence to align
+            right_sequence (Sequence) - second sequence to align
+
+        Returns:
+            int - alignment score value.
+        """
+
+    def iter_align(
+        self, left_sequence: Sequence, right_sequence: Sequence
+    ) -> Tuple[int, Iterator[BaseAlignment]]:
+        """Aligns two sequences, producing the alignments lazily.
+
+        The score is computed at once, while every alignment is only
+        retrieved when the previous one has been consumed, so that they can
+        be written one at a time. By default the alignments are the ones
+        returned by align.
+
+        Arguments:
+            left_sequence (Sequence) - first sequence to align
+            right_sequence (Sequence) - second sequence to align
+
+        Returns:
+            Tuple[int, Iterator[BaseAlignment]] - alignment score value and an
+                                              iterator over the alignments.
+        """
+        result: SequenceAlignmentResult = self.align(left_sequence, right_sequence)
+        return result.score, iter(result.alignments)
+
 
 class NeedlemanWunschSequenceAlignmentAlgorithm(ISequenceAlignmentAlgorithm):
     """Implementation of the Needleman-Wunsch Sequence alginment algorithm
@@ -82,6 +173,13 @@ class NeedlemanWunschSequenceAlignmentAlgorithm(ISequenceAlignmentAlgorithm):
             length specified in the passed SequenceAlignmentAlgorithmConfig.
     """
 
+    mode: str = "global"
+    affine_gaps: bool = False
+    # Whether the matrices are kept on disk when scratch_dir is set.
+    disk_backed: bool = True
+    # Whether the matrices are filled by tiles in threads when threads > 1.
+    tiled: bool = True
+
     def __init__(self, config: SequenceAlignmentAlgorithmConfig):
         self._config = config
 
@@ -96,6 +194,17 @@ class NeedlemanWunschSequenceAlignmentAlgorithm(ISequenceAlignmentAlgorithm):
                 f"Right sequence is longer than {self._config.max_seq_length}"
             )
 
+    def _query_profile(
+        self, left_sequence: Sequence, right_sequence: Sequence
+    ) -> Tuple[np.array, np.array]:
+        return query_profile(
+            left_sequence.byte_values,
+            right_sequence.byte_values,
+            self._config.same,
+            self._config.diff,
+            self._config.substitution_matrix,
+        )
+
     def _create_score_matrix(self, row_count: int, col_count: int) -> np.array:
         score_matrix: np.array = np.zeros((row_count, col_count))
         score_matrix[1:, 0] = [
@@ -106,69 +215,589 @@ class NeedlemanWunschSequenceAlignmentAlgorithm(ISequenceAlignmentAlgorithm):
         ]
         return score_matrix
 
-    def _create_adjacency_list(
-        self, row_count: int, col_count: int
-    ) -> Dict[Tuple[int, int], List[Direction]]:
-        adjacency_list: Dict[Tuple[int, int], List[Direction]] = dict()
+    def _create_traceback_matrix(
+        self, left_sequence: Sequence, right_sequence: Sequence, score_matrix: np.array
+    ) -> np.array:
+        return fill_anti_diagonals(
+            score_matrix,
+            *self._query_profile(left_sequence, right_sequence),
+            self._config.gap_penalty,
+            self._config.threads,
+        )
 
-        for row in range(1, row_count):
-            adjacency_list[(row, 0)] = [Direction.UP]
+    def score(self, left_sequence: Sequence, right_sequence: Sequence) -> int:
+        """Computes the alignment score without retrieving any alignments.
 
-        for col in range(1, col_count):
-            adjacency_list[(0, col)] = [Direction.LEFT]
+        Only two rows of the score matrix are kept in memory, the shorter
+        sequence being laid along them, and no traceback is performed.
+
+        Arguments:
+            left_sequence (Sequence) - first sequence to align
+            right_sequence (Sequence) - second sequence to align
 
-        return adjacency_list
+        Returns:
+            int - alignment score value.
+        """
+        self._validate_sequence(
+            left_sequence=left_sequence, right_sequence=right_sequence
+        )
+        if len(left_sequence) < len(right_sequence):
+            left_sequence, right_sequence = right_sequence, left_sequence
 
-    def _retrieve_paths(self, adjacency_list, row_count, col_count):
+        cell_count: int = (len(left_sequence) + 1) * (len(right_sequence) + 1)
+        with phase("score", cells=cell_count):
+            return self.score_profile(
+                *self._query_profile(left_sequence, right_sequence)
+            )
+
+    def score_profile(self, left_codes: np.array, profile: np.array) -> int:
+        """Computes the alignment score of a sequence against a query profile.
+
+        Arguments:
+            left_codes (np.array) - left sequence encoded as rows of the profile
+            profile (np.array) - query profile of the right sequence, see
+                                 query_profile
+
+        Returns:
+            int - alignment score value.
+        """
+        return int(self.score_profile_batch(np.asarray(left_codes)[None], profile)[0])
+
+    def score_profile_batch(self, left_codes: np.array, profile: np.array) -> np.array:
+        """Computes the alignment scores of equal length sequences at once.
+
+        Arguments:
+            left_codes (np.array) - (batch, length) array of the left sequences
+                                    encoded as rows of the profile
+            profile (np.array) - query profile of the right sequence, see
+                                 query_profile
+
+        Returns:
+            np.array - int64 alignment score values of the batch.
+        """
+        last_rows: np.array = fill_last_row(
+            left_codes, profile, self._config.gap_penalty
+        )
+        return last_rows[:, -1]
+
+    def score_batch(self, query: Sequence, targets: List[Sequence]) -> np.array:
+        """Computes the alignment scores of a query and many sequences.
+
+        The query profile is built once. The sequences are grouped by length
+        and the sequences of a group are scored in batches, the rows of a
+        whole batch being computed with single array operations.
+
+        Arguments:
+            query (Sequence) - sequence aligned with all the others
+            targets (List[Sequence]) - sequences to align with the query
+
+        Returns:
+            np.array - int64 alignment score values, in the order of targets.
+        """
+        for target in targets:
+            self._validate_sequence(left_sequence=target, right_sequence=query)
+
+        query_profile = QueryProfile(
+            query.byte_values,
+            self._config.same,
+            self._config.diff,
+            self._config.substitution_matrix,
+        )
+        scores: np.array = np.zeros(len(targets), dtype=np.int64)
+        lengths: np.array = np.array([len(target) for target in targets])
+        size: int = batch_size(len(query))
+        for length in np.unique(lengths):
+            indices: np.array = np.flatnonzero(lengths == length)
+            for start in range(0, len(indices), size):
+                batch: np.array = indices[start:][:size]
+                left_codes: np.array = np.stack(
+                    [
+                        query_profile.encode(targets[index].byte_values)
+                        for index in batch
+                    ]
+                )
+                with phase("score", cells=left_codes.size * (len(query) + 1)):
+                    scores[batch] = self.score_profile_batch(
+                        left_codes, query_profile.profile
+                    )
+        return scores
+
+    def _gap_score_bound(self, gap_counts: np.array) -> np.array:
+        return self._config.gap_penalty * gap_counts
+
+    def score_upper_bound(
+        self, left_lengths: np.array, right_lengths: np.array, best_match: int
+    ) -> np.array:
+        """Bounds the alignment scores of sequences of given lengths from above.
+
+        Arguments:
+            left_lengths (np.array) - lengths of the left sequences
+            right_lengths (np.array) - lengths of the right sequences
+            best_match (int) - highest score of a pair of symbols
+
+        Returns:
+            np.array - upper bounds of the alignment score values.
+        """
+        # Aligning a with b symbols takes g >= |a - b| gaps and (a + b - g) / 2
+        # diagonal moves, the bound being linear in g (but for g = 0), so it
+        # is the highest at one of the extreme gap counts.
+        total_lengths = left_lengths + right_lengths
+        least_gaps = np.abs(left_lengths - right_lengths)
+        return np.maximum.reduce(
+            [
+                best_match * (total_lengths - gaps) / 2 + self._gap_score_bound(gaps)
+                for gaps in (
+                    least_gaps,
+                    np.minimum(np.maximum(least_gaps, 1), total_lengths),
+                    total_lengths,
+                )
+            ]
+        )
+
+    def create_path_finder(
+        self, left_sequence: Sequence, right_sequence: Sequence
+    ) -> Tuple[int, PathFinder]:
+        """Fills the score and traceback matrices of two sequences.
+
+        The returned PathFinder gives access to all optimal paths, e.g. to
+        count them or to retrieve a chosen or random one, without
+        enumerating them.
+
+        Arguments:
+            left_sequence (Sequence) - first sequence to align
+            right_sequence (Sequence) - second sequence to align
+
+        Returns:
+            Tuple[int, PathFinder] - alignment score value and a PathFinder
+                                     over the traceback matrix.
+        """
+        self._validate_sequence(
+            left_sequence=left_sequence, right_sequence=right_sequence
+        )
+        if self._config.scratch_dir is not None:
+            return self._create_disk_path_finder(left_sequence, right_sequence)
+
+        row_count: int = len(left_sequence) + 1
+        col_count: int = len(right_sequence) + 1
+        with phase("score_matrix"):
+            score_matrix: np.array = self._create_score_matrix(row_count, col_count)
+        with phase("fill", cells=row_count * col_count):
+            traceback: np.array = self._create_traceback_matrix(
+                left_sequence, right_sequence, score_matrix
+            )
+
+        score: int = score_matrix[row_count - 1, col_count - 1]
         path_finder: PathFinder = PathFinder(
-            adjacency_list,
+            traceback,
             (row_count - 1, col_count - 1),
             self._config.max_number_paths,
         )
-        paths: List[Path] = path_finder.find_all_paths()
+        return score, path_finder
 
-        return paths
+    def _create_disk_path_finder(
+        self, left_sequence: Sequence, right_sequence: Sequence
+    ) -> Tuple[int, PathFinder]:
+        cell_count: int = (len(left_sequence) + 1) * (len(right_sequence) + 1)
+        with phase("fill", cells=cell_count):
+            score_matrix, traceback, last_cell = fill_on_disk(
+                self._config.scratch_dir,
+                *self._query_profile(left_sequence, right_sequence),
+                self._config.gap_penalty,
+                local=self.mode == "local",
+            )
+        path_finder: PathFinder = PathFinder(
+            traceback, last_cell, self._config.max_number_paths
+        )
+        return score_matrix[last_cell], path_finder
+
+    def _iter_alignments(
+        self, path_finder: PathFinder, left_sequence: Sequence, right_sequence: Sequence
+    ) -> Iterator[BaseAlignment]:
+        paths: Iterator[Path] = path_finder.iter_found_paths()
+        builder = AlignmentBuilder(left_sequence, right_sequence, path_finder.last_cell)
+        while True:
+            with phase("traceback") as traceback_phase:
+                path: Path = next(paths, None)
+                traceback_phase.count(paths=int(path is not None))
+            if path is None:
+                return
+            with phase("convert"):
+                alignment: BaseAlignment = builder.build(path)
+            yield alignment
+
+    def iter_align(
+        self, left_sequence: Sequence, right_sequence: Sequence
+    ) -> Tuple[int, Iterator[BaseAlignment]]:
+        score, path_finder = self.create_path_finder(left_sequence, right_sequence)
+        return score, self._iter_alignments(path_finder, left_sequence, right_sequence)
 
     def align(
         self, left_sequence: Sequence, right_sequence: Sequence
     ) -> SequenceAlignmentResult:
+        score, alignments = self.iter_align(left_sequence, right_sequence)
+        return SequenceAlignmentResult(score, list(alignments))
+
+
+class HirschbergSequenceAlignmentAlgorithm(NeedlemanWunschSequenceAlignmentAlgorithm):
+    """Implementation of the Hirschberg Sequence alignment algorithm
+
+    Retrieves a single optimal global alignment, using the same scoring as
+    the Needleman-Wunsch algorithm, in memory linear in the sequence lengths.
+    The left sequence is split in half and the column at which an optimal
+    path crosses the split is found from the last rows of the forward and
+    reversed score matrices, after which both halves are aligned recursively.
+
+    Arguments:
+        _config (SequenceAlignmentAlgorithmConfig): Configuration of the
+            sequence alignment algorithm.
+
+    Raises:
+        TooLongSequenceError: When one of the input sequence exceeds the
+            length specified in the passed SequenceAlignmentAlgorithmConfig.
+    """
+
+    disk_backed: bool = False
+    tiled: bool = False
+
+    # Subproblems not larger than this number of cells are solved directly
+    # with the full Needleman-Wunsch matrices.
+    _FULL_MATRIX_CELLS = 1 << 16
+
+    def _align_full_matrix(
+        self, left_codes: np.array, profile: np.array, directions: List[Direction]
+    ) -> None:
+        row_count: int = len(left_codes) + 1
+        col_count: int = profile.shape[1] + 1
+        score_matrix: np.array = self._create_score_matrix(row_count, col_count)
+        traceback: np.array = fill_anti_diagonals(
+            score_matrix, left_codes, profile, self._config.gap_penalty
+        )
+        path_finder = PathFinder(traceback, (row_count - 1, col_count - 1), 1)
+        directions.extend(reversed(list(path_finder.find_all_paths()[0])))
+
+    def _align_recursive(
+        self, left_codes: np.array, profile: np.array, directions: List[Direction]
+    ) -> None:
+        cell_count: int = (len(left_codes) + 1) * (profile.shape[1] + 1)
+        if len(left_codes) < 2 or cell_count <= self._FULL_MATRIX_CELLS:
+            self._align_full_matrix(left_codes, profile, directions)
+            return
+
+        middle: int = len(left_codes) // 2
+        upper_row: np.array = fill_last_row(
+            left_codes[:middle], profile, self._config.gap_penalty
+        )
+        lower_row: np.array = fill_last_row(
+            left_codes[middle:][::-1], profile[:, ::-1], self._config.gap_penalty
+        )
+        split: int = int(np.argmax(upper_row + lower_row[::-1]))
+
+        self._align_recursive(left_codes[:middle], profile[:, :split], directions)
+        self._align_recursive(left_codes[middle:], profile[:, split:], directions)
+
+    def _score_directions(
+        self, left_codes: np.array, profile: np.array, directions: List[Direction]
+    ) -> int:
+        steps = np.array([direction.value for direction in directions], dtype=np.int8)
+        is_diag = steps == Direction.DIAG.value
+        left_indices = np.cumsum(steps != Direction.LEFT.value) - 1
+        right_indices = np.cumsum(steps != Direction.UP.value) - 1
+        diag_score = int(
+            profile[left_codes[left_indices[is_diag]], right_indices[is_diag]].sum()
+        )
+        gap_count = len(directions) - int(np.count_nonzero(is_diag))
+        return diag_score + gap_count * self._config.gap_penalty
+
+    def iter_align(
+        self, left_sequence: Sequence, right_sequence: Sequence
+    ) -> Tuple[int, Iterator[BaseAlignment]]:
         self._validate_sequence(
             left_sequence=left_sequence, right_sequence=right_sequence
         )
-        row_count: int = len(left_sequence) + 1
-        col_count: int = len(right_sequence) + 1
-        score_matrix: np.array = self._create_score_matrix(row_count, col_count)
-        adjacency_list = self._create_adjacency_list(row_count, col_count)
+        left_codes, profile = self._query_profile(left_sequence, right_sequence)
+        directions: List[Direction] = []
+        cell_count: int = (len(left_sequence) + 1) * (len(right_sequence) + 1)
+        with phase("fill", cells=cell_count) as fill_phase:
+            self._align_recursive(left_codes, profile, directions)
+            fill_phase.count(paths=1)
+
+        score: int = self._score_directions(left_codes, profile, directions)
+        path: Path = Path(directions[::-1])
+        last_cell: Tuple[int, int] = (len(left_sequence), len(right_sequence))
+        with phase("convert"):
+            alignment: BaseAlignment = CigarAlignment.from_path(
+                path, left_sequence, right_sequence, last_cell
+            )
+        return score, iter([alignment])
 
-        for row in range(1, row_count):
-            for col in range(1, col_count):
-                if left_sequence[row - 1] == right_sequence[col - 1]:
-                    diag_weight = self._config.same
-                else:
-                    diag_weight = self._config.diff
 
-                available_score = np.array(
-                    [
-                        score_matrix[row, col - 1] + self._config.gap_penalty,
-                        score_matrix[row - 1, col - 1] + diag_weight,
-                        score_matrix[row - 1, col] + self._config.gap_penalty,
-                    ]
+class BandedNeedlemanWunschSequenceAlignmentAlgorithm(
+    NeedlemanWunschSequenceAlignmentAlgorithm
+):
+    """Implementation of the banded Needleman-Wunsch Sequence alignment algorithm
+
+    Only the cells lying within a diagonal band around the main diagonal
+    (widened to contain the last cell) are computed and stored. If a path
+    leaving the band could score at least as well as the best path inside
+    it, the band width is doubled and the fill repeated, so the score and
+    the set of optimal paths are always the same as the ones found by the
+    Needleman-Wunsch algorithm. For similar sequences the work is close to
+    linear in the sequence lengths.
+
+    Arguments:
+        _config (SequenceAlignmentAlgorithmConfig): Configuration of the
+            sequence alignment algorithm.
+
+    Raises:
+        TooLongSequenceError: When one of the input sequence exceeds the
+            length specified in the passed SequenceAlignmentAlgorithmConfig.
+    """
+
+    disk_backed: bool = False
+    tiled: bool = False
+
+    def _outside_band_score_bound(
+        self, score_matrix: BandedMatrix, best_match: int
+    ) -> float:
+        # A path leaving the band for the first time steps out of one of its
+        # edge cells, all previous cells lying within the band.
+        row_count, col_count = score_matrix.shape
+        rows = np.arange(row_count)
+        bounds = [-np.inf]
+        for band_col, row_step, col_step in (
+            (0, 1, 0),
+            (score_matrix.band.shape[1] - 1, 0, 1),
+        ):
+            next_rows = rows + row_step
+            next_cols = rows + score_matrix.low + band_col + col_step
+            inside = (
+                (next_rows < row_count) & (next_cols >= 0) & (next_cols < col_count)
+            )
+            if np.any(inside):
+                prefix_scores = score_matrix.band[rows[inside], band_col]
+                suffix_bounds = self.score_upper_bound(
+                    row_count - 1 - next_rows[inside],
+                    col_count - 1 - next_cols[inside],
+                    best_match,
                 )
+                bounds.append(
+                    np.max(prefix_scores + self._config.gap_penalty + suffix_bounds)
+                )
+        return max(bounds)
 
-                available_paths = np.array(
-                    [Direction.LEFT, Direction.DIAG, Direction.UP]
+    def create_path_finder(
+        self, left_sequence: Sequence, right_sequence: Sequence
+    ) -> Tuple[int, PathFinder]:
+        self._validate_sequence(
+            left_sequence=left_sequence, right_sequence=right_sequence
+        )
+        row_count: int = len(left_sequence) + 1
+        col_count: int = len(right_sequence) + 1
+        length_difference: int = col_count - row_count
+        profile_rows, profile = self._query_profile(left_sequence, right_sequence)
+        best_match: int = int(profile.max()) if profile.size else 0
+        band_width: int = self._config.band_width
+        while True:
+            low: int = min(0, length_difference) - band_width
+            high: int = max(0, length_difference) + band_width
+            with phase("fill", cells=row_count * (high - low + 1)):
+                score_matrix, traceback = fill_band(
+                    profile_rows, profile, self._config.gap_penalty, low, high
                 )
+            score: int = int(score_matrix[row_count - 1, col_count - 1])
+            if score > self._outside_band_score_bound(score_matrix, best_match):
+                break
+            band_width *= 2
 
-                current_score = np.max(available_score)
-                current_paths = available_paths[available_score == current_score]
+        path_finder: PathFinder = PathFinder(
+            traceback,
+            (row_count - 1, col_count - 1),
+            self._config.max_number_paths,
+        )
+        return score, path_finder
 
-                score_matrix[row, col] = current_score
-                adjacency_list[(row, col)] = current_paths.tolist()
 
-        score: int = score_matrix[row_count - 1, col_count - 1]
-        paths = self._retrieve_paths(adjacency_list, row_count, col_count)
-        alignments: List[Alignment] = [
-            PathToAlignmentConverter.convert(path, left_sequence, right_sequence)
-            for path in paths
-        ]
-        return SequenceAlignmentResult(score, alignments)
+class SmithWatermanSequenceAlignmentAlgorithm(
+    NeedlemanWunschSequenceAlignmentAlgorithm
+):
+    """Implementation of the Smith-Waterman Sequence alignment algorithm
+
+    Finds the best local alignments -- the best scoring alignments of any
+    pair of subsequences -- using the same scoring and the same vectorized
+    fill as the Needleman-Wunsch algorithm, with scores clamped at zero.
+    All the optimal paths ending in the best cell are retrieved.
+
+    Arguments:
+        _config (SequenceAlignmentAlgorithmConfig): Configuration of the
+            sequence alignment algorithm.
+
+    Raises:
+        TooLongSequenceError: When one of the input sequence exceeds the
+            length specified in the passed SequenceAlignmentAlgorithmConfig.
+    """
+
+    mode: str = "local"
+
+    def score_profile_batch(self, left_codes: np.array, profile: np.array) -> np.array:
+        return best_local_score(left_codes, profile, self._config.gap_penalty)
+
+    def score_upper_bound(
+        self, left_lengths: np.array, right_lengths: np.array, best_match: int
+    ) -> np.array:
+        return max(best_match, 0) * np.minimum(left_lengths, right_lengths)
+
+    def create_path_finder(
+        self, left_sequence: Sequence, right_sequence: Sequence
+    ) -> Tuple[int, PathFinder]:
+        self._validate_sequence(
+            left_sequence=left_sequence, right_sequence=right_sequence
+        )
+        if self._config.scratch_dir is not None:
+            return self._create_disk_path_finder(left_sequence, right_sequence)
+
+        with phase("score_matrix"):
+            score_matrix: np.array = np.zeros(
+                (len(left_sequence) + 1, len(right_sequence) + 1)
+            )
+        with phase("fill", cells=score_matrix.size):
+            traceback, best_cell = fill_local_anti_diagonals(
+                score_matrix,
+                *self._query_profile(left_sequence, right_sequence),
+                self._config.gap_penalty,
+                self._config.threads,
+            )
+
+        path_finder: PathFinder = PathFinder(
+            traceback, best_cell, self._config.max_number_paths
+        )
+        return score_matrix[best_cell], path_finder
+
+
+class GotohSequenceAlignmentAlgorithm(NeedlemanWunschSequenceAlignmentAlgorithm):
+    """Implementation of the Gotoh Sequence alignment algorithm
+
+    Finds the best global alignments with affine gap penalties, a gap of
+    length L scoring gap_open + (L - 1) * gap_extend. Three score matrices
+    are filled -- the best scores and the best scores of alignments ending
+    with a gap in either sequence -- and the traceback follows the state in
+    which every cell was reached. Without gap_open and gap_extend in the
+    config, gap_penalty is used for both.
+
+    Arguments:
+        _config (SequenceAlignmentAlgorithmConfig): Configuration of the
+            sequence alignment algorithm.
+
+    Raises:
+        TooLongSequenceError: When one of the input sequence exceeds the
+            length specified in the passed SequenceAlignmentAlgorithmConfig.
+    """
+
+    affine_gaps: bool = True
+    disk_backed: bool = False
+    tiled: bool = False
+
+    def _gap_penalties(self) -> Tuple[int, int]:
+        if self._config.gap_open is None:
+            return self._config.gap_penalty, self._config.gap_penalty
+        return self._config.gap_open, self._config.gap_extend
+
+    def score_profile_batch(self, left_codes: np.array, profile: np.array) -> np.array:
+        last_rows: np.array = fill_affine_last_row(
+            left_codes, profile, *self._gap_penalties()
+        )
+        return last_rows[:, -1]
+
+    def _gap_score_bound(self, gap_counts: np.array) -> np.array:
+        # Opening a gap is not cheaper than extending one, so all the gaps
+        # score the most when they are a single one.
+        gap_open, gap_extend = self._gap_penalties()
+        return np.where(gap_counts > 0, gap_open + (gap_counts - 1) * gap_extend, 0)
+
+    def create_path_finder(
+        self, left_sequence: Sequence, right_sequence: Sequence
+    ) -> Tuple[int, PathFinder]:
+        self._validate_sequence(
+            left_sequence=left_sequence, right_sequence=right_sequence
+        )
+        cell_count: int = (len(left_sequence) + 1) * (len(right_sequence) + 1)
+        with phase("fill", cells=cell_count):
+            score_matrix, traceback = fill_affine_anti_diagonals(
+                *self._query_profile(left_sequence, right_sequence),
+                *self._gap_penalties(),
+            )
+
+        last_cell: Tuple[int, int] = (len(left_sequence), len(right_sequence))
+        path_finder: PathFinder = AffinePathFinder(
+            traceback, last_cell, self._config.max_number_paths
+        )
+        return int(score_matrix[last_cell]), path_finder
+
+
+ALGORITHMS: Dict[str, Type[ISequenceAlignmentAlgorithm]] = {
+    "needleman-wunsch": NeedlemanWunschSequenceAlignmentAlgorithm,
+    "hirschberg": HirschbergSequenceAlignmentAlgorithm,
+    "banded": BandedNeedlemanWunschSequenceAlignmentAlgorithm,
+    "smith-waterman": SmithWatermanSequenceAlignmentAlgorithm,
+    "gotoh": GotohSequenceAlignmentAlgorithm,
+}
+
+# Algorithm used in every alignment mode when the configured one does not
+# support it.
+MODES: Dict[str, str] = {"global": "needleman-wunsch", "local": "smith-waterman"}
+
+
+def create_algorithm(
+    config: SequenceAlignmentAlgorithmConfig, name: str = None, mode: str = None
+) -> ISequenceAlignmentAlgorithm:
+    """Creates the sequence alignment algorithm selected in the config.
+
+    Arguments:
+        config (SequenceAlignmentAlgorithmConfig): configuration of the
+            sequence alignment algorithm.
+        name (str): name of the algorithm overriding the one from the config.
+        mode (str): alignment mode, global or local. The algorithm from the
+            config is replaced by the default one of the mode when it does
+            not support it. Similarly, Needleman-Wunsch is replaced by Gotoh
+            when the config sets affine gap penalties.
+
+    Raises:
+        UnsupportedModeError: When the algorithm given by name does not
+            support the mode.
+        UnsupportedGapPenaltyError: When the config sets affine gap
+            penalties, which the selected algorithm does not support.
+        UnsupportedOptionError: When the config sets scratch_dir, but the
+            selected algorithm keeps its matrices in memory, or more than
+            one thread, but the selected algorithm (or the disk-backed fill)
+            does not fill by tiles.
+
+    Returns:
+        ISequenceAlignmentAlgorithm -- algorithm instance.
+    """
+    selected: str = name or config.algorithm
+    if mode is not None and ALGORITHMS[selected].mode != mode:
+        if name is not None:
+            raise UnsupportedModeError(
+                f"The {name} algorithm does not support the {mode} mode"
+            )
+        selected = MODES[mode]
+
+    # Needleman-Wunsch with affine gap penalties is the Gotoh algorithm.
+    if config.gap_open is not None and not ALGORITHMS[selected].affine_gaps:
+        if selected != "needleman-wunsch":
+            raise UnsupportedGapPenaltyError(
+                f"The {selected} algorithm does not support affine gap penalties"
+            )
+        selected = "gotoh"
+
+    if config.scratch_dir is not None and not ALGORITHMS[selected].disk_backed:
+        raise UnsupportedOptionError(
+            f"The {selected} algorithm does not support a scratch directory"
+        )
+    if config.threads > 1 and (
+        not ALGORITHMS[selected].tiled or config.scratch_dir is not None
+    ):
+        raise UnsupportedOptionError(
+            f"The {selected} algorithm does not support more than one thread"
+            + (" with a scratch directory" if ALGORITHMS[selected].tiled else "")
+        )
+    return ALGORITHMS[selected](config)
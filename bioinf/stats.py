@@ -0,0 +1,216 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+
+@dataclass
+class PhaseStats:
+    """Class representing the statistics of a phase of a run.
+
+    Attributes:
+        calls (int): number of times the phase was entered.
+        seconds (float): total wall time spent in the phase.
+        cells (int): number of matrix cells computed in the phase.
+        paths (int): number of paths enumerated in the phase.
+        peak_memory (int): highest memory allocated on top of the memory
+            allocated when entering the phase, in bytes, as traced by
+            tracemalloc.
+    """
+
+    calls: int = 0
+    seconds: float = 0.0
+    cells: int = 0
+    paths: int = 0
+    peak_memory: int = 0
+
+    @property
+    def cells_per_second(self) -> float:
+        return self.cells / self.seconds if self.seconds > 0 else 0.0
+
+
+class Stats:
+    """Class gathering the statistics of the phases of a run.
+
+    Attributes:
+        phases (Dict[str, PhaseStats]): statistics of the phases, in the
+            order they were first entered.
+        max_rss (int): peak resident set size of the process, in bytes, when
+            known.
+    """
+
+    def __init__(self, trace_memory: bool = True):
+        self.phases: Dict[str, PhaseStats] = {}
+        self.max_rss: int = None
+        self._trace_memory: bool = trace_memory
+        # Peak traced memory of the entered phases, innermost last.
+        self._peaks: List[int] = []
+
+    def as_dict(self) -> dict:
+        """Returns the statistics as a dictionary of plain values."""
+        return {
+            "phases": {
+                name: {**asdict(phase), "cells_per_second": phase.cells_per_second}
+                for name, phase in self.phases.items()
+            },
+            "max_rss": self.max_rss,
+        }
+
+    def to_json(self) -> str:
+        """Returns the statistics as a JSON document, see as_dict."""
+        return json.dumps(self.as_dict(), indent=2)
+
+    def __str__(self):
+        lines: List[str] = [
+            f"{'phase':<16}{'calls':>8}{'seconds':>12}{'cells/s':>14}"
+            f"{'paths':>10}{'peak memory':>14}"
+        ]
+        for name, phase in self.phases.items():
+            cells_per_second: str = (
+                f"{phase.cells_per_second:.4g}" if phase.cells else "-"
+            )
+            lines.append(
+                f"{name:<16}{phase.calls:>8}{phase.seconds:>12.4f}"
+                f"{cells_per_second:>14}{phase.paths:>10}"
+                f"{_format_bytes(phase.peak_memory):>14}"
+            )
+        if self.max_rss is not None:
+            lines.append(f"max RSS {_format_bytes(self.max_rss)}")
+        return "\n".join(lines)
+
+
+def _format_bytes(size: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+class _Phase:
+    """Context manager measuring a phase, see phase."""
+
+    __slots__ = ("_stats", "_phase", "_start_time", "_start_memory")
+
+    def __init__(self, stats: Stats, name: str, cells: int):
+        self._stats: Stats = stats
+        self._phase: PhaseStats = stats.phases.setdefault(name, PhaseStats())
+        self._phase.calls += 1
+        self._phase.cells += cells
+
+    def count(self, cells: int = 0, paths: int = 0):
+        """Adds computed cells or enumerated paths to the phase."""
+        self._phase.cells += cells
+        self._phase.paths += paths
+
+    def __enter__(self):
+        if self._stats._trace_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            peaks: List[int] = self._stats._peaks
+            # The peak is reset for this phase, so the enclosing phase keeps
+            # its own peak so far.
+            if peaks:
+                peaks[-1] = max(peaks[-1], peak)
+            tracemalloc.reset_peak()
+            peaks.append(current)
+            self._start_memory = current
+        else:
+            self._start_memory = None
+        self._start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._phase.seconds += time.perf_counter() - self._start_time
+        if self._start_memory is not None:
+            peaks: List[int] = self._stats._peaks
+            peak: int = max(peaks.pop(), tracemalloc.get_traced_memory()[1])
+            if peaks:
+                peaks[-1] = max(peaks[-1], peak)
+            self._phase.peak_memory = max(
+                self._phase.peak_memory, peak - self._start_memory
+            )
+        return False
+
+
+class _NoPhase:
+    """Context manager doing nothing, used while no statistics are gathered."""
+
+    __slots__ = ()
+
+    def count(self, cells: int = 0, paths: int = 0):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+_current_stats: ContextVar = ContextVar("bioinf_stats", default=None)
+
+
+def phase(name: str, cells: int = 0):
+    """Measures a phase of a run, when statistics are gathered.
+
+    Without collect_stats a shared context manager doing nothing is
+    returned, so that measured code only pays for a single lookup.
+
+    Arguments:
+        name (str): name of the phase, the statistics of phases with the same
+            name are added up.
+        cells (int): number of matrix cells computed in the phase, more can
+            be added with the count method of the context manager.
+
+    Returns:
+        context manager with a count(cells=0, paths=0) method.
+    """
+    stats: Stats = _current_stats.get()
+    if stats is None:
+        return _NO_PHASE
+    return _Phase(stats, name, cells)
+
+
+def _max_rss() -> int:
+    if resource is None:  # pragma: no cover
+        return None
+    # Linux reports the peak resident set size in kilobytes.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@contextmanager
+def collect_stats(trace_memory: bool = True) -> Iterator[Stats]:
+    """Gathers the statistics of the phases run within the context.
+
+    Only the phases run by the current process are gathered, the ones run
+    by worker processes, e.g. of score_all_vs_all, are not.
+
+    Arguments:
+        trace_memory (bool): whether to measure the peak memory of the
+            phases with tracemalloc, which slows memory allocations down.
+
+    Returns:
+        Iterator[Stats] -- statistics, complete once the context is left.
+    """
+    stats = Stats(trace_memory)
+    started_tracing: bool = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+        stats.max_rss = _max_rss()
+        if started_tracing:
+            tracemalloc.stop()
@@ -1,6 +1,15 @@
+from .scoring import SubstitutionMatrix
 from .sequence import Sequence
-from .sequence_alignment import SequenceAlignmentAlgorithmConfig
+from .sequence_alignment import ALGORITHMS, SequenceAlignmentAlgorithmConfig
+from .stats import phase
+import mmap
+import os
+import re
 from configparser import ConfigParser
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
 
 
 class MissingConfigFieldError(Exception):
@@ -8,28 +17,373 @@ class MissingConfigFieldError(Exception):
     """
 
 
+class ImproperConfigFieldError(Exception):
+    """Class representing an improper config field value error.
+    """
+
+
 class ImproperFastaFormatError(Exception):
     """Class representing an improper fasta format error.
     """
 
 
+class MissingFastaRecordError(Exception):
+    """Class representing a missing fasta record error.
+    """
+
+
+class ImproperSubstitutionMatrixFormatError(Exception):
+    """Class representing an improper substitution matrix format error.
+    """
+
+
+@dataclass
+class FastaIndexRecord:
+    """Class representing an entry of a FASTA index (.fai file).
+
+    Attributes:
+        name (str): first word of the record description.
+        length (int): number of sequence elements of the record.
+        offset (int): byte offset of the first sequence element.
+        line_bases (int): number of sequence elements per line.
+        line_width (int): number of bytes per line, including the line break.
+    """
+
+    name: str
+    length: int
+    offset: int
+    line_bases: int
+    line_width: int
+
+    def byte_offset(self, position: int) -> int:
+        """Returns the byte offset of the sequence element at given position."""
+        if self.line_bases == 0:
+            return self.offset
+        line, column = divmod(position, self.line_bases)
+        return self.offset + line * self.line_width + column
+
+
+_SELECTOR_REGION = re.compile(r"^(\d+)-(\d+)$")
+
+
 def read_sequence(filepath: str) -> Sequence:
     """Reads a protein sequence from the given file.
 
+    Besides a plain path, a record selector of the form `file.fa:record` or
+    `file.fa:record:start-end` (1-based, inclusive) can be passed. Selected
+    records are read directly from their offsets found in the FASTA index,
+    which is built next to the file when missing.
+
     Arguments:
         filepath {str} -- file in FASTA format from which the sequence should be read.
 
     Returns:
-        (Sequence) -- sequence retrieved from the file.
+        (Sequence) -- sequence of the first (or selected) record of the file.
     """
-    with open(filepath, "r") as f:
-        description = f.readline()
-        if not description.startswith(">"):
+    if ":" in filepath and not os.path.exists(filepath):
+        with phase("read"):
+            return _read_selected_sequence(filepath)
+
+    records = read_sequences(filepath)
+    try:
+        _, sequence = next(records)
+    finally:
+        records.close()
+    return sequence
+
+
+def _find_line_end(data: mmap.mmap, start: int, end: int) -> int:
+    line_end = data.find(b"\n", start, end)
+    return end if line_end == -1 else line_end
+
+
+def read_sequences(filepath: str) -> Iterator[Tuple[str, Sequence]]:
+    """Reads all protein sequences from the given multi-FASTA file.
+
+    The file is memory-mapped and records are yielded one at a time, so
+    files larger than the available memory can be processed. Line breaks
+    are dropped while gathering the bytes of a record, which directly
+    become the codes of its sequence.
+
+    Arguments:
+        filepath {str} -- file in FASTA format from which the sequences should be read.
+
+    Returns:
+        (Iterator[Tuple[str, Sequence]]) -- description and sequence of every record.
+    """
+    with open(filepath, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ImproperFastaFormatError(f"The file {filepath} is empty")
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:1] != b">":
+                raise ImproperFastaFormatError(
+                    f"The description line of file {filepath} does not start with `>`"
+                )
+
+            record_start: int = 0
+            while record_start < len(data):
+                with phase("read"):
+                    description_end: int = _find_line_end(data, record_start, len(data))
+                    record_end: int = data.find(b"\n>", description_end)
+                    record_end = len(data) if record_end == -1 else record_end + 1
+                    description_start: int = record_start + 1
+                    description: str = data[description_start:description_end].decode()
+
+                    record = np.frombuffer(
+                        data,
+                        dtype=np.uint8,
+                        count=max(0, record_end - description_end - 1),
+                        offset=min(description_end + 1, record_end),
+                    )
+                    codes: np.ndarray = record[
+                        (record != ord("\n")) & (record != ord("\r"))
+                    ]
+                    # The view has to be released before the file is unmapped.
+                    del record
+
+                yield description.strip(), Sequence.from_codes(codes)
+                record_start = record_end
+
+
+def _parse_sequence_selector(selector: str) -> Tuple[str, str, Tuple[int, int]]:
+    fields = selector.rsplit(":", 2)
+    if len(fields) == 3 and _SELECTOR_REGION.match(fields[2]):
+        start, end = _SELECTOR_REGION.match(fields[2]).groups()
+        return fields[0], fields[1], (int(start), int(end))
+
+    filepath, name = selector.rsplit(":", 1)
+    return filepath, name, None
+
+
+def selected_filepath(selector: str) -> str:
+    """Returns the file of a path or record selector, see read_sequence.
+
+    Arguments:
+        selector {str} -- plain path or record selector.
+
+    Returns:
+        (str) -- path of the FASTA file.
+    """
+    if ":" in selector and not os.path.exists(selector):
+        return _parse_sequence_selector(selector)[0]
+    return selector
+
+
+def _read_selected_sequence(selector: str) -> Sequence:
+    filepath, name, region = _parse_sequence_selector(selector)
+    index: Dict[str, FastaIndexRecord] = read_fasta_index(filepath)
+    if name not in index:
+        raise MissingFastaRecordError(f"The file {filepath} has no record {name}")
+
+    record: FastaIndexRecord = index[name]
+    start, end = 0, record.length
+    if region is not None:
+        if region[0] < 1 or region[0] > region[1] or region[0] > record.length:
+            raise MissingFastaRecordError(
+                f"The region {region[0]}-{region[1]} of record {name} is improper"
+            )
+        start, end = region[0] - 1, min(region[1], record.length)
+
+    with open(filepath, "rb") as f:
+        f.seek(record.byte_offset(start))
+        raw_sequence: bytes = f.read(
+            max(0, record.byte_offset(end) - record.byte_offset(start))
+        )
+    return Sequence.from_codes(
+        np.frombuffer(
+            raw_sequence.replace(b"\n", b"").replace(b"\r", b""), dtype=np.uint8
+        )
+    )
+
+
+def build_fasta_index(filepath: str) -> List[FastaIndexRecord]:
+    """Builds a samtools faidx compatible index of the given FASTA file.
+
+    Arguments:
+        filepath {str} -- file in FASTA format to index.
+
+    Raises:
+        ImproperFastaFormatError: if the file does not start with a
+            description line or the lines of a record differ in length.
+
+    Returns:
+        (List[FastaIndexRecord]) -- index entries in the file order.
+    """
+    index: List[FastaIndexRecord] = []
+    with open(filepath, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return index
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:1] != b">":
+                raise ImproperFastaFormatError(
+                    f"The description line of file {filepath} does not start with `>`"
+                )
+
+            record_start: int = 0
+            while record_start < len(data):
+                description_end: int = _find_line_end(data, record_start, len(data))
+                record_end: int = data.find(b"\n>", description_end)
+                record_end = len(data) if record_end == -1 else record_end + 1
+                description_start: int = record_start + 1
+                description: str = data[description_start:description_end].decode()
+                sequence_start: int = min(description_end + 1, record_end)
+
+                record = np.frombuffer(
+                    data,
+                    dtype=np.uint8,
+                    count=record_end - sequence_start,
+                    offset=sequence_start,
+                )
+                line_ends: np.ndarray = np.flatnonzero(record == ord("\n"))
+                if len(record) and record[-1] != ord("\n"):
+                    line_ends = np.append(line_ends, len(record))
+                line_starts: np.ndarray = np.append(0, line_ends[:-1] + 1)[
+                    : len(line_ends)
+                ]
+                carriage_returns: np.ndarray = (line_ends > line_starts) & (
+                    record[np.maximum(line_ends - 1, 0)] == ord("\r")
+                )
+                del record
+
+                line_widths: np.ndarray = line_ends - line_starts + 1
+                line_bases: np.ndarray = np.trim_zeros(
+                    line_widths - 1 - carriage_returns, "b"
+                )
+                name: str = description.split()[0] if description.split() else ""
+                if len(line_bases) and (
+                    np.any(line_bases[:-1] != line_bases[0])
+                    or line_bases[-1] > line_bases[0]
+                ):
+                    raise ImproperFastaFormatError(
+                        f"The lines of record {name} in file {filepath} differ in length"
+                    )
+
+                index.append(
+                    FastaIndexRecord(
+                        name=name,
+                        length=int(line_bases.sum()),
+                        offset=sequence_start,
+                        line_bases=int(line_bases[0]) if len(line_bases) else 0,
+                        line_width=int(line_widths[0]) if len(line_bases) else 0,
+                    )
+                )
+                record_start = record_end
+
+    return index
+
+
+def read_fasta_index(filepath: str) -> Dict[str, FastaIndexRecord]:
+    """Reads the index of the given FASTA file from its `.fai` sidecar file.
+
+    The index is built, and saved when possible, if the sidecar file is
+    missing or older than the FASTA file.
+
+    Arguments:
+        filepath {str} -- file in FASTA format whose index should be read.
+
+    Raises:
+        ImproperFastaFormatError: if several records have the same name.
+
+    Returns:
+        (Dict[str, FastaIndexRecord]) -- index entries by record name.
+    """
+    index_filepath: str = filepath + ".fai"
+    if (
+        os.path.exists(index_filepath)
+        and os.path.getmtime(index_filepath) >= os.path.getmtime(filepath)
+    ):
+        with open(index_filepath, "r") as f:
+            records = [
+                FastaIndexRecord(fields[0], *map(int, fields[1:5]))
+                for fields in (line.rstrip("\n").split("\t") for line in f)
+            ]
+        return _index_by_name(filepath, records)
+
+    records = build_fasta_index(filepath)
+    index: Dict[str, FastaIndexRecord] = _index_by_name(filepath, records)
+    try:
+        write_fasta_index(filepath, records)
+    except OSError:
+        pass
+    return index
+
+
+def _index_by_name(
+    filepath: str, records: List[FastaIndexRecord]
+) -> Dict[str, FastaIndexRecord]:
+    index: Dict[str, FastaIndexRecord] = {}
+    for record in records:
+        if record.name in index:
             raise ImproperFastaFormatError(
-                f"The description line of file {filepath} does not start with `>`"
+                f"The file {filepath} has several records named {record.name}"
             )
-        raw_sequence = f.read().replace("\n", "")
-    return Sequence(raw_sequence)
+        index[record.name] = record
+    return index
+
+
+def write_fasta_index(filepath: str, records: List[FastaIndexRecord]) -> str:
+    """Writes the index of the given FASTA file to its `.fai` sidecar file.
+
+    Arguments:
+        filepath {str} -- indexed file in FASTA format.
+        records {List[FastaIndexRecord]} -- index entries.
+
+    Returns:
+        (str) -- path of the written index file.
+    """
+    index_filepath: str = filepath + ".fai"
+    with open(index_filepath, "w") as f:
+        for record in records:
+            f.write(
+                f"{record.name}\t{record.length}\t{record.offset}\t"
+                f"{record.line_bases}\t{record.line_width}\n"
+            )
+    return index_filepath
+
+
+def read_substitution_matrix(filepath: str) -> SubstitutionMatrix:
+    """Reads a substitution matrix in the NCBI format (e.g. BLOSUM62).
+
+    Lines starting with `#` are comments, the first remaining line lists the
+    symbols of the columns, and every other line holds a symbol followed by
+    its scores against the symbols of the columns.
+
+    Arguments:
+        filepath {str} -- file from which the matrix should be read.
+
+    Raises:
+        ImproperSubstitutionMatrixFormatError: if the rows do not match the
+            columns or the matrix is not symmetric.
+
+    Returns:
+        (SubstitutionMatrix) -- substitution matrix.
+    """
+    with open(filepath, "r") as f:
+        lines = [
+            line.split() for line in f if line.strip() and not line.startswith("#")
+        ]
+    if not lines:
+        raise ImproperSubstitutionMatrixFormatError(f"The file {filepath} is empty")
+
+    symbols: List[str] = lines[0]
+    rows: Dict[str, List[str]] = {fields[0]: fields[1:] for fields in lines[1:]}
+    if sorted(rows) != sorted(symbols) or any(
+        len(scores) != len(symbols) for scores in rows.values()
+    ):
+        raise ImproperSubstitutionMatrixFormatError(
+            f"The rows of the matrix in file {filepath} do not match its columns"
+        )
+
+    try:
+        return SubstitutionMatrix(
+            "".join(symbols), [list(map(int, rows[symbol])) for symbol in symbols]
+        )
+    except ValueError as e:
+        raise ImproperSubstitutionMatrixFormatError(
+            f"Improper matrix in file {filepath}: {e}"
+        ) from e
 
 
 def read_config(filepath: str) -> SequenceAlignmentAlgorithmConfig:
@@ -71,6 +425,11 @@ def read_config(filepath: str) -> SequenceAlignmentAlgorithmConfig:
     gap_penalty = config["DEFAULT"].getint("gap_penalty")
     max_seq_length = config["DEFAULT"].getint("max_seq_length")
     max_number_paths = config["DEFAULT"].getint("max_number_paths")
+    algorithm = config["DEFAULT"].get("algorithm", "needleman-wunsch")
+    band_width = config["DEFAULT"].getint("band_width", 16)
+    gap_open = config["DEFAULT"].getint("gap_open")
+    gap_extend = config["DEFAULT"].getint("gap_extend")
+    substitution_matrix_filepath = config["DEFAULT"].get("substitution_matrix")
 
     if max_number_paths < 0:
         raise MissingConfigFieldError(f"max_number_paths should be a positive integer!")
@@ -78,10 +437,40 @@ def read_config(filepath: str) -> SequenceAlignmentAlgorithmConfig:
     if max_seq_length < 0:
         raise MissingConfigFieldError(f"max_number_paths should be a positive integer!")
 
+    if band_width < 1:
+        raise ImproperConfigFieldError("band_width should be a positive integer!")
+
+    if (gap_open is None) != (gap_extend is None):
+        raise MissingConfigFieldError(
+            "gap_open and gap_extend should be set together!"
+        )
+
+    if gap_open is not None and gap_open > gap_extend:
+        raise ImproperConfigFieldError(
+            "gap_open should not be greater than gap_extend!"
+        )
+
+    substitution_matrix = None
+    if substitution_matrix_filepath is not None:
+        # Relative paths are resolved against the directory of the config.
+        substitution_matrix = read_substitution_matrix(
+            os.path.join(os.path.dirname(filepath), substitution_matrix_filepath)
+        )
+
+    if algorithm not in ALGORITHMS:
+        raise ImproperConfigFieldError(
+            f"algorithm should be one of: {', '.join(ALGORITHMS)}!"
+        )
+
     return SequenceAlignmentAlgorithmConfig(
         same=same,
         diff=diff,
         gap_penalty=gap_penalty,
         max_seq_length=max_seq_length,
         max_number_paths=max_number_paths,
+        algorithm=algorithm,
+        band_width=band_width,
+        gap_open=gap_open,
+        gap_extend=gap_extend,
+        substitution_matrix=substitution_matrix,
     )
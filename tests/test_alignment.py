@@ -1,7 +1,48 @@
-from bioinf.alignment import Alignment
+import pytest
+
+from bioinf.alignment import Alignment, CigarAlignment
+from bioinf.path import Direction, Path
 from bioinf.sequence import Sequence
 
 
 def test_alignment_str():
     alignment: Alignment = Alignment(Sequence("ABC"), Sequence("BBC"))
     assert str(alignment) == "ABC\nBBC"
+
+
+def test_alignment_cigar():
+    alignment = Alignment(Sequence("-MARS-"), Sequence("SMAR-T"))
+
+    assert alignment.cigar == "1I3M1D1I"
+    assert (alignment.left_end, alignment.right_end) == (4, 5)
+
+
+def test_cigar_alignment_expands_gapped_sequences():
+    alignment = CigarAlignment("1I2M1D2M", Sequence("XMARSY"), Sequence("SMART"), 1)
+
+    assert str(alignment) == "-MARSY\nSMA-RT"
+    assert (
+        alignment.cigar
+        == Alignment(
+            alignment.left_sequence_alignment, alignment.right_sequence_alignment
+        ).cigar
+    )
+    assert (alignment.left_end, alignment.right_end) == (6, 5)
+
+
+def test_cigar_alignment_from_path():
+    # Directions in traceback order, from the last cell.
+    path = Path([Direction.DIAG, Direction.UP, Direction.LEFT, Direction.DIAG])
+
+    alignment = CigarAlignment.from_path(
+        path, Sequence("TTABC"), Sequence("ABDG"), (5, 3)
+    )
+
+    assert alignment.cigar == "1M1I1D1M"
+    assert (alignment.left_start, alignment.right_start) == (2, 0)
+    assert str(alignment) == "A-BC\nAB-D"
+
+
+def test_cigar_alignment_rejects_invalid_cigar():
+    with pytest.raises(ValueError):
+        CigarAlignment("3M2X", Sequence("ABC"), Sequence("ABC"))
@@ -0,0 +1,141 @@
+import io
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from os.path import dirname, join
+
+import numpy as np
+
+from bioinf.batch import (
+    PENDING_CHUNKS_PER_WORKER,
+    _all_vs_all_state,
+    _init_all_vs_all_worker,
+    AlignmentTask,
+    align_batch,
+    read_fasta_pairs,
+    read_manifest_pairs,
+    score_all_vs_all,
+    write_score_matrix,
+)
+from bioinf.sequence import Sequence
+from bioinf.sequence_alignment import (
+    NeedlemanWunschSequenceAlignmentAlgorithm,
+    SequenceAlignmentAlgorithmConfig,
+)
+
+
+def get_relative_path(filepath: str):
+    return join(dirname(__file__), filepath)
+
+
+CONFIG = SequenceAlignmentAlgorithmConfig(
+    same=5, diff=-5, gap_penalty=-2, max_seq_length=10, max_number_paths=5
+)
+
+
+def test_read_fasta_pairs():
+    tasks = list(
+        read_fasta_pairs(
+            get_relative_path("resources/multi_a.txt"),
+            get_relative_path("resources/multi_b.txt"),
+        )
+    )
+
+    assert [task.left_description for task in tasks] == ["first", "second", "third"]
+    assert str(tasks[0].right_sequence) == "SMART"
+    assert str(tasks[1].left_sequence) == "ACGTAC"
+
+
+def test_read_manifest_pairs(tmp_path):
+    manifest = tmp_path / "manifest.tsv"
+    manifest.write_text("a.txt\tb.txt\n\nbroken line\n")
+
+    tasks = list(read_manifest_pairs(str(manifest)))
+
+    assert tasks[0] == AlignmentTask("a.txt", "b.txt")
+    assert tasks[1].error is not None
+
+
+def test_align_batch_keeps_order_and_reports_failures():
+    tasks = [
+        AlignmentTask("first", "first", Sequence("MARS"), Sequence("SMART")),
+        AlignmentTask("long", "short", Sequence("A" * 11), Sequence("A")),
+        AlignmentTask("missing", "missing", error="The record has no pair"),
+        AlignmentTask(
+            get_relative_path("resources/a.txt"), get_relative_path("resources/b.txt")
+        ),
+    ]
+
+    results = list(align_batch(tasks, CONFIG, workers=2))
+
+    assert [result.left_description for result in results] == [
+        task.left_description for task in tasks
+    ]
+    assert results[0].result.score == 9
+    assert "is longer than" in results[1].error
+    assert results[2].error == "The record has no pair"
+    assert results[3].result.score == 9
+
+
+def test_align_batch_reads_tasks_as_results_are_consumed():
+    read_count = 0
+
+    def tasks():
+        nonlocal read_count
+        for _ in range(100):
+            read_count += 1
+            yield AlignmentTask("first", "first", Sequence("MARS"), Sequence("SMART"))
+
+    results = align_batch(tasks(), CONFIG, workers=2, chunksize=2)
+
+    assert next(results).result.score == 9
+    assert read_count <= 2 * PENDING_CHUNKS_PER_WORKER * 2
+    assert len(list(results)) == 99
+
+
+def test_align_batch_in_process_score_only():
+    tasks = [AlignmentTask("first", "first", Sequence("MARS"), Sequence("SMART"))]
+
+    results = list(align_batch(tasks, CONFIG, score_only=True, workers=1))
+
+    assert str(results[0]) == "# first vs first\nScore = 9"
+
+
+def test_score_all_vs_all_matches_pairwise_scores():
+    sequences = [Sequence("MARS"), Sequence("SMART"), Sequence("ACGT")]
+
+    scores = score_all_vs_all(sequences, CONFIG, workers=2)
+
+    algorithm = NeedlemanWunschSequenceAlignmentAlgorithm(CONFIG)
+    assert scores.shape == (3, 3)
+    for row, left_sequence in enumerate(sequences):
+        for col, right_sequence in enumerate(sequences):
+            assert scores[row, col] == algorithm.score(left_sequence, right_sequence)
+
+
+def test_all_vs_all_workers_do_not_track_shared_memory(monkeypatch):
+    shared_memory = SharedMemory(create=True, size=8)
+    registered = []
+    monkeypatch.setattr(
+        resource_tracker, "register", lambda *args: registered.append(args)
+    )
+    monkeypatch.setattr(
+        resource_tracker, "unregister", lambda *args: registered.append(args)
+    )
+    try:
+        _init_all_vs_all_worker(shared_memory.name, [Sequence("A")], CONFIG, None)
+        _all_vs_all_state["shared_memory"].close()
+    finally:
+        shared_memory.close()
+        monkeypatch.undo()
+        shared_memory.unlink()
+
+    assert registered == []
+
+
+def test_write_score_matrix():
+    scores = np.array([[20, 9], [9, 25]])
+    stream = io.StringIO()
+
+    write_score_matrix(scores, ["a", "b"], stream)
+
+    assert stream.getvalue() == "\ta\tb\na\t20\t9\nb\t9\t25\n"
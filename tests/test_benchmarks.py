@@ -0,0 +1,127 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from benchmarks import suite
+from benchmarks.compare import compare_results
+from benchmarks.generate import ALPHABETS, sequence_pair
+
+
+@pytest.mark.parametrize("alphabet_name", list(ALPHABETS))
+def test_sequence_pair_is_reproducible(alphabet_name):
+    left, right = sequence_pair(7, alphabet_name, 500, 0.9)
+
+    assert (left, right) == sequence_pair(7, alphabet_name, 500, 0.9)
+    assert len(left) == 500
+    assert set(left + right) <= set(ALPHABETS[alphabet_name])
+    assert left != right
+    assert sequence_pair(8, alphabet_name, 500, 0.9)[0] != left
+
+
+def test_identical_sequence_pair():
+    left, right = sequence_pair(0, "dna", 100, 1.0)
+
+    assert left == right
+
+
+def _results(seconds: float, peak_memory: int, phase_seconds: float) -> dict:
+    phase = {"seconds": phase_seconds, "cells": 0, "peak_memory": 0}
+    return {
+        "results": {
+            "align": {
+                "seconds": seconds,
+                "cells": 100,
+                "peak_memory": peak_memory,
+                "phases": {"fill": phase},
+            }
+        }
+    }
+
+
+def test_compare_results_flags_regressions():
+    baseline = _results(1.0, 10 << 20, 0.5)
+    current = _results(1.2, 10 << 20, 0.0001)
+
+    comparisons = compare_results(baseline, current, threshold=0.1)
+
+    assert [(c.name, c.metric, c.regression) for c in comparisons] == [
+        ("align", "seconds", True),
+        ("align", "peak_memory", False),
+        ("align:fill", "seconds", False),
+    ]
+    assert comparisons[0].change == pytest.approx(0.2)
+
+
+def test_compare_results_skips_noisy_values():
+    baseline = _results(0.0001, 1024, 0.0001)
+    current = _results(1.0, 1 << 30, 1.0)
+
+    assert compare_results(baseline, current) == []
+
+
+def test_compare_results_tracks_hirschberg_memory():
+    baseline, current = _results(0.0001, 1024, 0.0001), _results(0.0001, 2048, 0.0001)
+    for results in (baseline, current):
+        results["results"]["align/hirschberg/dna/10/0.9"] = results["results"].pop(
+            "align"
+        )
+
+    comparisons = compare_results(baseline, current)
+
+    assert [(c.name, c.metric, c.regression) for c in comparisons] == [
+        ("align/hirschberg/dna/10/0.9", "peak_memory", True)
+    ]
+
+
+def test_create_cases_aligns_long_sequences_in_linear_memory(tmpdir):
+    names = [case.name for case in suite.create_cases(str(tmpdir), 0, (20,), 10)]
+
+    assert "align/hirschberg/dna/20/0.9" in names
+    assert "align/needleman-wunsch/dna/20/0.9" not in names
+    assert "score/dna/20/0.9" in names
+
+
+def test_create_cases_fills_with_threads(tmpdir):
+    cases = {case.name: case for case in suite.create_cases(str(tmpdir), 0, (20,))}
+
+    expected = str(cases["align/needleman-wunsch/dna/20/0.9"].run())
+    for threads in suite.THREAD_COUNTS:
+        case = cases[f"align/needleman-wunsch/dna/20/0.9/threads-{threads}"]
+        assert str(case.run()) == expected
+
+
+def test_run_and_compare(tmpdir):
+    baseline, current = str(tmpdir.join("baseline.json")), str(tmpdir.join("b.json"))
+    runner = CliRunner()
+
+    result = runner.invoke(
+        suite.main, ["run", "-o", baseline, "--sizes", "10,20", "--repeats", "1"]
+    )
+
+    assert result.exit_code == 0, result.output
+    with open(baseline) as f:
+        results = json.load(f)
+    assert results["metadata"]["seed"] == 0
+    measurement = results["results"]["align/needleman-wunsch/dna/20/0.9"]
+    assert measurement["cells"] > 0
+    assert measurement["peak_memory"] > 0
+    assert list(measurement["phases"]) == [
+        "score_matrix",
+        "fill",
+        "traceback",
+        "convert",
+    ]
+    for algorithm_name in suite.ALGORITHMS:
+        assert f"align/{algorithm_name}/protein/10/0.5" in results["results"]
+    assert "read/dna/10" in results["results"]
+    assert "cli/dna/20" in results["results"]
+
+    results["results"]["score/dna/20/0.5"]["seconds"] = 1.0
+    results["results"]["score/dna/20/0.5"]["phases"]["score"]["seconds"] = 1.0
+    with open(current, "w") as f:
+        json.dump(results, f)
+
+    compare_args = ["compare", "--min-seconds", "0"]
+    assert runner.invoke(suite.main, compare_args + [baseline, current]).exit_code == 1
+    assert runner.invoke(suite.main, compare_args + [current, baseline]).exit_code == 0
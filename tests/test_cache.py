@@ -0,0 +1,194 @@
+import os
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from bioinf.alignment import CigarAlignment
+from bioinf.batch import AlignmentTask, align_batch
+from bioinf.cache import (
+    CachedSequenceAlignmentAlgorithm,
+    CorruptedCacheEntryError,
+    ResultCache,
+    create_cached_algorithm,
+    deserialize_result,
+    serialize_result,
+)
+from bioinf.scoring import SubstitutionMatrix
+from bioinf.sequence import Sequence
+from bioinf.sequence_alignment import (
+    SequenceAlignmentAlgorithmConfig,
+    SequenceAlignmentResult,
+    create_algorithm,
+)
+
+
+@pytest.fixture
+def config():
+    return SequenceAlignmentAlgorithmConfig(
+        same=5, diff=-5, gap_penalty=-2, max_seq_length=20, max_number_paths=10
+    )
+
+
+def test_serialize_result_round_trip(config):
+    left_sequence, right_sequence = Sequence("GATTACA"), Sequence("GCATGCA")
+    result = create_algorithm(config).align(left_sequence, right_sequence)
+
+    data = serialize_result(result)
+    decoded = deserialize_result(data, left_sequence, right_sequence)
+
+    assert len(result.alignments) > 1
+    assert str(decoded) == str(result)
+    assert all(isinstance(a, CigarAlignment) for a in decoded.alignments)
+    assert str(
+        deserialize_result(
+            serialize_result(SequenceAlignmentResult(7, [])), Sequence(""), Sequence("")
+        )
+    ) == ("Score = 7")
+    with pytest.raises(CorruptedCacheEntryError):
+        deserialize_result(data, Sequence("GAT"), right_sequence)
+
+
+def test_serialize_result_keeps_start_positions(config):
+    algorithm = create_algorithm(config, mode="local")
+    left_sequence, right_sequence = Sequence("TTTGATTACA"), Sequence("CCGATTA")
+    result = algorithm.align(left_sequence, right_sequence)
+
+    decoded = deserialize_result(
+        serialize_result(result), left_sequence, right_sequence
+    )
+
+    assert [(a.left_start, a.right_start) for a in decoded.alignments] == [(3, 2)]
+    assert decoded.alignments[0].cigar == result.alignments[0].cigar == "5M"
+
+
+def test_deserialize_result_rejects_other_data():
+    with pytest.raises(CorruptedCacheEntryError):
+        deserialize_result(b"not a result", Sequence("A"), Sequence("A"))
+
+
+def test_result_cache_key_depends_on_every_field(config):
+    left_sequence, right_sequence = Sequence("GATTACA"), Sequence("GCATGCA")
+    key = ResultCache.key(left_sequence, right_sequence, config, "algorithm")
+    other_configs = [
+        replace(config, gap_penalty=-3),
+        replace(config, max_number_paths=1),
+        replace(config, gap_open=-5, gap_extend=-1),
+        replace(
+            config,
+            substitution_matrix=SubstitutionMatrix(
+                "ACGT", 6 * np.eye(4, dtype=int) - 2
+            ),
+        ),
+    ]
+
+    assert ResultCache.key(left_sequence, right_sequence, config, "algorithm") == key
+    assert (
+        ResultCache.key(
+            left_sequence, right_sequence, replace(config, threads=4), "algorithm"
+        )
+        == key
+    )
+    assert ResultCache.key(right_sequence, left_sequence, config, "algorithm") != key
+    assert ResultCache.key(left_sequence, right_sequence, config, "other") != key
+    for other_config in other_configs:
+        assert (
+            ResultCache.key(left_sequence, right_sequence, other_config, "algorithm")
+            != key
+        )
+
+
+def test_result_cache_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    result = SequenceAlignmentResult(1, [])
+    for age, key in enumerate(["c", "b", "a"]):
+        cache.put(key, result)
+        os.utime(tmp_path / f"{key}.bin", (age, age))
+    cache.max_size = 3 * os.path.getsize(tmp_path / "a.bin")
+    # A hit makes the oldest result the most recently used one.
+    assert cache.get("a", Sequence(""), Sequence("")) is not None
+
+    cache.put("d", result)
+
+    assert sorted(os.listdir(tmp_path)) == ["a.bin", "d.bin"]
+    assert cache.get("b", Sequence(""), Sequence("")) is None
+
+
+def test_result_cache_removes_stale_temporary_files(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    (tmp_path / "stale.tmp").write_bytes(b"partial")
+    (tmp_path / "recent.tmp").write_bytes(b"partial")
+    os.utime(tmp_path / "stale.tmp", (0, 0))
+
+    cache.put("a", SequenceAlignmentResult(1, []))
+
+    assert sorted(os.listdir(tmp_path)) == ["a.bin", "recent.tmp"]
+
+
+def test_result_cache_scans_directory_only_above_bound(tmp_path, monkeypatch):
+    scans = []
+    scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda path: scans.append(path) or scandir(path))
+    cache = ResultCache(str(tmp_path))
+    result = SequenceAlignmentResult(1, [])
+
+    for key in "abcd":
+        cache.put(key, result)
+    assert len(scans) == 1
+
+    cache.max_size = 2 * os.path.getsize(tmp_path / "a.bin")
+    cache.put("e", result)
+    assert len(scans) == 2
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_cached_algorithm_reuses_results(config, tmp_path):
+    config = replace(config, cache_dir=str(tmp_path))
+    left_sequence, right_sequence = Sequence("GATTACA"), Sequence("GCATGCA")
+    alignment_algorithm = create_cached_algorithm(config)
+
+    result = alignment_algorithm.align(left_sequence, right_sequence)
+    cached_result = alignment_algorithm.align(left_sequence, right_sequence)
+
+    assert isinstance(alignment_algorithm, CachedSequenceAlignmentAlgorithm)
+    assert len(os.listdir(tmp_path)) == 1
+    assert str(cached_result) == str(result)
+    assert alignment_algorithm.score(left_sequence, right_sequence) == result.score
+    assert not isinstance(
+        create_cached_algorithm(replace(config, cache_dir=None)),
+        CachedSequenceAlignmentAlgorithm,
+    )
+
+
+def test_cached_algorithm_streams_alignments(config, tmp_path):
+    config = replace(config, cache_dir=str(tmp_path))
+    left_sequence, right_sequence = Sequence("GATTACA"), Sequence("GCATGCA")
+    alignment_algorithm = create_cached_algorithm(config)
+    expected = create_algorithm(config).align(left_sequence, right_sequence)
+
+    score, alignments = alignment_algorithm.iter_align(left_sequence, right_sequence)
+    first = next(alignments)
+    assert os.listdir(tmp_path) == []
+    rest = list(alignments)
+
+    assert score == expected.score
+    assert [str(a) for a in [first] + rest] == [str(a) for a in expected.alignments]
+    assert len(os.listdir(tmp_path)) == 1
+    cached_score, cached = alignment_algorithm.iter_align(left_sequence, right_sequence)
+    assert cached_score == expected.score
+    assert [str(a) for a in cached] == [str(a) for a in expected.alignments]
+
+
+def test_align_batch_workers_share_cache(config, tmp_path):
+    config = replace(config, cache_dir=str(tmp_path))
+    tasks = [
+        AlignmentTask("first", "second", Sequence("GATTACA"), Sequence("GCATGCA")),
+        AlignmentTask("third", "fourth", Sequence("ACGT"), Sequence("AGT")),
+    ] * 4
+
+    results = list(align_batch(tasks, config, workers=2))
+
+    assert len(os.listdir(tmp_path)) == 2
+    assert [str(result) for result in results] == [
+        str(result) for result in results[:2]
+    ] * 4
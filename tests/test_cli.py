@@ -55,6 +55,11 @@ def config_negative_max_number_paths():
     return get_relative_path("resources/config_negative_max_number_paths.ini")
 
 
+@pytest.fixture
+def config_unknown_algorithm():
+    return get_relative_path("resources/config_unknown_algorithm.ini")
+
+
 def test_cli_no_output_file(a_sequence_filepath, b_sequence_filepath, config_filepath):
     runner = CliRunner()
     help_result = runner.invoke(
@@ -65,6 +70,247 @@ def test_cli_no_output_file(a_sequence_filepath, b_sequence_filepath, config_fil
     assert "Score = 9" in help_result.output
 
 
+def test_cli_score_only(a_sequence_filepath, b_sequence_filepath, config_filepath):
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.align,
+        [
+            "-a",
+            a_sequence_filepath,
+            "-b",
+            b_sequence_filepath,
+            "-c",
+            config_filepath,
+            "--score-only",
+        ],
+    )
+    assert result.exit_code == 0
+    assert result.output == "Score = 9\n"
+
+
+def test_cli_algorithm_option(
+    a_sequence_filepath, b_sequence_filepath, config_filepath
+):
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.align,
+        [
+            "-a",
+            a_sequence_filepath,
+            "-b",
+            b_sequence_filepath,
+            "-c",
+            config_filepath,
+            "--algorithm",
+            "hirschberg",
+        ],
+    )
+    assert result.exit_code == 0
+    assert "Score = 9" in result.output
+
+
+def test_cli_local_mode(a_sequence_filepath, b_sequence_filepath, config_filepath):
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.align,
+        [
+            "-a",
+            a_sequence_filepath,
+            "-b",
+            b_sequence_filepath,
+            "-c",
+            config_filepath,
+            "--mode",
+            "local",
+        ],
+    )
+    assert result.exit_code == 0
+    assert result.output == "Score = 15\n\nMAR\nMAR\n"
+
+
+def test_cli_width(a_sequence_filepath, b_sequence_filepath, config_filepath):
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.align,
+        [
+            "-a",
+            a_sequence_filepath,
+            "-b",
+            b_sequence_filepath,
+            "-c",
+            config_filepath,
+            "--mode",
+            "local",
+            "--width",
+            "2",
+        ],
+    )
+    assert result.exit_code == 0
+    assert result.output == (
+        "Score = 15\n\n"
+        "a                1 MA 2\n"
+        "                   ||\n"
+        "b                2 MA 3\n\n"
+        "a                3 R 3\n"
+        "                   |\n"
+        "b                4 R 4\n"
+    )
+
+
+@pytest.mark.parametrize(
+    "output_format, expected_output",
+    [
+        ("cigar", "Score = 15\n\n1\t2\t3M\n"),
+        ("sam", "b\t0\ta\t1\t255\t1S3M1S\t*\t0\t0\tSMART\t*\tAS:i:15\n"),
+    ],
+)
+def test_cli_format(
+    a_sequence_filepath,
+    b_sequence_filepath,
+    config_filepath,
+    output_format,
+    expected_output,
+):
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.align,
+        [
+            "-a",
+            a_sequence_filepath,
+            "-b",
+            b_sequence_filepath,
+            "-c",
+            config_filepath,
+            "--mode",
+            "local",
+            "--format",
+            output_format,
+        ],
+    )
+    assert result.exit_code == 0
+    assert result.output.endswith(expected_output)
+
+
+def test_cli_threads(a_sequence_filepath, b_sequence_filepath, config_filepath):
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.align,
+        [
+            "-a",
+            a_sequence_filepath,
+            "-b",
+            b_sequence_filepath,
+            "-c",
+            config_filepath,
+            "--threads",
+            "2",
+        ],
+    )
+    expected = runner.invoke(
+        cli.align,
+        ["-a", a_sequence_filepath, "-b", b_sequence_filepath, "-c", config_filepath],
+    )
+    assert result.exit_code == 0
+    assert result.output == expected.output
+
+
+def test_cli_scratch_dir(
+    a_sequence_filepath, b_sequence_filepath, config_filepath, tmp_path
+):
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.align,
+        [
+            "-a",
+            a_sequence_filepath,
+            "-b",
+            b_sequence_filepath,
+            "-c",
+            config_filepath,
+            "--scratch-dir",
+            str(tmp_path / "scratch"),
+        ],
+    )
+    expected = runner.invoke(
+        cli.align,
+        ["-a", a_sequence_filepath, "-b", b_sequence_filepath, "-c", config_filepath],
+    )
+    assert result.exit_code == 0
+    assert result.output == expected.output
+    assert (tmp_path / "scratch" / "traceback.dat").exists()
+
+
+def test_cli_cache_dir(
+    a_sequence_filepath, b_sequence_filepath, config_filepath, tmp_path
+):
+    runner = CliRunner()
+    arguments = [
+        "-a",
+        a_sequence_filepath,
+        "-b",
+        b_sequence_filepath,
+        "-c",
+        config_filepath,
+        "--cache-dir",
+        str(tmp_path),
+    ]
+    result = runner.invoke(cli.align, arguments)
+    cached_result = runner.invoke(cli.align, arguments)
+
+    assert result.exit_code == 0
+    assert "Score = 9" in result.output
+    assert cached_result.output == result.output
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_cli_stats(a_sequence_filepath, b_sequence_filepath, config_filepath, tmp_path):
+    output_filepath = tmp_path / "result.txt"
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.align,
+        [
+            "-a",
+            a_sequence_filepath,
+            "-b",
+            b_sequence_filepath,
+            "-c",
+            config_filepath,
+            "-o",
+            str(output_filepath),
+            "--stats",
+        ],
+    )
+    assert result.exit_code == 0
+    assert output_filepath.read_text().startswith("Score = 9")
+    assert [line.split()[0] for line in result.output.splitlines()[1:]] == [
+        "read",
+        "score_matrix",
+        "fill",
+        "traceback",
+        "convert",
+        "max",
+    ]
+
+
+def test_cli_unknown_algorithm_in_config(
+    a_sequence_filepath, b_sequence_filepath, config_unknown_algorithm
+):
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.align,
+        [
+            "-a",
+            a_sequence_filepath,
+            "-b",
+            b_sequence_filepath,
+            "-c",
+            config_unknown_algorithm,
+        ],
+    )
+    assert result.exit_code == 0
+    assert "algorithm should be one of" in result.output
+
+
 def test_cli_output_file(
     a_sequence_filepath, b_sequence_filepath, config_filepath, tmp_path
 ):
@@ -201,3 +447,136 @@ def test_cli_negative_max_number_paths(
     )
     assert help_result.exit_code == 0
     assert "should be a positive integer" in help_result.output
+
+
+def test_cli_align_batch(config_filepath, tmp_path):
+    tmp_file = tmp_path / "result.txt"
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.main,
+        [
+            "align-batch",
+            "-a",
+            get_relative_path("resources/multi_a.txt"),
+            "-b",
+            get_relative_path("resources/multi_b.txt"),
+            "-c",
+            config_filepath,
+            "-o",
+            tmp_file,
+            "-j",
+            "1",
+        ],
+    )
+    with open(tmp_file, "r") as f:
+        output = f.read()
+    assert result.exit_code == 0
+    assert output.index("# first vs first") < output.index("# second vs second")
+    assert "Score = 9" in output
+    assert "Error: Left sequence is longer than 10" in output
+    assert result.output.count("Aligned ") == 1
+    assert "Aligned 3 pairs, 1 failed" in result.output
+
+
+def test_cli_align_batch_reports_progress(config_filepath, monkeypatch):
+    monkeypatch.setattr(cli, "PROGRESS_INTERVAL", 0)
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.main,
+        [
+            "align-batch",
+            "-a",
+            get_relative_path("resources/multi_a.txt"),
+            "-b",
+            get_relative_path("resources/multi_b.txt"),
+            "-c",
+            config_filepath,
+            "-j",
+            "1",
+        ],
+    )
+    assert result.exit_code == 0
+    assert [
+        line for line in result.output.split("\n") if line.startswith("Progress")
+    ] == [f"Progress: {count} pairs done" for count in (1, 2, 3)]
+    assert result.output.count("Aligned ") == 1
+
+
+def test_cli_align_batch_requires_input(config_filepath):
+    runner = CliRunner()
+    result = runner.invoke(cli.main, ["align-batch", "-c", config_filepath])
+    assert result.exit_code != 0
+
+
+def test_cli_align_all(config_filepath):
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.main,
+        [
+            "align-all",
+            "-i",
+            get_relative_path("resources/multi_b.txt"),
+            "-c",
+            config_filepath,
+            "-j",
+            "1",
+        ],
+    )
+    assert result.exit_code == 0
+    assert result.output.splitlines()[1] == "first\t25\t-9\t-3"
+
+
+def test_cli_search(a_sequence_filepath, config_filepath, tmp_path):
+    output_filepath = tmp_path / "hits.txt"
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.main,
+        [
+            "search",
+            "-q",
+            a_sequence_filepath,
+            "-d",
+            get_relative_path("resources/multi_b.txt"),
+            "-c",
+            config_filepath,
+            "-k",
+            "1",
+            "-o",
+            str(output_filepath),
+        ],
+    )
+    assert result.exit_code == 0
+    assert output_filepath.read_text().startswith("# first\nScore = 9\n")
+    assert "Scored 2 of 3 sequences" in result.output
+
+
+def test_cli_record_selector(config_filepath, tmp_path):
+    fasta = tmp_path / "sequences.fa"
+    fasta.write_text(">first\nMARS\n>second\nSMART\n")
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.align,
+        ["-a", f"{fasta}:first", "-b", f"{fasta}:second", "-c", config_filepath],
+    )
+    assert result.exit_code == 0
+    assert "Score = 9" in result.output
+
+
+@pytest.mark.parametrize("selector", ["missing.fa", "missing.fa:first"])
+def test_cli_missing_sequence_file(config_filepath, b_sequence_filepath, selector):
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.align, ["-a", selector, "-b", b_sequence_filepath, "-c", config_filepath]
+    )
+    assert result.exit_code == 2
+    assert "does not exist" in result.output
+    assert result.exception is None or isinstance(result.exception, SystemExit)
+
+
+def test_cli_index(tmp_path):
+    fasta = tmp_path / "sequences.fa"
+    fasta.write_text(">first\nMARS\n")
+    runner = CliRunner()
+    result = runner.invoke(cli.main, ["index", str(fasta)])
+    assert result.exit_code == 0
+    assert (tmp_path / "sequences.fa.fai").read_text() == "first\t4\t7\t4\t5\n"
@@ -0,0 +1,124 @@
+import json
+
+import numpy as np
+import pytest
+
+from bioinf.disk import BlockedMatrix, fill_on_disk
+from bioinf.kernels import fill_anti_diagonals, fill_local_anti_diagonals
+from bioinf.path import PathFinder
+from bioinf.scoring import query_profile
+from bioinf.sequence import Sequence
+
+
+def random_profile(seed: int, left_length: int, right_length: int):
+    random = np.random.RandomState(seed)
+    left = Sequence("".join(random.choice(list("ACGT"), left_length)))
+    right = Sequence("".join(random.choice(list("ACGT"), right_length)))
+    return query_profile(left.codes, right.codes, 3, -2)
+
+
+def fill_in_memory(left_codes, profile, local):
+    score_matrix = np.zeros((len(left_codes) + 1, profile.shape[1] + 1))
+    if local:
+        traceback, best_cell = fill_local_anti_diagonals(
+            score_matrix, left_codes, profile, -2
+        )
+        return score_matrix, traceback, best_cell
+    score_matrix[:, 0] = -2 * np.arange(len(left_codes) + 1)
+    score_matrix[0, :] = -2 * np.arange(profile.shape[1] + 1)
+    traceback = fill_anti_diagonals(score_matrix, left_codes, profile, -2)
+    return score_matrix, traceback, (len(left_codes), profile.shape[1])
+
+
+@pytest.mark.parametrize("local", [False, True])
+def test_fill_on_disk_matches_fill_in_memory(tmp_path, local):
+    left_codes, profile = random_profile(0, 47, 31)
+    expected_matrix, expected_traceback, expected_cell = fill_in_memory(
+        left_codes, profile, local
+    )
+
+    score_matrix, traceback, last_cell = fill_on_disk(
+        str(tmp_path), left_codes, profile, -2, local=local, block_rows=5
+    )
+
+    assert np.array_equal(score_matrix, expected_matrix)
+    assert np.array_equal(traceback.matrix, expected_traceback)
+    assert last_cell == expected_cell
+
+
+def test_fill_on_disk_resumes_from_checkpoint(tmp_path):
+    left_codes, profile = random_profile(1, 40, 23)
+    expected_matrix, expected_traceback, _ = fill_in_memory(left_codes, profile, False)
+    score_matrix, traceback, _ = fill_on_disk(
+        str(tmp_path), left_codes, profile, -2, block_rows=8
+    )
+    # An interrupted fill: only the first blocks are finished, the rows of
+    # the next ones hold anything.
+    checkpoint_filepath = tmp_path / "checkpoint.json"
+    checkpoint = json.loads(checkpoint_filepath.read_text())
+    checkpoint["filled_rows"] = 17
+    checkpoint_filepath.write_text(json.dumps(checkpoint))
+    score_matrix[17:, 1:] = 0
+    traceback.matrix[17:, 1:] = 0
+    traceback.matrix[1, 1] = 0xFF
+    score_matrix.flush()
+    traceback.matrix.flush()
+
+    score_matrix, traceback, _ = fill_on_disk(
+        str(tmp_path), left_codes, profile, -2, block_rows=8
+    )
+
+    assert np.array_equal(score_matrix, expected_matrix)
+    # Finished rows are not filled again.
+    assert traceback[1, 1] == 0xFF
+    assert np.array_equal(traceback.matrix[2:], expected_traceback[2:])
+    assert json.loads(checkpoint_filepath.read_text())["filled_rows"] == 41
+
+
+def test_fill_on_disk_overwrites_other_fill(tmp_path):
+    fill_on_disk(str(tmp_path), *random_profile(2, 30, 30), -2, block_rows=4)
+    left_codes, profile = random_profile(3, 30, 30)
+    expected_matrix, expected_traceback, _ = fill_in_memory(left_codes, profile, False)
+
+    score_matrix, traceback, _ = fill_on_disk(
+        str(tmp_path), left_codes, profile, -2, block_rows=4
+    )
+
+    assert np.array_equal(score_matrix, expected_matrix)
+    assert np.array_equal(traceback.matrix, expected_traceback)
+
+
+def test_blocked_matrix_reads_cells():
+    matrix = np.arange(35).reshape(7, 5)
+    blocked_matrix = BlockedMatrix(matrix, 3, cached_blocks=2)
+
+    assert [blocked_matrix[cell] for cell in [(6, 4), (4, 1), (0, 2), (2, 3)]] == [
+        34,
+        21,
+        2,
+        13,
+    ]
+    assert blocked_matrix.shape == (7, 5)
+    assert np.array_equal(blocked_matrix.read_block(6), matrix[6:])
+    # Only the last read blocks are kept.
+    assert list(blocked_matrix._blocks) == [0, 6]
+
+
+@pytest.mark.parametrize("local", [False, True])
+def test_path_finder_walks_blocked_traceback(local):
+    # Repeated symbols lead to many paths, crossing several blocks.
+    left, right = Sequence("AATTAATTAAGGATTAATTAAT"), Sequence("ATATTAATGATTAAA")
+    left_codes, profile = query_profile(left.codes, right.codes, 3, -2)
+    _, expected_traceback, last_cell = fill_in_memory(left_codes, profile, local)
+    expected = PathFinder(expected_traceback, last_cell, 1000)
+    traceback = BlockedMatrix(expected_traceback, 4)
+
+    path_finder = PathFinder(traceback, last_cell, 1000)
+
+    path_count = expected.count_paths()
+    assert path_count > 1
+    assert path_finder.count_paths() == path_count
+    assert [path_finder.path_at(i) for i in range(path_count)] == [
+        expected.path_at(i) for i in range(path_count)
+    ]
+    assert list(path_finder.iter_paths()) == list(expected.iter_paths())
@@ -0,0 +1,225 @@
+import numpy as np
+import pytest
+
+from bioinf.kernels import (
+    best_local_score,
+    fill_affine_anti_diagonals,
+    fill_affine_last_row,
+    fill_anti_diagonals,
+    fill_band,
+    fill_last_row,
+    fill_local_anti_diagonals,
+)
+from bioinf.path import TRACEBACK_ORDER, Direction
+from bioinf.scoring import query_profile
+from bioinf.sequence import Sequence
+
+
+def profile(left: str, right: str, same: int, diff: int):
+    return query_profile(Sequence(left).codes, Sequence(right).codes, same, diff)
+
+
+def scalar_fill(
+    left: str, right: str, same: int, diff: int, gap_penalty: int, local=False
+):
+    score_matrix = np.zeros((len(left) + 1, len(right) + 1))
+    if not local:
+        score_matrix[1:, 0] = [gap_penalty * ind for ind in range(1, len(left) + 1)]
+        score_matrix[0, 1:] = [gap_penalty * ind for ind in range(1, len(right) + 1)]
+    directions = {}
+    for row in range(1, len(left) + 1):
+        for col in range(1, len(right) + 1):
+            diag_weight = same if left[row - 1] == right[col - 1] else diff
+            available_score = [
+                score_matrix[row, col - 1] + gap_penalty,
+                score_matrix[row - 1, col - 1] + diag_weight,
+                score_matrix[row - 1, col] + gap_penalty,
+            ]
+            score_matrix[row, col] = max(available_score + [0] * local)
+            directions[(row, col)] = [
+                score == score_matrix[row, col] for score in available_score
+            ]
+    return score_matrix, directions
+
+
+def test_fill_anti_diagonals_matches_scalar_fill():
+    random = np.random.RandomState(0)
+    left = "".join(random.choice(list("ACGT"), 23))
+    right = "".join(random.choice(list("ACGT"), 17))
+    expected_matrix, expected_directions = scalar_fill(left, right, 5, -5, -2)
+
+    score_matrix = np.zeros((len(left) + 1, len(right) + 1))
+    score_matrix[:, 0] = expected_matrix[:, 0]
+    score_matrix[0, :] = expected_matrix[0, :]
+    traceback = fill_anti_diagonals(
+        score_matrix,
+        *profile(left, right, 5, -5),
+        -2,
+    )
+
+    assert np.array_equal(score_matrix, expected_matrix)
+    for cell, directions in expected_directions.items():
+        assert [
+            bool(traceback[cell] & direction.bit) for direction in TRACEBACK_ORDER
+        ] == directions
+
+
+@pytest.mark.parametrize("local", [False, True])
+def test_tiled_fill_matches_serial_fill(local):
+    # Large enough for the tiles of several tile anti-diagonals.
+    random = np.random.RandomState(9)
+    left = "".join(random.choice(list("ACGT"), 1100))
+    right = "".join(random.choice(list("ACGT"), 1300))
+    fill = fill_local_anti_diagonals if local else fill_anti_diagonals
+    results = []
+    for threads in (1, 3):
+        score_matrix = np.zeros((len(left) + 1, len(right) + 1))
+        if not local:
+            score_matrix[:, 0] = -2 * np.arange(len(left) + 1)
+            score_matrix[0, :] = -2 * np.arange(len(right) + 1)
+        result = fill(score_matrix, *profile(left, right, 3, -2), -2, threads)
+        results.append((score_matrix, result))
+
+    (serial_matrix, serial_result), (tiled_matrix, tiled_result) = results
+    assert np.array_equal(tiled_matrix, serial_matrix)
+    if local:
+        assert np.array_equal(tiled_result[0], serial_result[0])
+        assert tiled_result[1] == serial_result[1]
+    else:
+        assert np.array_equal(tiled_result, serial_result)
+
+
+def test_fill_last_row_matches_scalar_fill():
+    random = np.random.RandomState(1)
+    left = "".join(random.choice(list("ACGT"), 19))
+    right = "".join(random.choice(list("ACGT"), 31))
+    expected_matrix, _ = scalar_fill(left, right, 3, -1, -2)
+
+    last_row = fill_last_row(*profile(left, right, 3, -1), -2)
+
+    assert last_row.dtype == np.int64
+    assert np.array_equal(last_row, expected_matrix[-1])
+
+
+@pytest.mark.parametrize("same, diff, gap_penalty", [(3, -1, -2), (3000, -1000, -2000)])
+def test_row_kernels_score_batches(same, diff, gap_penalty):
+    # Large weights do not fit the rows into int16 and widen their type.
+    random = np.random.RandomState(7)
+    lefts = ["".join(random.choice(list("ACGT"), 18)) for _ in range(5)]
+    right = "".join(random.choice(list("ACGT"), 25))
+    left_codes, batch_profile = profile("".join(lefts), right, same, diff)
+    left_codes = left_codes.reshape(len(lefts), -1)
+
+    last_rows = fill_last_row(left_codes, batch_profile, gap_penalty)
+    local_scores = best_local_score(left_codes, batch_profile, gap_penalty)
+    affine_rows = fill_affine_last_row(
+        left_codes, batch_profile, 2 * gap_penalty, gap_penalty
+    )
+
+    for index, left in enumerate(lefts):
+        expected_matrix, _ = scalar_fill(left, right, same, diff, gap_penalty)
+        assert np.array_equal(last_rows[index], expected_matrix[-1])
+        expected_matrix, _ = scalar_fill(
+            left, right, same, diff, gap_penalty, local=True
+        )
+        assert local_scores[index] == expected_matrix.max()
+        score_matrix, _ = fill_affine_anti_diagonals(
+            *profile(left, right, same, diff), 2 * gap_penalty, gap_penalty
+        )
+        assert np.array_equal(affine_rows[index], score_matrix[-1])
+
+
+def test_fill_band_matches_scalar_fill_within_band():
+    random = np.random.RandomState(2)
+    left = "".join(random.choice(list("ACGT"), 21))
+    right = "".join(random.choice(list("ACGT"), 24))
+    expected_matrix, _ = scalar_fill(left, right, 5, -5, -2)
+
+    score_matrix, traceback = fill_band(*profile(left, right, 5, -5), -2, -30, 40)
+
+    assert np.array_equal(np.asarray(score_matrix), expected_matrix)
+    assert traceback[0, 0] == 0
+    assert traceback[1, 0] == Direction.UP.bit
+
+
+def test_fill_band_excludes_cells_outside_band():
+    score_matrix, traceback = fill_band(*profile("MARS", "SMARTS", 5, -5), -2, -1, 3)
+
+    assert score_matrix.band.shape == (5, 5)
+    assert score_matrix[3, 0] < -(10 ** 9)
+    assert traceback[0, 4] == 0
+    assert traceback[0, 3] != 0
+
+
+def test_fill_local_anti_diagonals_matches_scalar_fill():
+    random = np.random.RandomState(3)
+    left = "".join(random.choice(list("ACGT"), 29))
+    right = "".join(random.choice(list("ACGT"), 18))
+    expected_matrix, expected_directions = scalar_fill(
+        left, right, 3, -2, -2, local=True
+    )
+
+    score_matrix = np.zeros((len(left) + 1, len(right) + 1))
+    traceback, best_cell = fill_local_anti_diagonals(
+        score_matrix, *profile(left, right, 3, -2), -2
+    )
+
+    assert np.array_equal(score_matrix, expected_matrix)
+    assert score_matrix[best_cell] == expected_matrix.max()
+    for cell, directions in expected_directions.items():
+        if expected_matrix[cell] == 0:
+            assert traceback[cell] == 0
+        else:
+            assert [
+                bool(traceback[cell] & direction.bit) for direction in TRACEBACK_ORDER
+            ] == directions
+
+
+def test_fill_local_anti_diagonals_without_positive_score():
+    score_matrix = np.zeros((4, 4))
+    traceback, best_cell = fill_local_anti_diagonals(
+        score_matrix, *profile("AAA", "CCC", 5, -5), -2
+    )
+
+    assert best_cell == (0, 0)
+    assert not np.any(score_matrix)
+    assert not np.any(traceback)
+
+
+def test_best_local_score_matches_scalar_fill():
+    random = np.random.RandomState(4)
+    left = "".join(random.choice(list("ACGT"), 37))
+    right = "".join(random.choice(list("ACGT"), 26))
+    expected_matrix, _ = scalar_fill(left, right, 3, -2, -2, local=True)
+
+    score = best_local_score(*profile(left, right, 3, -2), -2)
+
+    assert score == expected_matrix.max()
+
+
+def test_fill_affine_anti_diagonals_with_linear_gaps_matches_scalar_fill():
+    random = np.random.RandomState(5)
+    left = "".join(random.choice(list("ACGT"), 22))
+    right = "".join(random.choice(list("ACGT"), 27))
+    expected_matrix, expected_directions = scalar_fill(left, right, 5, -5, -2)
+
+    score_matrix, traceback = fill_affine_anti_diagonals(
+        *profile(left, right, 5, -5), -2, -2
+    )
+
+    assert np.array_equal(score_matrix, expected_matrix)
+    for cell, directions in expected_directions.items():
+        assert [
+            bool(traceback[cell] & direction.bit) for direction in TRACEBACK_ORDER
+        ] == directions
+
+
+def test_fill_affine_last_row_matches_affine_fill():
+    random = np.random.RandomState(6)
+    left = "".join(random.choice(list("ACGT"), 33))
+    right = "".join(random.choice(list("ACGT"), 24))
+
+    score_matrix, _ = fill_affine_anti_diagonals(*profile(left, right, 4, -3), -6, -1)
+    last_row = fill_affine_last_row(*profile(left, right, 4, -3), -6, -1)
+
+    assert np.array_equal(last_row, score_matrix[-1])
@@ -0,0 +1,118 @@
+import io
+
+from bioinf.alignment import Alignment, CigarAlignment
+from bioinf.output import AlignmentWriter, CigarWriter, SamWriter, format_blocks
+from bioinf.sequence import Sequence
+from bioinf.sequence_alignment import SequenceAlignmentResult
+
+
+def _alignment(left: str, right: str) -> Alignment:
+    return Alignment(Sequence(left), Sequence(right))
+
+
+def test_writer_matches_result_str():
+    result = SequenceAlignmentResult(
+        9, [_alignment("MARS-", "-MART"), _alignment("MA-RS", "SMART")]
+    )
+    stream = io.StringIO()
+
+    count = AlignmentWriter(stream).write_result(result.score, result.alignments)
+
+    assert count == 2
+    assert stream.getvalue() == f"{result}\n"
+
+
+def test_writer_consumes_alignments_lazily():
+    stream = io.StringIO()
+    written = []
+
+    def alignments():
+        for index in range(3):
+            written.append(stream.getvalue())
+            yield _alignment("A" * (index + 1), "A" * (index + 1))
+
+    AlignmentWriter(stream, buffer_size=1).write_result(5, alignments())
+
+    assert written == ["Score = 5", "Score = 5\n\nA\nA", "Score = 5\n\nA\nA\n\nAA\nAA"]
+    assert stream.getvalue().endswith("\n\nAAA\nAAA\n")
+
+
+def test_format_blocks():
+    alignment = _alignment("GATT--ACAGGGGATTACA", "GACTTTAC----GGAATTA")
+
+    assert format_blocks(alignment, 8, ("left", "right")).split("\n") == [
+        "left             1 GATT--AC 6",
+        "                   ||.|  ||",
+        "right            1 GACTTTAC 8",
+        "",
+        "left             7 AGGGGATT 14",
+        "                       |...",
+        "right            9 ----GGAA 12",
+        "",
+        "left            15 ACA 17",
+        "                   ..|",
+        "right           13 TTA 15",
+    ]
+
+
+def test_format_blocks_without_symbols_of_a_sequence():
+    alignment = _alignment("----A", "CCCCA")
+
+    assert format_blocks(alignment, 4).split("\n")[0] == "a                0 ---- 0"
+    assert format_blocks(alignment, 4).split("\n")[4] == "a                1 A 1"
+
+
+def test_format_blocks_of_local_alignment():
+    alignment = CigarAlignment("3M", Sequence("GGGGGGMARS"), Sequence("SMART"), 6, 1)
+
+    assert format_blocks(alignment, 2).split("\n") == [
+        "a                7 MA 8",
+        "                   ||",
+        "b                2 MA 3",
+        "",
+        "a                9 R 9",
+        "                   |",
+        "b                4 R 4",
+    ]
+
+
+def test_cigar_writer():
+    stream = io.StringIO()
+    alignments = [_alignment("-MARS", "SMA-R"), _alignment("MARS", "MART")]
+
+    CigarWriter(stream).write_result(9, alignments)
+
+    assert stream.getvalue() == "Score = 9\n\n1\t1\t1I2M1D1M\n1\t1\t4M\n"
+
+
+def test_sam_writer_clips_unaligned_query_ends():
+    left_sequence, right_sequence = Sequence("TTGATTACA"), Sequence("CCGATTAGG")
+    alignments = [
+        CigarAlignment("5M", left_sequence, right_sequence, 2, 2),
+        CigarAlignment("2M1D3M", left_sequence, right_sequence, 2, 2),
+    ]
+    stream = io.StringIO()
+
+    SamWriter(stream, left_sequence, right_sequence).write_result(25, alignments)
+
+    assert stream.getvalue().split("\n") == [
+        "@HD\tVN:1.6\tSO:unsorted",
+        "@SQ\tSN:a\tLN:9",
+        "@PG\tID:bioinf\tPN:bioinf",
+        "b\t0\ta\t3\t255\t2S5M2S\t*\t0\t0\tCCGATTAGG\t*\tAS:i:25",
+        "b\t256\ta\t3\t255\t2S2M1D3M2S\t*\t0\t0\tCCGATTAGG\t*\tAS:i:25",
+        "",
+    ]
+
+
+def test_sam_writer_writes_empty_alignment_as_unmapped():
+    left_sequence, right_sequence = Sequence("AAAA"), Sequence("CC")
+    stream = io.StringIO()
+
+    SamWriter(stream, left_sequence, right_sequence).write_result(
+        0, [CigarAlignment("", left_sequence, right_sequence, 4, 2)]
+    )
+
+    assert stream.getvalue().split("\n")[3] == (
+        "b\t4\t*\t0\t0\t*\t*\t0\t0\tCC\t*\tAS:i:0"
+    )
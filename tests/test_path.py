@@ -0,0 +1,93 @@
+from math import comb
+from random import Random
+
+import numpy as np
+import pytest
+
+from bioinf.path import Direction, Path, PathFinder
+
+
+def test_path_finder_follows_traceback_bits():
+    traceback = np.array(
+        [
+            [0, Direction.LEFT.bit],
+            [Direction.UP.bit, Direction.LEFT.bit | Direction.DIAG.bit],
+        ],
+        dtype=np.uint8,
+    )
+    paths = PathFinder(traceback, (1, 1), 5).find_all_paths()
+
+    assert [list(path) for path in paths] == [
+        [Direction.LEFT, Direction.UP],
+        [Direction.DIAG],
+    ]
+
+
+def test_path_finder_handles_paths_longer_than_recursion_limit():
+    length = 5000
+    traceback = np.full((1, length + 1), Direction.LEFT.bit, dtype=np.uint8)
+    traceback[0, 0] = 0
+
+    paths = list(PathFinder(traceback, (0, length), 1).iter_paths())
+
+    assert len(paths) == 1
+    assert bytes(paths[0]) == bytes([Direction.LEFT.value]) * length
+
+
+def test_path_finder_yields_paths_lazily():
+    traceback = np.full((3, 3), Direction.LEFT.bit | Direction.UP.bit, dtype=np.uint8)
+    traceback[0, 1:] = Direction.LEFT.bit
+    traceback[1:, 0] = Direction.UP.bit
+    traceback[0, 0] = 0
+
+    path_iterator = PathFinder(traceback, (2, 2), 1).iter_paths()
+
+    assert next(path_iterator) == Path([Direction.LEFT] * 2 + [Direction.UP] * 2)
+    assert len(list(path_iterator)) == 5
+
+
+def test_path_is_immutable_and_compact():
+    path = Path([Direction.UP, Direction.DIAG])
+
+    assert bytes(path) == bytes([Direction.UP.value, Direction.DIAG.value])
+    assert list(path) == [Direction.UP, Direction.DIAG]
+    assert len(path) == 2
+    assert hash(path) == hash(Path.from_bytes(bytes(path)))
+
+
+def test_path_finder_counts_and_unranks_paths():
+    traceback = np.full((4, 5), Direction.LEFT.bit | Direction.UP.bit, dtype=np.uint8)
+    traceback[0, 1:] = Direction.LEFT.bit
+    traceback[1:, 0] = Direction.UP.bit
+    traceback[0, 0] = 0
+    traceback[2, 2] |= Direction.DIAG.bit
+    path_finder = PathFinder(traceback, (3, 4), 1000)
+
+    paths = list(path_finder.iter_paths())
+
+    assert path_finder.count_paths() == len(paths)
+    assert [path_finder.path_at(index) for index in range(len(paths))] == paths
+    assert path_finder.sample_path(Random(0)) in paths
+    with pytest.raises(IndexError):
+        path_finder.path_at(len(paths))
+
+
+def test_path_finder_counts_paths_with_arbitrary_precision():
+    size = 40
+    traceback = np.full(
+        (size + 1, size + 1),
+        Direction.LEFT.bit | Direction.DIAG.bit | Direction.UP.bit,
+        dtype=np.uint8,
+    )
+    traceback[0, 1:] = Direction.LEFT.bit
+    traceback[1:, 0] = Direction.UP.bit
+    traceback[0, 0] = 0
+
+    path_finder = PathFinder(traceback, (size, size), 1)
+
+    # Central Delannoy number D(40, 40).
+    assert path_finder.count_paths() == sum(
+        comb(size, k) * comb(size, k) * 2 ** k for k in range(size + 1)
+    )
+    assert path_finder.count_paths() > np.iinfo(np.int64).max
+    assert len(path_finder.path_at(path_finder.count_paths() - 1)) == 2 * size
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from bioinf.scoring import SubstitutionMatrix, query_profile
+from bioinf.sequence import Sequence, UnknownSymbolError
+
+
+def test_query_profile_with_same_and_diff():
+    left = Sequence("ACCA").codes
+    right = Sequence("CAT").codes
+
+    profile_rows, profile = query_profile(left, right, 2, -1)
+
+    assert profile.dtype == np.int64
+    assert profile.shape == (2, 3)
+    assert np.array_equal(
+        profile[profile_rows], np.where(left[:, np.newaxis] == right, 2, -1)
+    )
+
+
+def test_query_profile_with_substitution_matrix():
+    matrix = SubstitutionMatrix("AC", [[4, -2], [-2, 7]])
+
+    profile_rows, profile = query_profile(
+        Sequence("CCa").codes, Sequence("ACA").codes, 1, -1, matrix
+    )
+
+    assert np.array_equal(
+        profile[profile_rows], [[-2, 7, -2], [-2, 7, -2], [4, -2, 4]]
+    )
+
+
+def test_substitution_matrix_validation():
+    matrix = SubstitutionMatrix("AC", [[4, -2], [-2, 7]])
+
+    with pytest.raises(UnknownSymbolError):
+        matrix.profile(Sequence("AG").codes, Sequence("A").codes)
+    with pytest.raises(ValueError):
+        SubstitutionMatrix("AC", [[4, -2], [-1, 7]])
+    with pytest.raises(ValueError):
+        SubstitutionMatrix("ACG", [[4, -2], [-2, 7]])
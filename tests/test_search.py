@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from bioinf.scoring import SubstitutionMatrix
+from bioinf.search import search
+from bioinf.sequence import Sequence
+from bioinf.sequence_alignment import (
+    SequenceAlignmentAlgorithmConfig,
+    TooLongSequenceError,
+    create_algorithm,
+)
+
+
+def random_database(seed: int, count: int):
+    random = np.random.RandomState(seed)
+    return [
+        (f"target{index}", Sequence("".join(random.choice(list("ACGT"), length))))
+        for index, length in enumerate(random.randint(0, 40, count))
+    ]
+
+
+@pytest.mark.parametrize(
+    "config_fields, mode",
+    [
+        ({}, None),
+        ({}, "local"),
+        ({"gap_open": -5, "gap_extend": -1}, None),
+        (
+            {
+                "substitution_matrix": SubstitutionMatrix(
+                    "ACGT", 6 * np.eye(4, dtype=int) - 2
+                )
+            },
+            None,
+        ),
+    ],
+)
+def test_search_finds_best_scoring_targets(config_fields, mode):
+    config = SequenceAlignmentAlgorithmConfig(
+        same=3,
+        diff=-2,
+        gap_penalty=-2,
+        max_seq_length=35,
+        max_number_paths=1,
+        **config_fields,
+    )
+    query = Sequence("ACGTTGCAAGCTTACG")
+    database = random_database(0, 60)
+
+    result = search(query, iter(database), config, 5, mode=mode)
+
+    algorithm = create_algorithm(config, mode=mode)
+    expected = sorted(
+        (
+            (-algorithm.score(target, query), index)
+            for index, (_, target) in enumerate(database)
+            if len(target) <= config.max_seq_length
+        )
+    )[:5]
+    assert [(-hit.score, hit.index) for hit in result.hits] == expected
+    assert [hit.result.score for hit in result.hits] == [
+        hit.score for hit in result.hits
+    ]
+    # Hits are aligned in the orientation in which they were scored.
+    assert [str(hit.result) for hit in result.hits] == [
+        str(algorithm.align(database[hit.index][1], query)) for hit in result.hits
+    ]
+    assert result.target_count == 60
+    assert len(result.skipped) == sum(len(target) > 35 for _, target in database)
+    assert result.scored_count < result.target_count - len(result.skipped)
+
+
+def test_search_too_long_query():
+    config = SequenceAlignmentAlgorithmConfig(
+        same=3, diff=-2, gap_penalty=-2, max_seq_length=3, max_number_paths=1
+    )
+
+    with pytest.raises(TooLongSequenceError):
+        search(Sequence("ACGT"), [], config, 5)
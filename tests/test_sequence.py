@@ -1,6 +1,57 @@
-from bioinf.sequence import Sequence
+import pickle
+
+import numpy as np
+import pytest
+
+from bioinf.sequence import Alphabet, Sequence, UnknownSymbolError
 
 
 def test_sequence_str():
     sequence: Sequence = Sequence("ABC")
     assert str(sequence) == "ABC"
+
+
+def test_sequence_codes():
+    sequence: Sequence = Sequence("ABC")
+
+    assert sequence.codes.dtype == np.uint8
+    assert sequence.codes.tolist() == [ord("A"), ord("B"), ord("C")]
+    assert not sequence.codes.flags.writeable
+
+
+def test_sequence_slicing_shares_codes():
+    sequence: Sequence = Sequence("MARS")
+
+    sliced: Sequence = sequence[1:3]
+
+    assert np.shares_memory(sliced.codes, sequence.codes)
+    assert str(sliced) == "AR"
+    assert len(sliced) == 2
+    assert sliced[0] == "A"
+
+
+def test_sequence_with_alphabet():
+    alphabet: Alphabet = Alphabet("ACGT")
+    sequence: Sequence = Sequence("GATTACA", alphabet)
+
+    assert sequence.codes.tolist() == [2, 0, 3, 3, 0, 1, 0]
+    assert str(Sequence.from_codes(sequence.codes[::-1], alphabet)) == "ACATTAG"
+    with pytest.raises(UnknownSymbolError):
+        Sequence("GAUUACA", alphabet).codes
+
+
+def test_sequence_byte_values_ignore_alphabet():
+    sequence: Sequence = Sequence("GATTACA", Alphabet("ACGT"))
+
+    assert sequence.byte_values.tolist() == Sequence("GATTACA").codes.tolist()
+
+
+def test_sequence_with_non_latin_1_symbols():
+    with pytest.raises(UnknownSymbolError, match="Ś"):
+        Sequence("MARŚ").codes
+
+
+def test_sequence_pickling():
+    sequence: Sequence = pickle.loads(pickle.dumps(Sequence("MARS")[1:]))
+
+    assert str(sequence) == "ARS"
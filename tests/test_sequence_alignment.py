@@ -3,18 +3,31 @@
 
 """Tests for `bioinf` package."""
 
+from dataclasses import replace
+
+import numpy as np
 import pytest
 
 from bioinf.converters import PathToAlignmentConverter
 from bioinf.path import Direction
-from bioinf.sequence import Sequence
+from bioinf.scoring import SubstitutionMatrix
+from bioinf.sequence import Alphabet, Sequence
 from bioinf.sequence_alignment import (
+    ALGORITHMS,
     Alignment,
     TooLongSequenceError,
     ISequenceAlignmentAlgorithm,
     SequenceAlignmentAlgorithmConfig,
     NeedlemanWunschSequenceAlignmentAlgorithm,
+    HirschbergSequenceAlignmentAlgorithm,
+    BandedNeedlemanWunschSequenceAlignmentAlgorithm,
+    GotohSequenceAlignmentAlgorithm,
+    SmithWatermanSequenceAlignmentAlgorithm,
     SequenceAlignmentResult,
+    UnsupportedGapPenaltyError,
+    UnsupportedModeError,
+    UnsupportedOptionError,
+    create_algorithm,
 )
 
 
@@ -46,6 +59,31 @@ def test_needleman_wunsch_alignment_max_number_paths_violation():
     assert result.score == 9
 
 
+def test_needleman_wunsch_score_only():
+    config: SequenceAlignmentAlgorithmConfig = SequenceAlignmentAlgorithmConfig(
+        same=5, diff=-5, gap_penalty=-2, max_seq_length=10, max_number_paths=5
+    )
+    algorithm = NeedlemanWunschSequenceAlignmentAlgorithm(config=config)
+
+    assert algorithm.score(Sequence("MARS"), Sequence("SMART")) == 9
+    assert algorithm.score(Sequence("SMART"), Sequence("MARS")) == 9
+
+
+def test_needleman_wunsch_path_finder_counts_alignments():
+    config: SequenceAlignmentAlgorithmConfig = SequenceAlignmentAlgorithmConfig(
+        same=5, diff=-5, gap_penalty=-2, max_seq_length=10, max_number_paths=1
+    )
+    algorithm = NeedlemanWunschSequenceAlignmentAlgorithm(config=config)
+
+    score, path_finder = algorithm.create_path_finder(
+        Sequence("MARS"), Sequence("SMART")
+    )
+
+    assert score == 9
+    assert path_finder.count_paths() == 2
+    assert path_finder.path_at(1) == list(path_finder.iter_paths())[1]
+
+
 def test_needleman_wunsch_too_long_sequence_handling():
     config: SequenceAlignmentAlgorithmConfig = SequenceAlignmentAlgorithmConfig(
         same=5, diff=-5, gap_penalty=-2, max_seq_length=2, max_number_paths=5
@@ -72,6 +110,34 @@ def test_path_to_alignment_converter():
     assert alignment.right_sequence_alignment._raw_sequence == "ABC-D"
 
 
+def test_path_to_alignment_converter_convert_all():
+    config = SequenceAlignmentAlgorithmConfig(
+        same=1, diff=-1, gap_penalty=-1, max_seq_length=100, max_number_paths=100
+    )
+    left_sequence, right_sequence = Sequence("GATTACAGATTACA"), Sequence("GCATGCTACA")
+    _, path_finder = NeedlemanWunschSequenceAlignmentAlgorithm(
+        config
+    ).create_path_finder(left_sequence, right_sequence)
+    paths = path_finder.find_all_paths()
+
+    alignments = PathToAlignmentConverter.convert_all(
+        paths, left_sequence, right_sequence
+    )
+
+    assert len(alignments) > 1
+    assert [str(alignment) for alignment in alignments] == [
+        str(PathToAlignmentConverter.convert(path, left_sequence, right_sequence))
+        for path in paths
+    ]
+    for alignment in alignments:
+        assert str(alignment.left_sequence_alignment).replace("-", "") == str(
+            left_sequence
+        )
+        assert str(alignment.right_sequence_alignment).replace("-", "") == str(
+            right_sequence
+        )
+
+
 def test_sequence_alignment_str():
     result = SequenceAlignmentResult(
         score=9, alignments=[Alignment(Sequence("ABC"), Sequence("ABC"))]
@@ -80,3 +146,433 @@ def test_sequence_alignment_str():
     str_result = str(result)
     assert "Score = 9" in str_result
     assert "ABC\nABC" in str_result
+
+
+def alignment_score(alignment: Alignment, config: SequenceAlignmentAlgorithmConfig):
+    score = 0
+    left = str(alignment.left_sequence_alignment)
+    right = str(alignment.right_sequence_alignment)
+    for left_char, right_char in zip(left, right):
+        if "-" in (left_char, right_char):
+            score += config.gap_penalty
+        elif left_char == right_char:
+            score += config.same
+        else:
+            score += config.diff
+    return score
+
+
+def test_hirschberg_matches_needleman_wunsch_score():
+    random = np.random.RandomState(0)
+    left = Sequence("".join(random.choice(list("ACGT"), 300)))
+    right = Sequence("".join(random.choice(list("ACGT"), 420)))
+    config = SequenceAlignmentAlgorithmConfig(
+        same=5, diff=-3, gap_penalty=-2, max_seq_length=500, max_number_paths=1
+    )
+
+    expected = NeedlemanWunschSequenceAlignmentAlgorithm(config).align(left, right)
+    result = HirschbergSequenceAlignmentAlgorithm(config).align(left, right)
+
+    assert result.score == expected.score
+    assert len(result.alignments) == 1
+    alignment = result.alignments[0]
+    assert str(alignment.left_sequence_alignment).replace("-", "") == str(left)
+    assert str(alignment.right_sequence_alignment).replace("-", "") == str(right)
+    assert alignment_score(alignment, config) == expected.score
+
+
+def test_banded_needleman_wunsch_matches_needleman_wunsch():
+    random = np.random.RandomState(1)
+    left = "".join(random.choice(list("ACGT"), 60))
+    right = left[:20] + "TT" + left[20:45] + left[48:]
+    config = SequenceAlignmentAlgorithmConfig(
+        same=2,
+        diff=-1,
+        gap_penalty=-2,
+        max_seq_length=100,
+        max_number_paths=10,
+        band_width=1,
+    )
+
+    for left_sequence, right_sequence in [
+        (Sequence(left), Sequence(right)),
+        (Sequence(left), Sequence(left[::-1])),
+    ]:
+        expected = NeedlemanWunschSequenceAlignmentAlgorithm(config).align(
+            left_sequence, right_sequence
+        )
+        result = BandedNeedlemanWunschSequenceAlignmentAlgorithm(config).align(
+            left_sequence, right_sequence
+        )
+
+        assert result.score == expected.score
+        assert [str(alignment) for alignment in result.alignments] == [
+            str(alignment) for alignment in expected.alignments
+        ]
+
+
+def test_smith_waterman_finds_local_alignment():
+    config = SequenceAlignmentAlgorithmConfig(
+        same=5, diff=-5, gap_penalty=-2, max_seq_length=20, max_number_paths=5
+    )
+    algorithm = SmithWatermanSequenceAlignmentAlgorithm(config)
+    left = Sequence("WWWWMARSWWW")
+    right = Sequence("KKMARTSKK")
+
+    result = algorithm.align(left, right)
+
+    assert result.score == 18
+    assert algorithm.score(left, right) == 18
+    assert algorithm.score(right, left) == 18
+    assert [str(alignment) for alignment in result.alignments] == ["MAR-S\nMARTS"]
+
+
+def test_smith_waterman_without_similarity():
+    config = SequenceAlignmentAlgorithmConfig(
+        same=5, diff=-5, gap_penalty=-2, max_seq_length=10, max_number_paths=5
+    )
+    algorithm = SmithWatermanSequenceAlignmentAlgorithm(config)
+
+    result = algorithm.align(Sequence("AAA"), Sequence("CCC"))
+
+    assert result.score == 0
+    assert algorithm.score(Sequence("AAA"), Sequence("CCC")) == 0
+    assert len(result.alignments) == 1
+
+
+@pytest.mark.parametrize("algorithm", list(ALGORITHMS))
+@pytest.mark.parametrize("left, right", [("", "ACG"), ("ACG", ""), ("", "")])
+def test_empty_sequences(algorithm, left, right):
+    config = SequenceAlignmentAlgorithmConfig(
+        same=5, diff=-5, gap_penalty=-2, max_seq_length=10, max_number_paths=5
+    )
+    if algorithm == "gotoh":
+        config = replace(config, gap_open=-3, gap_extend=-1)
+    alignment_algorithm = create_algorithm(config, algorithm)
+
+    result = alignment_algorithm.align(Sequence(left), Sequence(right))
+
+    assert result.score == alignment_algorithm.score(Sequence(left), Sequence(right))
+    assert [str(alignment) for alignment in result.alignments] == [
+        f"{left or '-' * len(right)}\n{right or '-' * len(left)}"
+        if algorithm != "smith-waterman"
+        else "\n"
+    ]
+
+
+def affine_alignment_score(alignment: Alignment, config) -> int:
+    score = 0
+    previous = None
+    for left, right in zip(
+        str(alignment.left_sequence_alignment), str(alignment.right_sequence_alignment)
+    ):
+        gap = "left" if left == "-" else "right" if right == "-" else None
+        if gap is not None:
+            score += config.gap_extend if gap == previous else config.gap_open
+        elif left == right:
+            score += config.same
+        else:
+            score += config.diff
+        previous = gap
+    return score
+
+
+def test_gotoh_alignment_with_affine_gaps():
+    config = SequenceAlignmentAlgorithmConfig(
+        same=5,
+        diff=-5,
+        gap_penalty=-2,
+        max_seq_length=20,
+        max_number_paths=10,
+        gap_open=-8,
+        gap_extend=-1,
+    )
+    algorithm = GotohSequenceAlignmentAlgorithm(config)
+    left = Sequence("MARSWITHGAP")
+    right = Sequence("MARSGAP")
+
+    result = algorithm.align(left, right)
+
+    # A single gap of length 4 is preferred over many short ones.
+    assert result.score == 35 - 8 - 3
+    assert algorithm.score(left, right) == result.score
+    assert [str(alignment) for alignment in result.alignments] == [
+        "MARSWITHGAP\nMARS----GAP"
+    ]
+
+
+def test_gotoh_retrieves_every_optimal_alignment_once():
+    random = np.random.RandomState(2)
+    left = Sequence("".join(random.choice(list("AC"), 9)))
+    right = Sequence("".join(random.choice(list("AC"), 7)))
+    config = SequenceAlignmentAlgorithmConfig(
+        same=2,
+        diff=-1,
+        gap_penalty=-2,
+        max_seq_length=10,
+        max_number_paths=1000,
+        gap_open=-2,
+        gap_extend=-1,
+    )
+
+    score, path_finder = GotohSequenceAlignmentAlgorithm(config).create_path_finder(
+        left, right
+    )
+    result = GotohSequenceAlignmentAlgorithm(config).align(left, right)
+    alignments = [str(alignment) for alignment in result.alignments]
+
+    assert len(alignments) == len(set(alignments)) == path_finder.count_paths()
+    for alignment in result.alignments:
+        assert affine_alignment_score(alignment, config) == score
+
+
+def test_substitution_matrix_in_every_engine():
+    random = np.random.RandomState(3)
+    left = Sequence("".join(random.choice(list("ACGT"), 80)))
+    right = Sequence("".join(random.choice(list("ACGT"), 70)))
+    symbols = "ACGT"
+    scores = [[5, -4, -1, -4], [-4, 5, -4, -1], [-1, -4, 5, -4], [-4, -1, -4, 5]]
+    config = SequenceAlignmentAlgorithmConfig(
+        same=1,
+        diff=-1,
+        gap_penalty=-3,
+        max_seq_length=100,
+        max_number_paths=1,
+        substitution_matrix=SubstitutionMatrix(symbols, scores),
+    )
+
+    def matrix_score(alignment: Alignment) -> int:
+        score = 0
+        for left_symbol, right_symbol in zip(
+            str(alignment.left_sequence_alignment),
+            str(alignment.right_sequence_alignment),
+        ):
+            if "-" in (left_symbol, right_symbol):
+                score += config.gap_penalty
+            else:
+                score += scores[symbols.index(left_symbol)][symbols.index(right_symbol)]
+        return score
+
+    expected = NeedlemanWunschSequenceAlignmentAlgorithm(config).align(left, right)
+    assert matrix_score(expected.alignments[0]) == expected.score
+    for algorithm in [
+        NeedlemanWunschSequenceAlignmentAlgorithm(config),
+        HirschbergSequenceAlignmentAlgorithm(config),
+        BandedNeedlemanWunschSequenceAlignmentAlgorithm(config),
+        GotohSequenceAlignmentAlgorithm(config),
+    ]:
+        result = algorithm.align(left, right)
+        assert result.score == expected.score
+        assert matrix_score(result.alignments[0]) == expected.score
+        assert algorithm.score(left, right) == expected.score
+
+    local = SmithWatermanSequenceAlignmentAlgorithm(config)
+    local_result = local.align(left, right)
+    assert local_result.score == local.score(left, right) >= expected.score
+    assert matrix_score(local_result.alignments[0]) == local_result.score
+
+
+@pytest.mark.parametrize("algorithm", list(ALGORITHMS))
+def test_substitution_matrix_with_alphabet_encoded_sequences(algorithm):
+    matrix = SubstitutionMatrix("ACGT", 9 * np.eye(4, dtype=int) - 4)
+    config = SequenceAlignmentAlgorithmConfig(
+        same=1,
+        diff=-1,
+        gap_penalty=-2,
+        max_seq_length=10,
+        max_number_paths=5,
+        substitution_matrix=matrix,
+    )
+    if algorithm == "gotoh":
+        config = replace(config, gap_open=-3, gap_extend=-1)
+    alignment_algorithm = create_algorithm(config, algorithm)
+    left_sequence = Sequence("GATTACA", matrix.alphabet)
+    right_sequence = Sequence("GATACA", matrix.alphabet)
+
+    result = alignment_algorithm.align(left_sequence, right_sequence)
+
+    assert result.score == alignment_algorithm.score(
+        Sequence("GATTACA"), Sequence("GATACA")
+    )
+    gap_score = config.gap_open if algorithm == "gotoh" else config.gap_penalty
+    assert result.score == 6 * 5 + gap_score
+
+
+@pytest.mark.parametrize(
+    "algorithm, config_fields",
+    [
+        ("needleman-wunsch", {}),
+        ("smith-waterman", {}),
+        ("gotoh", {"gap_open": -5, "gap_extend": -1}),
+    ],
+)
+def test_score_batch_matches_score(algorithm, config_fields):
+    config = SequenceAlignmentAlgorithmConfig(
+        same=3,
+        diff=-2,
+        gap_penalty=-2,
+        max_seq_length=40,
+        max_number_paths=1,
+        algorithm=algorithm,
+        **config_fields,
+    )
+    random = np.random.RandomState(8)
+    query = Sequence("".join(random.choice(list("ACGT"), 23)))
+    targets = [
+        Sequence("".join(random.choice(list("ACGT"), length)))
+        for length in random.randint(0, 5, 30) * 8
+    ]
+    alignment_algorithm = create_algorithm(config)
+
+    scores = alignment_algorithm.score_batch(query, targets)
+
+    assert scores.tolist() == [
+        alignment_algorithm.score(query, target) for target in targets
+    ]
+
+
+@pytest.mark.parametrize("algorithm", ["needleman-wunsch", "smith-waterman"])
+def test_scratch_dir_matches_alignment_in_memory(tmp_path, algorithm):
+    config = SequenceAlignmentAlgorithmConfig(
+        same=3,
+        diff=-2,
+        gap_penalty=-2,
+        max_seq_length=40,
+        max_number_paths=20,
+        algorithm=algorithm,
+    )
+    disk_config = replace(config, scratch_dir=str(tmp_path))
+    left_sequence = Sequence("GATTACAGATTACCA")
+    right_sequence = Sequence("GCATGCTACAGA")
+
+    expected = create_algorithm(config).align(left_sequence, right_sequence)
+    result = create_algorithm(disk_config).align(left_sequence, right_sequence)
+
+    assert str(result) == str(expected)
+    assert (tmp_path / "checkpoint.json").exists()
+
+
+@pytest.mark.parametrize("algorithm", list(ALGORITHMS))
+def test_iter_align_matches_align(algorithm):
+    config = SequenceAlignmentAlgorithmConfig(
+        same=3, diff=-2, gap_penalty=-2, max_seq_length=40, max_number_paths=20
+    )
+    if algorithm == "gotoh":
+        config = replace(config, gap_open=-3, gap_extend=-1)
+    alignment_algorithm = create_algorithm(config, algorithm)
+    left_sequence = Sequence("GATTACAGATTACCA")
+    right_sequence = Sequence("GCATGCTACAGA")
+
+    expected = alignment_algorithm.align(left_sequence, right_sequence)
+    score, alignments = alignment_algorithm.iter_align(left_sequence, right_sequence)
+
+    first_alignment = next(alignments)
+    assert score == expected.score
+    assert [str(first_alignment)] + [str(a) for a in alignments] == [
+        str(alignment) for alignment in expected.alignments
+    ]
+
+
+@pytest.mark.parametrize("algorithm", list(ALGORITHMS))
+def test_sequences_with_different_alphabets(algorithm):
+    config = SequenceAlignmentAlgorithmConfig(
+        same=5, diff=-5, gap_penalty=-2, max_seq_length=10, max_number_paths=5
+    )
+    if algorithm == "gotoh":
+        config = replace(config, gap_open=-3, gap_extend=-1)
+    alignment_algorithm = create_algorithm(config, algorithm)
+
+    result = alignment_algorithm.align(
+        Sequence("ACGT", Alphabet("ACGT")), Sequence("ACGT")
+    )
+
+    assert result.score == 20
+    assert (
+        alignment_algorithm.score(Sequence("ACGT", Alphabet("TGCA")), Sequence("ACGT"))
+        == 20
+    )
+
+
+def test_create_algorithm():
+    config = SequenceAlignmentAlgorithmConfig(
+        same=5,
+        diff=-5,
+        gap_penalty=-2,
+        max_seq_length=10,
+        max_number_paths=5,
+        algorithm="hirschberg",
+    )
+
+    assert isinstance(create_algorithm(config), HirschbergSequenceAlignmentAlgorithm)
+    assert isinstance(
+        create_algorithm(config, "needleman-wunsch"),
+        NeedlemanWunschSequenceAlignmentAlgorithm,
+    )
+
+
+def test_create_algorithm_mode():
+    config = SequenceAlignmentAlgorithmConfig(
+        same=5, diff=-5, gap_penalty=-2, max_seq_length=10, max_number_paths=5
+    )
+
+    assert isinstance(
+        create_algorithm(config, mode="local"), SmithWatermanSequenceAlignmentAlgorithm
+    )
+    assert isinstance(
+        create_algorithm(config, mode="global"),
+        NeedlemanWunschSequenceAlignmentAlgorithm,
+    )
+    with pytest.raises(UnsupportedModeError):
+        create_algorithm(config, "hirschberg", "local")
+
+
+def test_create_algorithm_affine_gaps():
+    config = SequenceAlignmentAlgorithmConfig(
+        same=5,
+        diff=-5,
+        gap_penalty=-2,
+        max_seq_length=10,
+        max_number_paths=5,
+        gap_open=-4,
+        gap_extend=-1,
+    )
+
+    assert isinstance(create_algorithm(config), GotohSequenceAlignmentAlgorithm)
+    with pytest.raises(UnsupportedGapPenaltyError):
+        create_algorithm(config, "hirschberg")
+    with pytest.raises(UnsupportedGapPenaltyError):
+        create_algorithm(config, mode="local")
+
+
+@pytest.mark.parametrize("algorithm", ["hirschberg", "banded", "gotoh"])
+def test_create_algorithm_rejects_scratch_dir(algorithm, tmp_path):
+    config = SequenceAlignmentAlgorithmConfig(
+        same=5,
+        diff=-5,
+        gap_penalty=-2,
+        max_seq_length=10,
+        max_number_paths=5,
+        scratch_dir=str(tmp_path),
+    )
+
+    assert isinstance(create_algorithm(config), NeedlemanWunschSequenceAlignmentAlgorithm)
+    with pytest.raises(UnsupportedOptionError):
+        create_algorithm(config, algorithm)
+
+
+@pytest.mark.parametrize("algorithm", ["hirschberg", "banded", "gotoh"])
+def test_create_algorithm_rejects_threads(algorithm, tmp_path):
+    config = SequenceAlignmentAlgorithmConfig(
+        same=5,
+        diff=-5,
+        gap_penalty=-2,
+        max_seq_length=10,
+        max_number_paths=5,
+        threads=2,
+    )
+
+    assert isinstance(create_algorithm(config), NeedlemanWunschSequenceAlignmentAlgorithm)
+    with pytest.raises(UnsupportedOptionError):
+        create_algorithm(config, algorithm)
+    with pytest.raises(UnsupportedOptionError):
+        create_algorithm(replace(config, scratch_dir=str(tmp_path)))
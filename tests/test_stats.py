@@ -0,0 +1,63 @@
+import json
+
+import numpy as np
+
+from bioinf.sequence import Sequence
+from bioinf.sequence_alignment import SequenceAlignmentAlgorithmConfig, create_algorithm
+from bioinf.stats import collect_stats, phase
+
+
+def test_phase_does_nothing_without_collect_stats():
+    first_phase, second_phase = phase("fill", cells=10), phase("convert")
+
+    with first_phase as current:
+        current.count(cells=5, paths=1)
+
+    assert first_phase is second_phase
+
+
+def test_collect_stats_records_alignment_phases():
+    config = SequenceAlignmentAlgorithmConfig(
+        same=5, diff=-5, gap_penalty=-2, max_seq_length=20, max_number_paths=10
+    )
+    left_sequence, right_sequence = Sequence("GATTACA"), Sequence("GCATGCA")
+
+    with collect_stats() as stats:
+        result = create_algorithm(config).align(left_sequence, right_sequence)
+
+    assert list(stats.phases) == ["score_matrix", "fill", "traceback", "convert"]
+    assert stats.phases["fill"].calls == 1
+    assert stats.phases["fill"].cells == 8 * 8
+    assert stats.phases["traceback"].paths == len(result.alignments)
+    assert all(phase.seconds >= 0 for phase in stats.phases.values())
+    assert stats.max_rss > 0
+    assert "fill" in str(stats)
+
+
+def test_collect_stats_measures_peak_memory_of_nested_phases():
+    with collect_stats() as stats:
+        with phase("outer"):
+            with phase("inner"):
+                inner = np.ones(1 << 20, dtype=np.uint8)
+                del inner
+            small = np.ones(1 << 10, dtype=np.uint8)
+            del small
+
+    assert stats.phases["inner"].peak_memory >= 1 << 20
+    assert stats.phases["outer"].peak_memory >= 1 << 20
+
+
+def test_stats_as_json():
+    with collect_stats(trace_memory=False) as stats:
+        with phase("score", cells=100) as current:
+            current.count(cells=50)
+        with phase("score"):
+            pass
+
+    document = json.loads(stats.to_json())
+
+    assert document["phases"]["score"]["calls"] == 2
+    assert document["phases"]["score"]["cells"] == 150
+    assert document["phases"]["score"]["peak_memory"] == 0
+    assert document["phases"]["score"]["cells_per_second"] > 0
+    assert document == stats.as_dict()
@@ -0,0 +1,151 @@
+from os.path import dirname, join
+
+import pytest
+
+from bioinf.utils import (
+    FastaIndexRecord,
+    ImproperConfigFieldError,
+    ImproperFastaFormatError,
+    ImproperSubstitutionMatrixFormatError,
+    MissingConfigFieldError,
+    MissingFastaRecordError,
+    build_fasta_index,
+    read_config,
+    read_fasta_index,
+    read_sequence,
+    read_sequences,
+    read_substitution_matrix,
+    selected_filepath,
+    write_fasta_index,
+)
+
+
+def test_read_sequences_yields_every_record(tmp_path):
+    fasta = tmp_path / "sequences.fa"
+    fasta.write_bytes(b">first record\r\nMA\r\nRS\r\n>empty\n>last\nSM\nART")
+
+    records = [
+        (description, str(sequence))
+        for description, sequence in read_sequences(str(fasta))
+    ]
+
+    assert records == [("first record", "MARS"), ("empty", ""), ("last", "SMART")]
+
+
+def test_read_sequence_reads_first_record(tmp_path):
+    fasta = tmp_path / "sequences.fa"
+    fasta.write_text(">first\nMA\nRS\n>second\nSMART\n")
+
+    assert str(read_sequence(str(fasta))) == "MARS"
+
+
+def test_read_sequences_empty_file(tmp_path):
+    fasta = tmp_path / "sequences.fa"
+    fasta.write_text("")
+
+    with pytest.raises(ImproperFastaFormatError):
+        list(read_sequences(str(fasta)))
+
+
+def test_build_fasta_index(tmp_path):
+    fasta = tmp_path / "sequences.fa"
+    fasta.write_bytes(b">first record\nMAR\nS\n>second\r\nSM\r\nAR\r\nT\r\n>empty\n")
+
+    assert build_fasta_index(str(fasta)) == [
+        FastaIndexRecord("first", 4, 14, 3, 4),
+        FastaIndexRecord("second", 5, 29, 2, 4),
+        FastaIndexRecord("empty", 0, 47, 0, 0),
+    ]
+
+
+def test_build_fasta_index_uneven_lines(tmp_path):
+    fasta = tmp_path / "sequences.fa"
+    fasta.write_text(">first\nMA\nRST\n")
+
+    with pytest.raises(ImproperFastaFormatError):
+        build_fasta_index(str(fasta))
+
+
+def test_read_sequence_with_record_selector(tmp_path):
+    fasta = tmp_path / "sequences.fa"
+    fasta.write_text(">first\nMAR\nS\n>second\nSMA\nRTM\nYSE\n")
+
+    assert str(read_sequence(f"{fasta}:second")) == "SMARTMYSE"
+    assert str(read_sequence(f"{fasta}:second:3-7")) == "ARTMY"
+    assert str(read_sequence(f"{fasta}:second:8-20")) == "SE"
+    assert (tmp_path / "sequences.fa.fai").read_text().startswith("first\t4\t7\t3\t4\n")
+    with pytest.raises(MissingFastaRecordError):
+        read_sequence(f"{fasta}:third")
+    with pytest.raises(MissingFastaRecordError):
+        read_sequence(f"{fasta}:second:10-12")
+
+
+def test_selected_filepath(tmp_path):
+    colon_file = tmp_path / "a:b.fa"
+    colon_file.write_text(">first\nMARS\n")
+
+    assert selected_filepath("seqs.fa") == "seqs.fa"
+    assert selected_filepath("seqs.fa:first") == "seqs.fa"
+    assert selected_filepath("seqs.fa:first:2-3") == "seqs.fa"
+    assert selected_filepath(str(colon_file)) == str(colon_file)
+
+
+def test_read_fasta_index_duplicate_names(tmp_path):
+    fasta = tmp_path / "sequences.fa"
+    fasta.write_text(">first\nMAR\n>first copy\nSMART\n")
+
+    with pytest.raises(ImproperFastaFormatError):
+        read_fasta_index(str(fasta))
+    assert not (tmp_path / "sequences.fa.fai").exists()
+
+
+def test_read_fasta_index_from_sidecar_file(tmp_path):
+    fasta = tmp_path / "sequences.fa"
+    fasta.write_text(">first\nMAR\nS\n")
+    write_fasta_index(str(fasta), [FastaIndexRecord("first", 2, 8, 3, 4)])
+
+    assert read_fasta_index(str(fasta)) == {
+        "first": FastaIndexRecord("first", 2, 8, 3, 4)
+    }
+
+
+def test_read_config_affine_gap_penalties(tmp_path):
+    fields = "same = 5\ndiff = -5\ngap_penalty = -2\nmax_number_paths = 5\n"
+    fields += "max_seq_length = 10\n"
+    config_filepath = tmp_path / "config.ini"
+
+    config_filepath.write_text("[DEFAULT]\n" + fields)
+    assert read_config(str(config_filepath)).gap_open is None
+
+    config_filepath.write_text(
+        "[DEFAULT]\n" + fields + "gap_open = -6\ngap_extend = -1\n"
+    )
+    config = read_config(str(config_filepath))
+    assert (config.gap_open, config.gap_extend) == (-6, -1)
+
+    config_filepath.write_text("[DEFAULT]\n" + fields + "gap_open = -6\n")
+    with pytest.raises(MissingConfigFieldError):
+        read_config(str(config_filepath))
+
+    config_filepath.write_text(
+        "[DEFAULT]\n" + fields + "gap_open = -1\ngap_extend = -6\n"
+    )
+    with pytest.raises(ImproperConfigFieldError):
+        read_config(str(config_filepath))
+
+
+def test_read_config_substitution_matrix():
+    config = read_config(
+        join(dirname(__file__), "resources/config_substitution_matrix.ini")
+    )
+
+    assert str(config.substitution_matrix.alphabet) == "ACGT"
+    assert config.substitution_matrix.scores[0, 2] == -1
+
+
+def test_read_substitution_matrix_mismatched_rows(tmp_path):
+    matrix_filepath = tmp_path / "matrix.txt"
+    matrix_filepath.write_text("# comment\n  A  C\nA 1 -1\nG -1 1\n")
+
+    with pytest.raises(ImproperSubstitutionMatrixFormatError):
+        read_substitution_matrix(str(matrix_filepath))